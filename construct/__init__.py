@@ -70,6 +70,7 @@ __all__ = [
     'Construct',
     'ConstructError',
     'Container',
+    'ContextFrame',
     'CString',
     'Debugger',
     'Default',
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 
-import struct, io, binascii, itertools, collections, pickle, sys, os, hashlib, importlib, importlib.machinery, importlib.util
+import struct, array, io, binascii, weakref, itertools, collections, pickle, marshal, types, threading, sys, os, hashlib, importlib, importlib.machinery, importlib.util
 
 from construct.lib import *
 from construct.expr import *
@@ -261,30 +261,306 @@ class BytesIOWithOffsets(io.BytesIO):
 class CodeGen:
     def __init__(self):
         self.blocks = []
+        self.blockset = set()
+        self.rawblocks = set()
+        self.keys = {}
         self.nextid = 0
         self.parsercache = {}
         self.buildercache = {}
+        self.bufferparsercache = {}
+        self.bufferfallback = False
+        self.bufferreads = 0
+        self.sizeofcache = {}
         self.linkedinstances = {}
         self.linkedparsers = {}
         self.linkedbuilders = {}
+        self.linkedsizeofs = {}
         self.userfunction = {}
+        self.fallbacks = {}
 
     def allocateId(self):
         self.nextid += 1
         return self.nextid
 
     def append(self, block):
+        # helpers get appended once per use, identical raw text is skipped before trimming
+        if block in self.rawblocks:
+            return
+        self.rawblocks.add(block)
         block = [s for s in block.splitlines() if s.strip()]
         firstline = block[0]
         trim = len(firstline) - len(firstline.lstrip())
         block = "\n".join(s[trim:] for s in block)
-        if block not in self.blocks:
+        if block not in self.blockset:
+            self.blockset.add(block)
             self.blocks.append(block)
 
+    def key(self, construct):
+        """Returns the key that emitted code of a construct is cached under. Structurally identical constructs (see fingerprint) share a key, so their code gets emitted only once. Constructs that cannot be fingerprinted are keyed by identity."""
+        key = self.keys.get(id(construct))
+        if key is None:
+            # renamed fields emit just the code of their subcon, so they also share its key
+            if type(construct) is Renamed:
+                key = self.key(construct.subcon)
+            else:
+                try:
+                    key = fingerprint(construct)[0]
+                except NotImplementedError:
+                    key = id(construct)
+            self.keys[id(construct)] = key
+        return key
+
     def toString(self):
         return "\n".join(self.blocks + [""])
 
 
+def emitbuildfrom(code, name, objexpr, subcon):
+    """Used internally. Emits a function that builds subcon from a value computed from obj, instead of a reuse call with a lambda."""
+    fname = f"build_{name}_{code.allocateId()}"
+    code.append(f"""
+        def {fname}(obj, io, this):
+            obj = {objexpr}
+            return {subcon._compilebuild(code)}
+    """)
+    return f"{fname}(obj, io, this)"
+
+
+def emitparsefrom(code, name, subcon):
+    """Used internally. Emits a function that parses subcon from a stream given as parameter, instead of a restream call with a lambda."""
+    fname = f"parse_{name}_{code.allocateId()}"
+    code.append(f"""
+        def {fname}(io, this):
+            return {subcon._compileparse(code)}
+    """)
+    return fname
+
+
+def emitfunction(code, func):
+    """Used internally. Returns an expression that refers to a plain function in generated code, library functions by name and others through userfunction."""
+    if getattr(func, "__module__", "").startswith("construct.lib") and globals().get(getattr(func, "__name__", None)) is func:
+        return func.__name__
+    aid = code.allocateId()
+    code.userfunction[aid] = func
+    return f"userfunction[{aid}]"
+
+
+def emitparam(code, param):
+    """Used internally. Returns an expression that evaluates a parameter, constants and this expressions as they are, and lambdas through userfunction."""
+    if callable(param) and not isinstance(param, ExprMixin):
+        return f"{emitfunction(code, param)}(this)"
+    return repr(param)
+
+
+def emitbuffercall(call):
+    """Used internally. Call has to return a tuple of parsed value and new offset."""
+    return f"((off := (ret := {call})[1]), ret[0])[1]"
+
+
+def emitstreambytes(code, length):
+    """Used internally. Reads exactly length bytes, raising StreamError like stream_read does."""
+    code.append("""
+        def parse_streambytes(io, length):
+            if length < 0:
+                raise StreamError("length must be non-negative, found %s" % length)
+            data = io.read(length)
+            if len(data) != length:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, len(data)))
+            return data
+    """)
+    return f"parse_streambytes(io, {length})"
+
+
+def emitbufferbytes(code, length):
+    """Used internally."""
+    code.bufferreads += 1
+    # length goes first, because evaluating it can advance off
+    code.append("""
+        def parse_bufferbytes(length, buf, off):
+            if not 0 <= length <= len(buf) - off:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, max(len(buf) - off, 0)))
+            return buf[off:off+length].tobytes(), off+length
+    """)
+    return emitbuffercall(f"parse_bufferbytes({length}, buf, off)")
+
+
+def emitsizeofparam(param):
+    """Used internally. Lambdas cannot be emitted, only constants and this expressions."""
+    if callable(param) and not isinstance(param, ExprMixin):
+        raise NotImplementedError
+    return repr(param)
+
+
+def emitsizeoflength(code, param):
+    """Used internally."""
+    code.append("""
+        def sizeof_length(length):
+            if length < 0:
+                raise PaddingError("length cannot be negative")
+            return length
+    """)
+    return f"sizeof_length({emitsizeofparam(param)})"
+
+
+def linkmodule(namespace, schema, digest, linkedinstances, userfunction):
+    """Used internally. Resolves interpreted fallbacks and lambdas of a module written by export_module, by importing the construct it was exported from, and finding them by their walk positions."""
+    modulename, _, attribute = schema.partition(":")
+    sc = getattr(importlib.import_module(modulename), attribute)
+    try:
+        currentdigest, objects = fingerprint(sc)
+    except NotImplementedError:
+        currentdigest = None
+    if currentdigest != digest:
+        raise ImportError(f"{schema} changed since the module was exported, export it again")
+    instances = {k:extractfield(objects[i]) for k,i in linkedinstances.items()}
+    namespace["linkedinstances"] = instances
+    namespace["linkedparsers"] = {k:v._parse for k,v in instances.items()}
+    namespace["linkedbuilders"] = {k:v._build for k,v in instances.items()}
+    namespace["linkedsizeofs"] = {k:v._sizeof for k,v in instances.items()}
+    namespace["userfunction"] = {k:objects[i] for k,i in userfunction.items()}
+    namespace["compiled"].defersubcon = sc
+
+
+def fingerprint(sc):
+    """
+    Used internally. Walks a construct tree (constructs, their parameters, this expressions, functions with their code, closures and the globals they read, and a few value types like datetimes) and returns a tuple of a hex digest and a list of all constructs and functions encountered, in walk order. Identical trees produce same digest and same order. Raises NotImplementedError if the tree contains an object that cannot be fingerprinted.
+    """
+    tokens = []
+    objects = []
+    seen = {}
+    def walk(x):
+        if x is None or isinstance(x, (bool, int, float, complex, str, bytes, bytearray)):
+            tokens.append(f"{type(x).__name__}:{x!r}")
+        elif id(x) in seen:
+            tokens.append(f"ref:{seen[id(x)]}")
+        elif isinstance(x, ExprMixin):
+            tokens.append(f"expr:{x!r}")
+        elif isinstance(x, (list, tuple, set, frozenset, dict)):
+            tokens.append(f"{type(x).__name__}:{len(x)}")
+            items = dict.items(x) if isinstance(x, dict) else x
+            if isinstance(x, (set, frozenset)):
+                items = sorted(x, key=repr)
+            for e in items:
+                walk(e)
+        elif isinstance(x, type):
+            tokens.append(f"type:{x.__module__}.{x.__qualname__}")
+            # library classes are covered by version, but user classes (and classes made inside macros) can differ in code or closures
+            if not (x.__module__ == "builtins" or x.__module__.startswith("construct.")) or "<locals>" in x.__qualname__:
+                seen[id(x)] = len(objects)
+                objects.append(x)
+                for k,v in sorted(x.__dict__.items()):
+                    if isinstance(v, (staticmethod, classmethod)):
+                        v = v.__func__
+                    if isinstance(v, (types.FunctionType, bool, int, float, str, bytes)):
+                        tokens.append(f"attr:{k}")
+                        walk(v)
+                walk(x.__bases__)
+        elif isinstance(x, types.ModuleType):
+            tokens.append(f"module:{x.__name__}")
+        elif isinstance(x, types.CodeType):
+            tokens.append(f"code:{x.co_code.hex()}:{x.co_names}:{x.co_freevars}")
+            walk(x.co_consts)
+        elif isinstance(x, (Construct, types.FunctionType, types.MethodType)):
+            seen[id(x)] = len(objects)
+            objects.append(x)
+            if isinstance(x, Construct):
+                tokens.append("construct")
+                walk(type(x))
+                for k,v in sorted(x.__getstate__().items()):
+                    tokens.append(f"attr:{k}")
+                    walk(v)
+            elif isinstance(x, types.FunctionType):
+                tokens.append(f"function:{x.__module__}.{x.__qualname__}")
+                walk(x.__code__)
+                walk(x.__defaults__)
+                walk(x.__kwdefaults__)
+                for cell in x.__closure__ or ():
+                    try:
+                        walk(cell.cell_contents)
+                    except ValueError:
+                        tokens.append("emptycell")
+                # same code can read different globals, when executed in different namespaces
+                names = set()
+                def collectnames(c):
+                    names.update(c.co_names)
+                    for k in c.co_consts:
+                        if isinstance(k, types.CodeType):
+                            collectnames(k)
+                collectnames(x.__code__)
+                for name in sorted(names):
+                    if name in x.__globals__:
+                        tokens.append(f"global:{name}")
+                        walk(x.__globals__[name])
+            else:
+                tokens.append("method")
+                walk(x.__func__)
+                walk(x.__self__)
+        elif isinstance(x, types.BuiltinFunctionType):
+            tokens.append(f"builtin:{getattr(x.__self__, '__name__', None)}.{x.__qualname__}")
+            if not (x.__self__ is None or isinstance(x.__self__, types.ModuleType)):
+                # a bound method like somedict.get, that depends on its object
+                walk(x.__self__)
+        else:
+            typename = f"{type(x).__module__}.{type(x).__qualname__}"
+            if typename in ("datetime.datetime", "datetime.time"):
+                tokens.append(f"value:{typename}:{x.replace(tzinfo=None)!r}")
+                walk(x.tzinfo)
+            elif typename == "arrow.arrow.Arrow":
+                tokens.append("arrow")
+                walk(x.datetime)
+            elif typename in ("datetime.date", "datetime.timedelta", "datetime.timezone", "decimal.Decimal", "fractions.Fraction", "uuid.UUID", "zoneinfo.ZoneInfo"):
+                # value objects whose repr holds all of their state, other objects can hide state from their repr
+                tokens.append(f"value:{typename}:{x!r}")
+            else:
+                raise NotImplementedError(f"cannot fingerprint {type(x)}")
+    walk(sc)
+    digest = hashlib.sha256("\n".join(tokens).encode()).hexdigest()
+    return digest, objects
+
+
+#: Compiled instances shared by structurally identical constructs, see Construct.compile.
+compiledcache = collections.OrderedDict()
+#: Maximum amount of entries in compiledcache, least recently used ones get evicted.
+compiledcachesize = 128
+compiledcachelock = threading.Lock()
+
+
+class AutoCompiler:
+    """Used internally. Counts top-level parse and build calls of a construct, and compiles it once a threshold is reached. If compilation fails, the construct stays interpreted for good."""
+
+    def __init__(self, construct, threshold, background):
+        self.construct = construct
+        self.threshold = threshold
+        self.background = background
+        self.calls = 0
+        self.compiled = None
+        self.failed = False
+        self.thread = None
+        self.lock = threading.Lock()
+
+    def count(self):
+        """Returns the compiled instance, or None while the construct is still interpreted."""
+        if self.compiled is not None or self.failed:
+            return self.compiled
+        self.calls += 1
+        if self.calls < self.threshold:
+            return None
+        with self.lock:
+            if self.thread is not None:
+                return self.compiled
+            self.thread = threading.Thread(target=self.run, name="construct-autocompile", daemon=True)
+        if self.background:
+            self.thread.start()
+        else:
+            self.thread.run()
+        return self.compiled
+
+    def run(self):
+        try:
+            self.compiled = self.construct.compile()
+        except Exception:
+            self.failed = True
+
+
 class KsyGen:
     def __init__(self):
         self.instances = {}
@@ -334,6 +610,7 @@ class Construct(object):
     * `build_file`
     * `sizeof`
     * `compile`
+    * `autocompile`
     * `benchmark`
 
     Subclass authors should not override the external methods. Instead, another API is available:
@@ -355,6 +632,9 @@ class Construct(object):
     All constructs have a name and flags. The name is used for naming struct members and context dictionaries. Note that the name can be a string, or None by default. A single underscore "_" is a reserved name, used as up-level in nested containers. The name should be descriptive, short, and valid as a Python identifier, although these rules are not enforced. The flags specify additional behavioral information about this construct. Flags are used by enclosing constructs to determine a proper course of action. Flags are often inherited from inner subconstructs but that depends on each class.
     """
 
+    #: tiered compilation state, see autocompile
+    _autocompile = None
+
     def __init__(self):
         self.name = None
         self.docs = ""
@@ -368,6 +648,7 @@ class Construct(object):
         attrs = {}
         if hasattr(self, "__dict__"):
             attrs.update(self.__dict__)
+            attrs.pop("_autocompile", None)
         slots = []
         c = self.__class__
         while c is not None:
@@ -388,6 +669,17 @@ class Construct(object):
         self2.__setstate__(self.__getstate__())
         return self2
 
+    def fingerprint(self):
+        """
+        Returns a hex digest that is same for structurally identical constructs: same classes, names, parameters, this expressions, nested subcons, and functions with same code closures and globals. Returns None if the construct cannot be fingerprinted, because it holds some arbitrary object.
+
+        The digest is computed by walking the whole tree on each call. It is not cached and constructs still compare and hash by identity, because constructs can be modified after they were made.
+        """
+        try:
+            return fingerprint(self)[0]
+        except NotImplementedError:
+            return None
+
     def parse(self, data, **contextkw):
         r"""
         Parse an in-memory buffer (often bytes object). Strings, buffers, memoryviews, and other complete buffers can be parsed with this method.
@@ -402,12 +694,18 @@ class Construct(object):
 
         :raises ConstructError: raised for any reason
         """
+        if self._autocompile is not None and self._autocompile.compiled is not None:
+            return self._autocompile.compiled.parse(data, **contextkw)
         return self.parse_stream(io.BytesIO(data), **contextkw)
 
     def parse_stream(self, stream, **contextkw):
         r"""
         Parse a stream. Files, pipes, sockets, and other streaming sources of data are handled by this method. See parse().
         """
+        if self._autocompile is not None:
+            compiled = self._autocompile.count()
+            if compiled is not None:
+                return compiled.parse_stream(stream, **contextkw)
         context = Container(**contextkw)
         context._parsing = True
         context._building = False
@@ -457,6 +755,10 @@ class Construct(object):
         r"""
         Build an object directly into a stream. See build().
         """
+        if self._autocompile is not None:
+            compiled = self._autocompile.count()
+            if compiled is not None:
+                return compiled.build_stream(obj, stream, **contextkw)
         context = Container(**contextkw)
         context._parsing = False
         context._building = True
@@ -508,19 +810,172 @@ class Construct(object):
     def _actualsize(self, stream, context, path):
         return self._sizeof(context, path)
 
-    def compile(self, filename=None):
+    def compile(self, filename=None, cachedir=None, report=False, sampledata=None):
         """
         Transforms a construct into another construct that does same thing (has same parsing and building semantics) but is much faster when parsing. Already compiled instances just compile into itself.
 
-        Optionally, partial source code can be saved to a text file. This is meant only to inspect the generated code, not to import it from external scripts.
+        Optionally, partial source code can be saved to a text file. This is meant only to inspect the generated code, not to import it from external scripts. See export_module for that.
+
+        Compiled instances are shared, structurally identical constructs (see `fingerprint`) compile into the same instance, from a bounded process-wide cache.
+
+        Optionally, a cache directory can be given. Generated bytecode gets stored there, keyed by a structural fingerprint of the construct and Construct version, and later compilations of an identical construct (also in other processes) load it instead of generating code again. Linked instances and lambdas get rebound to the construct being compiled.
+
+        Optionally, a report of interpreted fallbacks can be requested, listing parts of the construct that the compiler does not support, and so get parsed, built or sized by the interpreter. Each entry is a Container with path (names of enclosing fields), classname, kind ("parse" "build" or "sizeof") and time. If sample data is also given, it gets parsed and built once, and time is the amount of seconds spent in that fallback, otherwise time is None. Structurally identical fallbacks share their generated code, and so also their timing. A report bypasses the shared cache and the cache directory, the compiled instance is a new one.
+
+        :param report: bool, return a tuple of Compiled instance and a ListContainer of fallbacks
+        :param sampledata: optional, bytes, used to time the fallbacks in the report
+
+        :returns: Compiled instance, or a tuple of Compiled instance and a ListContainer, if a report was requested
+        """
+
+        try:
+            digest, objects = fingerprint(self)
+        except NotImplementedError:
+            digest = objects = None
+        if digest is not None and not report:
+            with compiledcachelock:
+                compiled = compiledcache.get(digest)
+                if compiled is not None:
+                    compiledcache.move_to_end(digest)
+            if compiled is not None:
+                if filename:
+                    with open(filename, "wt") as f:
+                        f.write(compiled.source)
+                return compiled
+
+        cachefile = None
+        if cachedir is not None and digest is not None and not report:
+            cachefile = os.path.join(cachedir, f"{digest}-{version_string}-{sys.implementation.cache_tag}.bin")
+            compiled = self._compilefromcache(cachefile, objects, filename)
+            if compiled is not None:
+                return self._compileshare(digest, compiled)
+
+        code = self._compilecode("# generated by Construct, this source is for inspection only! do not import!", digest)
+        source = code.toString()
+
+        if filename:
+            with open(filename, "wt") as f:
+                f.write(source)
+
+        modulename = hexlify(hashlib.sha1(source.encode()).digest()).decode()
+        c = compile(source, '', 'exec')
 
-        :returns: Compiled instance
+        if cachefile is not None:
+            self._compiletocache(cachefile, objects, code, source, modulename, c)
+
+        compiled = self._compilemodule(source, modulename, c, code.linkedinstances, code.userfunction)
+        if report:
+            return compiled, self._compilereport(code, compiled, sampledata)
+        if digest is not None:
+            compiled = self._compileshare(digest, compiled)
+        return compiled
+
+    def _compilereport(self, code, compiled, sampledata):
+        """Used internally. Lists interpreted fallbacks in tree order, and times them on sample data."""
+        timings = collections.Counter()
+        if sampledata is not None:
+            from time import perf_counter
+            def timed(kind, linkedid, func):
+                def wrapper(*args):
+                    start = perf_counter()
+                    try:
+                        return func(*args)
+                    finally:
+                        timings[kind, linkedid] += perf_counter() - start
+                return wrapper
+            module = compiled.module
+            original = dict(parse=dict(module.linkedparsers), build=dict(module.linkedbuilders))
+            try:
+                for k,v in original["parse"].items():
+                    module.linkedparsers[k] = timed("parse", k, v)
+                for k,v in original["build"].items():
+                    module.linkedbuilders[k] = timed("build", k, v)
+                compiled.build(compiled.parse(sampledata))
+            finally:
+                module.linkedparsers.update(original["parse"])
+                module.linkedbuilders.update(original["build"])
+
+        report = ListContainer()
+        def walk(sc, path, covered):
+            if isinstance(sc, Renamed):
+                return walk(sc.subcon, f"{path} -> {sc.name}" if sc.name else path, covered)
+            linkedid, kinds = code.fallbacks.get(code.key(sc), (None, ()))
+            for kind in ("parse", "build", "sizeof"):
+                if kind in kinds and kind not in covered:
+                    time = timings.get((kind, linkedid), 0.0) if sampledata is not None and kind != "sizeof" else None
+                    report.append(Container(path=path, classname=type(sc).__name__, kind=kind, time=time))
+            covered = covered | set(kinds)
+            # subcons of an interpreted construct are interpreted too, only other kinds can still have their own fallbacks
+            for k,v in sc.__dict__.items():
+                if k.startswith("_"):
+                    continue
+                for x in (v.values() if isinstance(v, dict) else v if isinstance(v, (list, tuple)) else [v]):
+                    if isinstance(x, Construct):
+                        walk(x, path, covered)
+        walk(self, "(root)", frozenset())
+        return report
+
+    def autocompile(self, threshold=1000, background=True):
         """
+        Opts in to tiered compilation. The construct counts its top-level parse and build calls (nested calls are not counted), and after threshold calls it compiles itself and then uses the compiled instance for all further calls. Short-lived processes never pay for compilation, and long-running ones get compiled performance without keeping a Compiled instance around. If compilation fails, the construct stays interpreted, and does not try again.
 
+        :param threshold: integer, amount of calls after which compilation happens
+        :param background: bool, compile on a daemon thread, calls made in the meantime are still interpreted
+
+        :returns: self
+        """
+        if not isinstance(threshold, int) or threshold < 0:
+            raise ConstructError("threshold must be a non-negative integer")
+        self._autocompile = AutoCompiler(self, threshold, background)
+        return self
+
+    def export_module(self, filename, schema=None):
+        """
+        Writes an importable Python module that contains the compiled parser and builder, meant for shipping precompiled parsers. Importing it provides a `compiled` attribute, a Compiled instance, without building the construct tree or generating any code.
+
+        Constructs that do not compile (and fall back to the interpreter) and lambdas cannot be written into a module. If there are any, `schema` has to name where the original construct can be imported from, as "package.module:attribute". The generated module imports it and checks that it is structurally identical to what was exported.
+
+        :param filename: string, where the module gets written
+        :param schema: optional, string, like "package.module:attribute"
+
+        :returns: source code of the module
+
+        :raises ConstructError: construct needs a schema reference but none was given, or it cannot be fingerprinted
+        """
+        code = self._compilecode(f"""
+            # generated by Construct, importable module, see Construct.export_module
+            from construct.version import version_string
+            if version_string != {repr(version_string)}:
+                raise ImportError("module was exported by Construct {version_string}, export it again")
+        """)
+        if code.linkedinstances or code.userfunction:
+            if schema is None:
+                raise ConstructError("construct has interpreted fallbacks or lambdas, schema parameter is required")
+            try:
+                digest, objects = fingerprint(self)
+            except NotImplementedError:
+                raise ConstructError("construct cannot be fingerprinted, so it cannot be exported")
+            positions = {id(x):i for i,x in enumerate(objects)}
+            if not all(k in positions for k in code.linkedinstances) or not all(id(f) in positions for f in code.userfunction.values()):
+                raise ConstructError("construct has interpreted fallbacks or lambdas outside of its tree")
+            linkedinstances = {k:positions[k] for k in code.linkedinstances}
+            userfunction = {k:positions[id(f)] for k,f in code.userfunction.items()}
+            code.append(f"""
+                import construct.core
+                construct.core.linkmodule(globals(), {repr(schema)}, {repr(digest)}, {repr(linkedinstances)}, {repr(userfunction)})
+            """)
+        source = code.toString()
+        with open(filename, "wt") as f:
+            f.write(source)
+        return source
+
+    def _compilecode(self, header, digest=None):
+        """Used internally. Generates the whole module, parser builder and sizeof functions and the compiled instance."""
         code = CodeGen()
+        if digest is not None:
+            code.keys[id(self)] = digest
+        code.append(header)
         code.append("""
-            # generated by Construct, this source is for inspection only! do not import!
-
             from construct import *
             from construct.lib import *
             from io import BytesIO
@@ -536,6 +991,7 @@ class Construct(object):
             linkedinstances = {}
             linkedparsers = {}
             linkedbuilders = {}
+            linkedsizeofs = {}
             userfunction = {}
 
             len_ = len
@@ -549,24 +1005,54 @@ class Construct(object):
                 return {self._compileparse(code)}
             def buildall(obj, io, this):
                 return {self._compilebuild(code)}
-            compiled = Compiled(parseall, buildall)
         """)
-        source = code.toString()
-
-        if filename:
-            with open(filename, "wt") as f:
-                f.write(source)
+        code.append(f"""
+            def sizeofall(this):
+                try:
+                    return {self._compilesizeof(code)}
+                except (KeyError, AttributeError):
+                    raise SizeofError("cannot calculate size, key not found in context")
+        """)
+        bufferparse = self._compileparsebuffer(code)
+        # without any field read from the buffer directly, buffer mode would only add overhead to the stream parser
+        if code.bufferreads:
+            code.append(f"""
+                def parseallbuffer(data, this):
+                    buf = memoryview(data).cast('B')
+                    io = {'BytesIO(data)' if code.bufferfallback else 'None'}
+                    off = 0
+                    try:
+                        return {bufferparse}
+                    except struct.error as e:
+                        raise StreamError(str(e))
+                compiled = Compiled(parseall, buildall, parseallbuffer, sizeofall)
+            """)
+        else:
+            code.append("""
+                compiled = Compiled(parseall, buildall, None, sizeofall)
+            """)
+        return code
+
+    def _compileshare(self, digest, compiled):
+        """Used internally. Puts a compiled instance into the shared cache, or returns the one that another thread put there first."""
+        with compiledcachelock:
+            compiled = compiledcache.setdefault(digest, compiled)
+            compiledcache.move_to_end(digest)
+            while len(compiledcache) > compiledcachesize:
+                compiledcache.popitem(last=False)
+        return compiled
 
-        modulename = hexlify(hashlib.sha1(source.encode()).digest()).decode()
+    def _compilemodule(self, source, modulename, c, linkedinstances, userfunction):
+        """Used internally."""
         module_spec = importlib.machinery.ModuleSpec(modulename, None)
         module = importlib.util.module_from_spec(module_spec)
-        c = compile(source, '', 'exec')
         exec(c, module.__dict__)
 
-        module.linkedinstances = code.linkedinstances
-        module.linkedparsers = code.linkedparsers
-        module.linkedbuilders = code.linkedbuilders
-        module.userfunction = code.userfunction
+        module.linkedinstances = linkedinstances
+        module.linkedparsers = {k:v._parse for k,v in linkedinstances.items()}
+        module.linkedbuilders = {k:v._build for k,v in linkedinstances.items()}
+        module.linkedsizeofs = {k:v._sizeof for k,v in linkedinstances.items()}
+        module.userfunction = userfunction
         compiled = module.compiled
         compiled.source = source
         compiled.module = module
@@ -574,6 +1060,48 @@ class Construct(object):
         compiled.defersubcon = self
         return compiled
 
+    def _compiletocache(self, cachefile, objects, code, source, modulename, c):
+        """Used internally. Stores bytecode along with walk positions of linked instances and user functions, does nothing if some are not part of the construct tree."""
+        positions = {id(x):i for i,x in enumerate(objects)}
+        linkedids = {k for k,v in code.linkedinstances.items()}
+        if not all(k in positions for k in linkedids):
+            return
+        if not all(id(f) in positions for f in code.userfunction.values()):
+            return
+        entry = dict(
+            version = version_string,
+            source = source,
+            modulename = modulename,
+            bytecode = marshal.dumps(c),
+            linkedinstances = {k:positions[k] for k in linkedids},
+            userfunction = {k:positions[id(f)] for k,f in code.userfunction.items()},
+        )
+        try:
+            os.makedirs(os.path.dirname(cachefile) or ".", exist_ok=True)
+            tmpfile = f"{cachefile}.{os.getpid()}.tmp"
+            with open(tmpfile, "wb") as f:
+                pickle.dump(entry, f)
+            os.replace(tmpfile, cachefile)
+        except OSError:
+            pass
+
+    def _compilefromcache(self, cachefile, objects, filename):
+        """Used internally. Returns None if cache file is missing or unusable."""
+        try:
+            with open(cachefile, "rb") as f:
+                entry = pickle.load(f)
+            if entry["version"] != version_string:
+                return None
+            c = marshal.loads(entry["bytecode"])
+            linkedinstances = {k:extractfield(objects[i]) for k,i in entry["linkedinstances"].items()}
+            userfunction = {k:objects[i] for k,i in entry["userfunction"].items()}
+        except Exception:
+            return None
+        if filename:
+            with open(filename, "wt") as f:
+                f.write(entry["source"])
+        return self._compilemodule(entry["source"], entry["modulename"], c, linkedinstances, userfunction)
+
     def _compileinstance(self, code):
         """Used internally."""
         if id(self) in code.linkedinstances:
@@ -585,30 +1113,72 @@ class Construct(object):
         code.linkedinstances[id(self)] = field
         code.linkedparsers[id(self)] = field._parse
         code.linkedbuilders[id(self)] = field._build
+        code.linkedsizeofs[id(self)] = field._sizeof
 
     def _compileparse(self, code):
         """Used internally."""
         try:
-            if id(self) in code.parsercache:
-                return code.parsercache[id(self)]
+            key = code.key(self)
+            if key in code.parsercache:
+                return code.parsercache[key]
             emitted = self._emitparse(code)
-            code.parsercache[id(self)] = emitted
+            code.parsercache[key] = emitted
             return emitted
         except NotImplementedError:
             self._compileinstance(code)
-            return f"linkedparsers[{id(self)}](io, this, '(???)')"
+            code.fallbacks.setdefault(code.key(self), (id(self), set()))[1].add("parse")
+            emitted = code.parsercache[code.key(self)] = f"linkedparsers[{id(self)}](io, this, '(???)')"
+            return emitted
 
     def _compilebuild(self, code):
         """Used internally."""
         try:
-            if id(self) in code.buildercache:
-                return code.buildercache[id(self)]
+            key = code.key(self)
+            if key in code.buildercache:
+                return code.buildercache[key]
             emitted = self._emitbuild(code)
-            code.buildercache[id(self)] = emitted
+            code.buildercache[key] = emitted
             return emitted
         except NotImplementedError:
             self._compileinstance(code)
-            return f"linkedbuilders[{id(self)}](obj, io, this, '(???)')"
+            code.fallbacks.setdefault(code.key(self), (id(self), set()))[1].add("build")
+            emitted = code.buildercache[code.key(self)] = f"linkedbuilders[{id(self)}](obj, io, this, '(???)')"
+            return emitted
+
+    def _compilesizeof(self, code):
+        """Used internally."""
+        try:
+            key = code.key(self)
+            if key in code.sizeofcache:
+                return code.sizeofcache[key]
+            if usescontext(self):
+                emitted = self._emitsizeof(code)
+            else:
+                # size does not depend on context, so it gets folded into a constant, or into an error
+                try:
+                    emitted = repr(self.sizeof())
+                except SizeofError as e:
+                    code.append("""
+                        def sizeof_error(message):
+                            raise SizeofError(message)
+                    """)
+                    emitted = f"sizeof_error({repr(str(e))})"
+            code.sizeofcache[key] = emitted
+            return emitted
+        except (NotImplementedError, ConstructError):
+            self._compileinstance(code)
+            code.fallbacks.setdefault(code.key(self), (id(self), set()))[1].add("sizeof")
+            emitted = code.sizeofcache[code.key(self)] = f"linkedsizeofs[{id(self)}](this, '(???)')"
+            return emitted
+
+    def _compileparsebuffer(self, code):
+        """Used internally."""
+        key = code.key(self)
+        if key in code.bufferparsercache:
+            return code.bufferparsercache[key]
+        emitted = self._emitparsebuffer(code)
+        code.bufferparsercache[key] = emitted
+        return emitted
 
     def _emitparse(self, code):
         """Override in your subclass."""
@@ -618,6 +1188,15 @@ class Construct(object):
         """Override in your subclass."""
         raise NotImplementedError
 
+    def _emitsizeof(self, code):
+        """Override in your subclass. Returns an expression that computes the size from the context, used only when the size is not constant."""
+        raise NotImplementedError
+
+    def _emitparsebuffer(self, code):
+        """Override in your subclass. Returns an expression that parses from memoryview buf at offset off, and advances off. Default implementation uses the stream parser, on io positioned at off."""
+        code.bufferfallback = True
+        return f"(io.seek(off), {self._compileparse(code)}, (off := io.tell()))[1]"
+
     def benchmark(self, sampledata, filename=None):
         """
         Measures performance of your construct (its parsing and building runtime), both for the original instance and the compiled instance. Uses timeit module, over at min 1 loop, and at max over 100 millisecond time.
@@ -809,6 +1388,12 @@ class Subconstruct(Construct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        # only subclasses that do not compute their own size
+        if type(self)._sizeof is not Subconstruct._sizeof:
+            raise NotImplementedError
+        return self.subcon._compilesizeof(code)
+
 
 class Adapter(Subconstruct):
     r"""
@@ -872,7 +1457,7 @@ class Tunnel(Subconstruct):
     def _parse(self, stream, context, path):
         data = stream_read_entire(stream, path)  # reads entire stream
         data = self._decode(data, context, path)
-        return self.subcon.parse(data, **context)
+        return self.subcon._parsereport(io.BytesIO(data), context, path)
 
     def _build(self, obj, stream, context, path):
         stream2 = io.BytesIO()
@@ -891,16 +1476,58 @@ class Tunnel(Subconstruct):
     def _encode(self, data, context, path):
         raise NotImplementedError
 
+    def _emitdecode(self, code, data):
+        """Override in your subclass. Returns an expression that decodes data expression. Default implementation calls _decode of the (linked) instance."""
+        self._compileinstance(code)
+        return f"linkedinstances[{id(self)}]._decode({data}, this, '(???)')"
+
+    def _emitencode(self, code, data):
+        """Override in your subclass. Returns an expression that encodes data expression. Default implementation calls _encode of the (linked) instance."""
+        self._compileinstance(code)
+        return f"linkedinstances[{id(self)}]._encode({data}, this, '(???)')"
+
+    def _emitparse(self, code):
+        return f"{emitparsefrom(code, 'tunnel', self.subcon)}(BytesIO({self._emitdecode(code, 'io.read()')}), this)"
+
+    def _emitbuild(self, code):
+        fname = f"build_tunnel_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                stream = io
+                io = BytesIO()
+                {self.subcon._compilebuild(code)}
+                data = io.getvalue()
+                stream.write({self._emitencode(code, 'data')})
+                return obj
+        """)
+        return f"{fname}(obj, io, this)"
+
 
 class Compiled(Construct):
     """Used internally."""
 
-    def __init__(self, parsefunc, buildfunc):
+    def __init__(self, parsefunc, buildfunc, parsebufferfunc=None, sizeoffunc=None):
         super().__init__()
         self.source = None
         self.defersubcon = None
         self.parsefunc = parsefunc
         self.buildfunc = buildfunc
+        self.parsebufferfunc = parsebufferfunc
+        self.sizeoffunc = sizeoffunc
+
+    def parse(self, data, **contextkw):
+        # in-memory buffers are parsed in place, using unpack_from and offsets instead of a stream
+        if self.parsebufferfunc is None or not isinstance(data, (bytes, bytearray, memoryview)):
+            return super().parse(data, **contextkw)
+        context = Container(**contextkw)
+        context._parsing = True
+        context._building = False
+        context._sizing = False
+        context._params = context
+        try:
+            return self.parsebufferfunc(data, context)
+        except CancelParsing:
+            pass
 
     def _parse(self, stream, context, path):
         return self.parsefunc(stream, context)
@@ -909,9 +1536,13 @@ class Compiled(Construct):
         return self.buildfunc(obj, stream, context)
 
     def _sizeof(self, context, path):
-        return self.defersubcon._sizeof(context, path)
+        if self.sizeoffunc is None:
+            return self.defersubcon._sizeof(context, path)
+        return self.sizeoffunc(context)
 
-    def compile(self, filename=None):
+    def compile(self, filename=None, cachedir=None, report=False, sampledata=None):
+        if report:
+            return self.defersubcon.compile(filename, cachedir, report, sampledata)
         return self
 
     def benchmark(self, sampledata, filename=None):
@@ -985,6 +1616,12 @@ class Bytes(Construct):
     def _emitbuild(self, code):
         return f"(io.write(obj), obj)[1]"
 
+    def _emitsizeof(self, code):
+        return emitsizeofparam(self.length)
+
+    def _emitparsebuffer(self, code):
+        return emitbufferbytes(code, self.length)
+
     def _emitfulltype(self, ksy, bitwise):
         return dict(size=self.length)
 
@@ -1066,6 +1703,21 @@ def Bitwise(subcon):
         macro = Transformed(subcon, bytes2bits, size//8, bits2bytes, size//8)
     except SizeofError:
         macro = Restreamed(subcon, bytes2bits, 1, bits2bytes, 8, lambda n: n//8)
+    else:
+        # fixed-size span of BitsInteger Flag Padding fields compiles into shifts and masks
+        # over one integer, other subcons compile as Transformed does
+        def _emitparse(code):
+            try:
+                return _emitbitwiseparse(subcon, size, code)
+            except NotImplementedError:
+                return Transformed._emitparse(macro, code)
+        def _emitbuild(code):
+            try:
+                return _emitbitwisebuild(subcon, size, code)
+            except NotImplementedError:
+                return Transformed._emitbuild(macro, code)
+        macro._emitparse = _emitparse
+        macro._emitbuild = _emitbuild
     def _emitseq(ksy, bitwise):
         return subcon._compileseq(ksy, bitwise=True)
     def _emitprimitivetype(ksy, bitwise):
@@ -1078,6 +1730,143 @@ def Bitwise(subcon):
     return macro
 
 
+def _bitfields(subcon):
+    """Used internally. Lists (name, kind, bits, construct) of a BitsInteger Flag or Padding, or a flat Struct of them, raises NotImplementedError otherwise."""
+    def field(sc):
+        name = sc.name
+        while isinstance(sc, Renamed):
+            if sc.parsed is not None:
+                raise NotImplementedError
+            sc = sc.subcon
+        if isinstance(sc, BitsInteger):
+            if not isinstance(sc.length, int) or not isinstance(sc.swapped, bool) or not isinstance(sc.signed, bool):
+                raise NotImplementedError
+            if sc.length <= 0 or (sc.swapped and sc.length % 8):
+                raise NotImplementedError
+            return (name, "int", sc.length, sc)
+        if sc is Flag:
+            return (name, "flag", 1, sc)
+        if isinstance(sc, Padded) and sc.subcon is Pass and isinstance(sc.length, int) and sc.pattern in (b"\x00", b"\x01"):
+            return (name, "padding", sc.length, sc)
+        raise NotImplementedError
+    if isinstance(subcon, Struct):
+        return [field(sc) for sc in subcon.subcons]
+    return [field(subcon)]
+
+
+def _emitbitwiseparse(subcon, size, code):
+    """Used internally."""
+    if size % 8:
+        raise NotImplementedError
+    fields = _bitfields(subcon)
+    fname = f"parse_bitwise_{code.allocateId()}"
+    block = f"""
+        def {fname}(io, this):
+            data = io.read({size//8})
+            if len(data) != {size//8}:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % ({size//8}, len(data)))
+            bits = int.from_bytes(data, 'big')
+    """
+    if isinstance(subcon, Struct):
+        block += f"""
+            result = Container()
+        """
+    shift = size
+    for name,kind,length,sc in fields:
+        shift -= length
+        if kind == "int":
+            value = f"((bits >> {shift}) & {(1<<length)-1})"
+            if sc.swapped:
+                value = f"int.from_bytes({value}.to_bytes({length//8}, 'big'), 'little')"
+            if sc.signed:
+                value = f"(({value} ^ {1<<(length-1)}) - {1<<(length-1)})"
+        elif kind == "flag":
+            value = f"((bits >> {shift}) & 1 == 1)"
+        else:
+            value = "None"
+        if not isinstance(subcon, Struct):
+            block += f"""
+            return {value}
+            """
+        elif name:
+            block += f"""
+            result[{repr(name)}] = {value}
+            """
+    if isinstance(subcon, Struct):
+        block += f"""
+            return result
+        """
+    code.append(block)
+    return f"{fname}(io, this)"
+
+
+def _emitbitwisebuild(subcon, size, code):
+    """Used internally."""
+    if size % 8:
+        raise NotImplementedError
+    fields = _bitfields(subcon)
+    code.append("""
+        def build_bitsinteger(obj, length, signed, swapped):
+            if not isinstance(obj, int):
+                raise IntegerError(f"value {obj} is not an integer")
+            if signed:
+                if not -(1 << (length-1)) <= obj < (1 << (length-1)):
+                    raise IntegerError(f"number {obj} does not fit {length} bits signed")
+                obj &= (1 << length) - 1
+            elif not 0 <= obj < (1 << length):
+                raise IntegerError(f"number {obj} does not fit {length} bits unsigned")
+            if swapped:
+                obj = int.from_bytes(obj.to_bytes(length//8, 'little'), 'big')
+            return obj
+    """)
+    fname = f"build_bitwise_{code.allocateId()}"
+    block = f"""
+        def {fname}(obj, io, this):
+            bits = 0
+    """
+    if isinstance(subcon, Struct):
+        block += f"""
+            this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
+            this['_root'] = this['_'].get('_root', this)
+            this.update(obj)
+            objdict = obj
+        """
+    shift = size
+    for name,kind,length,sc in fields:
+        shift -= length
+        if isinstance(subcon, Struct):
+            block += f"""
+            obj = {f'objdict.get({repr(name)}, None)' if sc.flagbuildnone else f'objdict[{repr(name)}]'}
+            """
+            if name:
+                block += f"""
+            this[{repr(name)}] = obj
+                """
+        if kind == "int":
+            block += f"""
+            bits |= build_bitsinteger(obj, {length}, {sc.signed}, {sc.swapped}) << {shift}
+            """
+        elif kind == "flag":
+            block += f"""
+            if obj:
+                bits |= {1 << shift}
+            """
+        elif sc.pattern == b"\x01":
+            block += f"""
+            bits |= {((1<<length)-1) << shift}
+            """
+        if kind == "padding" and isinstance(subcon, Struct) and name:
+            block += f"""
+            this[{repr(name)}] = None
+            """
+    block += f"""
+            io.write(bits.to_bytes({size//8}, 'big'))
+            return {'this' if isinstance(subcon, Struct) else 'obj'}
+    """
+    code.append(block)
+    return f"{fname}(obj, io, this)"
+
+
 def Bytewise(subcon):
     r"""
     Converts the bitstream back to normal byte stream. Must be used within :class:`~construct.core.Bitwise`.
@@ -1179,6 +1968,12 @@ class FormatField(Construct):
         code.append(f"{fname} = struct.Struct({repr(self.fmtstr)})")
         return f"{fname}.unpack(io.read({self.length}))[0]"
 
+    def _emitparsebuffer(self, code):
+        code.bufferreads += 1
+        fname = f"formatfield_{code.allocateId()}"
+        code.append(f"{fname} = struct.Struct({repr(self.fmtstr)})")
+        return f"{fname}.unpack_from(buf, (off := off + {self.length}) - {self.length})[0]"
+
     def _emitbuild(self, code):
         fname = f"formatfield_{code.allocateId()}"
         code.append(f"{fname} = struct.Struct({repr(self.fmtstr)})")
@@ -1277,7 +2072,24 @@ class BytesInteger(Construct):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
     def _emitparse(self, code):
-        return f"bytes2integer(swapbytes(io.read({self.length})) if {self.swapped} else io.read({self.length}), {self.signed})"
+        data = emitstreambytes(code, self.length)
+        return f"bytes2integer(swapbytes({data}) if {self.swapped} else {data}, {self.signed})"
+
+    def _emitsizeof(self, code):
+        return emitsizeofparam(self.length)
+
+    def _emitparsebuffer(self, code):
+        if not isinstance(self.length, int) or not isinstance(self.swapped, bool) or not isinstance(self.signed, bool) or self.length < 1:
+            return super()._emitparsebuffer(code)
+        code.bufferreads += 1
+        byteorder = "little" if self.swapped else "big"
+        code.append("""
+            def parsebuffer_bytesinteger(length, byteorder, signed, buf, off):
+                if len(buf) - off < length:
+                    raise StreamError("stream read less than specified amount, expected %d, found %d" % (length, max(len(buf) - off, 0)))
+                return int.from_bytes(buf[off:off+length], byteorder, signed=signed), off+length
+        """)
+        return emitbuffercall(f"parsebuffer_bytesinteger({self.length}, {repr(byteorder)}, {self.signed}, buf, off)")
 
     def _emitbuild(self, code):
         return f"((io.write(swapbytes(integer2bytes(obj, {self.length}, {self.signed})) if ({self.swapped}) else integer2bytes(obj, {self.length}, {self.signed}))), obj)[1]"
@@ -1618,15 +2430,29 @@ class VarInt(Construct):
     """
 
     def _parse(self, stream, context, path):
-        acc = []
+        data = stream_read(stream, 1, path)
+        if data[0] < 0x80:
+            return data[0]
+        if not isinstance(stream, io.BytesIO):
+            # other streams may block or fail when reading past the end, like RebufferedBytesIO
+            while data[-1] & 0x80:
+                data += stream_read(stream, 1, path)
+            return varint2integer(data)[0]
+        # in-memory stream: read ahead in bounded chunks and decode from the buffer, then seek back to just after the terminal byte
+        offset = stream_tell(stream, path) - 1
         while True:
-            b = byte2int(stream_read(stream, 1, path))
-            acc.append(b & 0b01111111)
-            if b & 0b10000000 == 0:
+            try:
+                chunk = stream.read(9)
+            except Exception:
+                raise StreamError("stream.read() failed, requested 9 bytes", path=path)
+            data += chunk
+            try:
+                num, end = varint2integer(data)
                 break
-        num = 0
-        for b in reversed(acc):
-            num = (num << 7) | b
+            except ValueError:
+                if len(chunk) < 9:
+                    raise StreamError("stream read less than specified amount, VarInt is missing terminal byte", path=path)
+        stream_seek(stream, offset + end, 0, path)
         return num
 
     def _build(self, obj, stream, context, path):
@@ -1634,15 +2460,34 @@ class VarInt(Construct):
             raise IntegerError(f"value {obj} is not an integer", path=path)
         if obj < 0:
             raise IntegerError(f"VarInt cannot build from negative number {obj}", path=path)
-        x = obj
-        B = bytearray()
-        while x > 0b01111111:
-            B.append(0b10000000 | (x & 0b01111111))
-            x >>= 7
-        B.append(x)
-        stream_write(stream, bytes(B), len(B), path)
+        data = integer2varint(obj)
+        stream_write(stream, data, len(data), path)
         return obj
 
+    def _emitparse(self, code):
+        code.append("""
+            def parse_varint(io):
+                data = io.read(1)
+                if data[0] < 0x80:
+                    return data[0]
+                data += io.read(9)
+                while True:
+                    try:
+                        num, end = varint2integer(data)
+                        break
+                    except ValueError:
+                        chunk = io.read(9)
+                        if not chunk:
+                            raise StreamError("stream read less than specified amount, VarInt is missing terminal byte")
+                        data += chunk
+                io.seek(end - len(data), 1)
+                return num
+        """)
+        return "parse_varint(io)"
+
+    def _emitbuild(self, code):
+        return "(io.write(integer2varint(obj)), obj)[1]"
+
     def _emitprimitivetype(self, ksy, bitwise):
         return "vlq_base128_le"
 
@@ -1685,6 +2530,16 @@ class ZigZag(Construct):
         VarInt._build(x, stream, context, path)
         return obj
 
+    def _emitparse(self, code):
+        code.append("""
+            def parse_zigzag(x):
+                return (x >> 1) ^ -(x & 1)
+        """)
+        return f"parse_zigzag({VarInt._compileparse(code)})"
+
+    def _emitbuild(self, code):
+        return "(io.write(integer2varint(2*obj if obj >= 0 else -2*obj-1)), obj)[1]"
+
 
 #===============================================================================
 # strings
@@ -1734,14 +2589,51 @@ class StringEncoded(Adapter):
             raise StringError(f"cannot use encoding {self.encoding!r} to encode {obj!r}")
 
     def _emitparse(self, code):
-        raise NotImplementedError
-        # Not sure what the correct implementation would be.
-        # return f"({self.subcon._compileparse(code)}).decode({repr(self.encoding)})"
+        return emitstringdecode(code, self.encoding, self.subcon._compileparse(code))
+
+    def _emitparsebuffer(self, code):
+        return emitstringdecode(code, self.encoding, self.subcon._compileparsebuffer(code))
 
     def _emitbuild(self, code):
-        raise NotImplementedError
-        # This is not a valid implementation. obj.encode() should be inserted into subcon
-        # return f"({self.subcon._compilebuild(code)}).encode({repr(self.encoding)})"
+        fname = f"build_stringencoded_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                objstr = obj
+                obj = {emitstringencode(code, self.encoding)}
+                {self.subcon._compilebuild(code)}
+                return objstr
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
+
+
+def emitstringdecode(code, encoding, data):
+    """Used internally. Decodes an expression giving bytes, raising StringError like StringEncoded does."""
+    code.append("""
+        def parse_stringdecode(data, encoding):
+            try:
+                return data.decode(encoding)
+            except Exception:
+                raise StringError(f"cannot use encoding {encoding!r} to decode {data!r}")
+    """)
+    return f"parse_stringdecode({data}, {repr(encoding)})"
+
+
+def emitstringencode(code, encoding):
+    """Used internally. Encodes obj, raising StringError like StringEncoded does."""
+    # empty string encodes into empty bytes, utf16 and utf32 would otherwise emit a BOM
+    code.append("""
+        def build_stringencode(obj, encoding):
+            if not isinstance(obj, str):
+                raise StringError("string encoding failed, expected unicode string")
+            if not obj:
+                return b''
+            try:
+                return obj.encode(encoding)
+            except Exception:
+                raise StringError(f"cannot use encoding {encoding!r} to encode {obj!r}")
+    """)
+    return f"build_stringencode(obj, {repr(encoding)})"
 
 
 def PaddedString(length, encoding):
@@ -1769,6 +2661,38 @@ def PaddedString(length, encoding):
         u'Афон'
     """
     macro = StringEncoded(FixedSized(length, NullStripped(GreedyBytes, pad=encodingunit(encoding))), encoding)
+
+    def _emitparse(code):
+        pad = encodingunit(encoding)
+        if len(pad) == 1:
+            return emitstringdecode(code, encoding, f"{emitstreambytes(code, length)}.rstrip({repr(pad)})")
+        code.append("""
+            def parse_nullstripped(data, pad):
+                unit = len(pad)
+                end = len(data)
+                tailunit = end % unit
+                if tailunit and data[-tailunit:] == pad[:tailunit]:
+                    end -= tailunit
+                while end-unit >= 0 and data[end-unit:end] == pad:
+                    end -= unit
+                return data[:end]
+        """)
+        return emitstringdecode(code, encoding, f"parse_nullstripped({emitstreambytes(code, length)}, {repr(pad)})")
+    macro._emitparse = _emitparse
+
+    def _emitbuild(code):
+        code.append("""
+            def build_paddedstring(obj, data, io, length):
+                pad = length - len(data)
+                if pad < 0:
+                    raise PaddingError("subcon build %d bytes but was allowed only %d" % (len(data), length))
+                io.write(data)
+                io.write(bytes(pad))
+                return obj
+        """)
+        return f"build_paddedstring(obj, {emitstringencode(code, encoding)}, io, {length})"
+    macro._emitbuild = _emitbuild
+
     def _emitfulltype(ksy, bitwise):
         return dict(size=length, type="strz", encoding=encoding)
     macro._emitfulltype = _emitfulltype
@@ -1795,9 +2719,24 @@ def PascalString(lengthfield, encoding):
     macro = StringEncoded(Prefixed(lengthfield, GreedyBytes), encoding)
 
     def _emitparse(code):
-        return f"io.read({lengthfield._compileparse(code)}).decode({repr(encoding)})"
+        return emitstringdecode(code, encoding, f"io.read({lengthfield._compileparse(code)})")
     macro._emitparse = _emitparse
 
+    def _emitbuild(code):
+        fname = f"build_pascalstring_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                objstr = obj
+                data = {emitstringencode(code, encoding)}
+                obj = len(data)
+                {lengthfield._compilebuild(code)}
+                io.write(data)
+                return objstr
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
+    macro._emitbuild = _emitbuild
+
     def _emitseq(ksy, bitwise):
         return [
             dict(id="lengthfield", type=lengthfield._compileprimitivetype(ksy, bitwise)), 
@@ -1828,6 +2767,48 @@ def CString(encoding):
         u'Афон'
     """
     macro = StringEncoded(NullTerminated(GreedyBytes, term=encodingunit(encoding)), encoding)
+
+    def _emitparse(code):
+        code.append("""
+            def parse_nullterminated(io, term):
+                unit = len(term)
+                try:
+                    seekable = io.seekable()
+                except Exception:
+                    seekable = False
+                if not seekable:
+                    # cannot read ahead, so read one unit at a time
+                    data = b''
+                    while True:
+                        chunk = io.read(unit)
+                        if len(chunk) < unit:
+                            raise StreamError("stream read less than specified amount, expected %d, found %d" % (unit, len(chunk)))
+                        if chunk == term:
+                            return data
+                        data += chunk
+                offset = io.tell()
+                data = b''
+                start = 0
+                while True:
+                    chunk = io.read(64*unit)
+                    if not chunk:
+                        raise StreamError("stream read less than specified amount, expected %d, found 0" % unit)
+                    data += chunk
+                    index = data.find(term, start)
+                    while index >= 0 and index % unit:
+                        index = data.find(term, index+1)
+                    if index >= 0:
+                        io.seek(offset + index + unit)
+                        return data[:index]
+                    start = len(data) - len(data) % unit
+        """)
+        return emitstringdecode(code, encoding, f"parse_nullterminated(io, {repr(encodingunit(encoding))})")
+    macro._emitparse = _emitparse
+
+    def _emitbuild(code):
+        return f"(io.write({emitstringencode(code, encoding)}), io.write({repr(encodingunit(encoding))}), obj)[2]"
+    macro._emitbuild = _emitbuild
+
     def _emitfulltype(ksy, bitwise):
         return dict(type="strz", encoding=encoding)
     macro._emitfulltype = _emitfulltype
@@ -1852,6 +2833,15 @@ def GreedyString(encoding):
         u'Афон'
     """
     macro = StringEncoded(GreedyBytes, encoding)
+
+    def _emitparse(code):
+        return emitstringdecode(code, encoding, "io.read()")
+    macro._emitparse = _emitparse
+
+    def _emitbuild(code):
+        return f"(io.write({emitstringencode(code, encoding)}), obj)[1]"
+    macro._emitbuild = _emitbuild
+
     def _emitfulltype(ksy, bitwise):
         return dict(size_eos=True, type="str", encoding=encoding)
     macro._emitfulltype = _emitfulltype
@@ -1992,12 +2982,25 @@ class Enum(Adapter):
     def _emitparse(self, code):
         fname = f"factory_{code.allocateId()}"
         code.append(f"{fname} = {repr(self.decmapping)}")
-        return f"reuse(({self.subcon._compileparse(code)}), lambda x: {fname}.get(x, EnumInteger(x)))"
+        code.append(f"""
+            def parse_{fname}(x):
+                return {fname}.get(x, EnumInteger(x))
+        """)
+        return f"parse_{fname}({self.subcon._compileparse(code)})"
+
+    def _emitparsebuffer(self, code):
+        fname = f"factory_{code.allocateId()}"
+        code.append(f"{fname} = {repr(self.decmapping)}")
+        code.append(f"""
+            def parse_{fname}(x):
+                return {fname}.get(x, EnumInteger(x))
+        """)
+        return f"parse_{fname}({self.subcon._compileparsebuffer(code)})"
 
     def _emitbuild(self, code):
         fname = f"factory_{code.allocateId()}"
         code.append(f"{fname} = {repr(self.encmapping)}")
-        return f"reuse({fname}.get(obj, obj), lambda obj: ({self.subcon._compilebuild(code)}))"
+        return emitbuildfrom(code, "enum", f"{fname}.get(obj, obj)", self.subcon)
 
     def _emitprimitivetype(self, ksy, bitwise):
         name = "enum_%s" % ksy.allocateId()
@@ -2097,7 +3100,12 @@ class FlagsEnum(Adapter):
             raise MappingError("building failed, unknown label: %r" % (obj,), path=path)
 
     def _emitparse(self, code):
-        return f"reuse(({self.subcon._compileparse(code)}), lambda x: Container({', '.join(f'{k}=bool(x & {v} == {v})' for k,v in self.flags.items()) }))"
+        fname = f"parse_flagsenum_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(x):
+                return Container({', '.join(f'{k}=bool(x & {v} == {v})' for k,v in self.flags.items()) })
+        """)
+        return f"{fname}({self.subcon._compileparse(code)})"
 
     def _emitseq(self, ksy, bitwise):
         bitstotal = self.subcon.sizeof() * 8
@@ -2153,12 +3161,61 @@ class Mapping(Adapter):
     def _emitbuild(self, code):
         fname = f"factory_{code.allocateId()}"
         code.append(f"{fname} = {repr(self.encmapping)}")
-        return f"reuse({fname}[obj], lambda obj: ({self.subcon._compilebuild(code)}))"
+        return emitbuildfrom(code, "mapping", f"{fname}[obj]", self.subcon)
 
 
 #===============================================================================
 # structures and sequences
 #===============================================================================
+def usescontext(subcon):
+    """Used internally. Returns False only when neither subcon nor anything nested in it can read the context: there are no `this` expressions, lambdas or other callables (including parsed hooks), and no classes that access the context directly (like Index and Probe). Classes defined outside of this library are assumed to read it. Structs and Sequences reuse the result of their own analysis, and results for other constructs are remembered in usescontextcache."""
+    seen = set()
+    cuts = [0]
+    def walk(x):
+        if id(x) in seen:
+            cuts[0] += 1
+            return False
+        seen.add(id(x))
+        if isinstance(x, Construct):
+            result = usescontextcache.get(x)
+            if result is None:
+                before = cuts[0]
+                result = walkconstruct(x)
+                # a result that relied on a cycle being cut is not known for sure
+                if result or cuts[0] == before:
+                    usescontextcache[x] = result
+            return result
+        if isinstance(x, ExprMixin) or callable(x):
+            return True
+        if isinstance(x, (list, tuple, set, frozenset)):
+            return any(walk(v) for v in x)
+        if isinstance(x, dict):
+            return any(walk(k) or walk(v) for k,v in dict.items(x))
+        return False
+    def walkconstruct(x):
+        if isinstance(x, (Struct, Sequence)) and "_contextfree" in x.__dict__:
+            return not x._contextfree
+        cls = type(x)
+        if not cls.__module__.startswith("construct.") or cls.__module__ == "construct.debug":
+            return True
+        if x is Index or isinstance(x, (Compiled, LazyBound)):
+            return True
+        # these are called with data, not with context
+        datafuncs = ()
+        if isinstance(x, Transformed):
+            datafuncs = ("decodefunc", "encodefunc")
+        if isinstance(x, Restreamed):
+            datafuncs = ("decoder", "encoder", "sizecomputer")
+        if isinstance(x, Checksum):
+            datafuncs = ("hashfunc",)
+        return any(walk(v) for k,v in x.__getstate__().items() if not k.startswith("_emit") and k not in datafuncs)
+    return walk(subcon)
+
+
+#: Results of usescontext for each construct, so that nested constructs get analysed only once. Like Struct analysis, they are not updated when a construct is modified.
+usescontextcache = weakref.WeakKeyDictionary()
+
+
 class Struct(Construct):
     r"""
     Sequence of usually named constructs, similar to structs in C. The members are parsed and build in the order they are defined. If a member is anonymous (its name is None) then it gets parsed and the value discarded, or it gets build from nothing (from None).
@@ -2169,7 +3226,7 @@ class Struct(Construct):
 
     Parses into a Container (dict with attribute and key access) where keys match subcon names. Builds from a dict (not necessarily a Container) where each member gets a value from the dict matching the subcon name. If field has build-from-none flag, it gets build even when there is no matching entry in the dict. Size is the sum of all subcon sizes, unless any subcon raises SizeofError.
 
-    This class does context nesting, meaning its members are given access to a new dictionary where the "_" entry points to the outer context. When parsing, each member gets parsed and subcon parse return value is inserted into context under matching key only if the member was named. When building, the matching entry gets inserted into context before subcon gets build, and if subcon build returns a new value (not None) that gets replaced in the context.
+    This class does context nesting, meaning its members are given access to a new dictionary where the "_" entry points to the outer context. When parsing, each member gets parsed and subcon parse return value is inserted into context under matching key only if the member was named. When building, the matching entry gets inserted into context before subcon gets build, and if subcon build returns a new value (not None) that gets replaced in the context. If no member (at any depth) can read the context, meaning there are no `this` expressions, lambdas or classes like Index, then context nesting is skipped altogether, both when parsing and building and in compiled code.
 
     This class exposes subcons as attributes. You can refer to subcons that were inlined (and therefore do not exist as variable in the namespace) by accessing the struct attributes, under same name. Also note that compiler does not support this feature. See examples.
 
@@ -2223,6 +3280,7 @@ class Struct(Construct):
         self.subcons = list(subcons) + list(k/v for k,v in subconskw.items())
         self._subcons = Container((sc.name,sc) for sc in self.subcons if sc.name)
         self.flagbuildnone = all(sc.flagbuildnone for sc in self.subcons)
+        self._contextfree = not any(usescontext(sc) for sc in self.subcons)
 
     def __getattr__(self, name):
         if name in self._subcons:
@@ -2232,8 +3290,21 @@ class Struct(Construct):
     def _parse(self, stream, context, path):
         obj = Container()
         obj._io = stream
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        if self._contextfree:
+            # nested arrays still write _index into the shared context, so it gets restored for the enclosing array
+            index = context.get("_index", None)
+            try:
+                for sc in self.subcons:
+                    try:
+                        subobj = sc._parsereport(stream, context, path)
+                        if sc.name:
+                            obj[sc.name] = subobj
+                    except StopFieldError:
+                        break
+            finally:
+                context._index = index
+            return obj
+        context = ContextFrame(context, self._subcons, stream)
         for sc in self.subcons:
             try:
                 subobj = sc._parsereport(stream, context, path)
@@ -2247,8 +3318,25 @@ class Struct(Construct):
     def _build(self, obj, stream, context, path):
         if obj is None:
             obj = Container()
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        if self._contextfree:
+            result = Container(obj)
+            index = context.get("_index", None)
+            try:
+                for sc in self.subcons:
+                    try:
+                        if sc.flagbuildnone:
+                            subobj = obj.get(sc.name, None)
+                        else:
+                            subobj = obj[sc.name] # raises KeyError
+                        buildret = sc._build(subobj, stream, context, path)
+                        if sc.name:
+                            result[sc.name] = buildret
+                    except StopFieldError:
+                        break
+            finally:
+                context._index = index
+            return result
+        context = ContextFrame(context, self._subcons, stream)
         context.update(obj)
         for sc in self.subcons:
             try:
@@ -2268,26 +3356,62 @@ class Struct(Construct):
         return context
 
     def _sizeof(self, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = None, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, None)
         try:
             return sum(sc._sizeof(context, path) for sc in self.subcons)
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        fname = f"sizeof_struct_{code.allocateId()}"
+        block = f"""
+            def {fname}(this):
+                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = False, _sizing = True, _subcons = None, _io = None, _index = this.get('_index', None))
+                this['_root'] = this['_'].get('_root', this)
+                return {" + ".join(f"({sc._compilesizeof(code)})" for sc in self.subcons) or "0"}
+        """
+        code.append(block)
+        return f"{fname}(this)"
+
     def _emitparse(self, code):
         fname = f"parse_struct_{code.allocateId()}"
+        contextfree = self._contextfree
         block = f"""
             def {fname}(io, this):
                 result = Container()
+        """
+        if not contextfree:
+            block += f"""
                 this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
                 this['_root'] = this['_'].get('_root', this)
+            """
+        block += f"""
+                read = io.read
                 try:
         """
-        for sc in self.subcons:
-            block += f"""
-                    {f'result[{repr(sc.name)}] = this[{repr(sc.name)}] = ' if sc.name else ''}{sc._compileparse(code)}
-            """
+        for group in _packedgroups(self.subcons):
+            if isinstance(group, Construct):
+                sc = group
+                assign = f"result[{repr(sc.name)}] = " if contextfree else f"result[{repr(sc.name)}] = this[{repr(sc.name)}] = "
+                block += f"""
+                    {assign if sc.name else ''}{_emitstructread(code, sc) or sc._compileparse(code)}
+                """
+                continue
+            fmtstr, members = group
+            packname = f"structpack_{code.allocateId()}"
+            code.append(f"{packname} = struct.Struct({repr(fmtstr)})")
+            valued = [sc for sc,kind in members if kind != "padding"]
+            if valued:
+                trailing = "," if len(valued) == 1 else ""
+                targets1 = ", ".join(f"result[{repr(sc.name)}]" if sc.name else "unnamed" for sc in valued) + trailing
+                targets2 = ", ".join(f"this[{repr(sc.name)}]" if sc.name else "unnamed" for sc in valued) + trailing
+                block += f"""
+                    {targets1} = {'' if contextfree else f'{targets2} = '}{packname}.unpack(read({struct.calcsize(fmtstr)}))
+                """
+            else:
+                block += f"""
+                    read({struct.calcsize(fmtstr)})
+                """
         block += f"""
                     pass
                 except StopFieldError:
@@ -2299,33 +3423,192 @@ class Struct(Construct):
 
     def _emitbuild(self, code):
         fname = f"build_struct_{code.allocateId()}"
-        block = f"""
+        contextfree = self._contextfree
+        # context free structs return a plain copy of obj with build results, instead of the context
+        target = "result" if contextfree else "this"
+        if contextfree:
+            block = f"""
+            def {fname}(obj, io, this):
+                result = Container(obj)
+            """
+        else:
+            block = f"""
             def {fname}(obj, io, this):
                 this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
                 this['_root'] = this['_'].get('_root', this)
                 this.update(obj)
+            """
+        block += f"""
+                write = io.write
                 try:
                     objdict = obj
         """
-        for sc in self.subcons:
-            block += f"""
+        for group in _packedgroups(self.subcons):
+            if isinstance(group, Construct):
+                sc = group
+                block += f"""
                     {f'obj = objdict.get({repr(sc.name)}, None)' if sc.flagbuildnone else f'obj = objdict[{repr(sc.name)}]'}
-                    {f'this[{repr(sc.name)}] = obj' if sc.name else ''}
-                    {f'this[{repr(sc.name)}] = ' if sc.name else ''}{sc._compilebuild(code)}
+                    {f'this[{repr(sc.name)}] = obj' if sc.name and not contextfree else ''}
+                """
+                statement = _emitstructwrite(code, sc)
+                if statement:
+                    # obj is already in place, as build returns it unchanged
+                    block += f"""
+                    {statement}
+                    """
+                    continue
+                block += f"""
+                    {f'{target}[{repr(sc.name)}] = ' if sc.name else ''}{sc._compilebuild(code)}
+                """
+                continue
+            fmtstr, members = group
+            packname = f"structpack_{code.allocateId()}"
+            code.append(f"{packname} = struct.Struct({repr(fmtstr)})")
+            values = []
+            for i,(sc,kind) in enumerate(members):
+                if kind == "padding":
+                    continue
+                block += f"""
+                    obj_{i} = {f'objdict.get({repr(sc.name)}, None)' if sc.flagbuildnone else f'objdict[{repr(sc.name)}]'}
+                    {f'this[{repr(sc.name)}] = obj_{i}' if sc.name and not contextfree else ''}
+                """
+                if kind == "bytes":
+                    length = sc.sizeof()
+                    block += f"""
+                    if len(obj_{i}) != {length}:
+                        raise StreamError("bytes object of wrong length, expected %d, found %d" % ({length}, len(obj_{i})))
+                    """
+                values.append(f"obj_{i}")
+            block += f"""
+                    write({packname}.pack({", ".join(values)}))
             """
         block += f"""
                     pass
                 except StopFieldError:
                     pass
-                return this
+                return {target}
         """
         code.append(block)
         return f"{fname}(obj, io, this)"
 
+    def _emitparsebuffer(self, code):
+        fname = f"parsebuffer_struct_{code.allocateId()}"
+        contextfree = self._contextfree
+        block = f"""
+            def {fname}(buf, off, io, this):
+                result = Container()
+        """
+        if not contextfree:
+            block += f"""
+                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
+                this['_root'] = this['_'].get('_root', this)
+            """
+        block += f"""
+                try:
+        """
+        for group in _packedgroups(self.subcons):
+            if isinstance(group, Construct):
+                sc = group
+                assign = f"result[{repr(sc.name)}] = " if contextfree else f"result[{repr(sc.name)}] = this[{repr(sc.name)}] = "
+                block += f"""
+                    {assign if sc.name else ''}{sc._compileparsebuffer(code)}
+                """
+                continue
+            fmtstr, members = group
+            code.bufferreads += 1
+            packname = f"structpack_{code.allocateId()}"
+            code.append(f"{packname} = struct.Struct({repr(fmtstr)})")
+            valued = [sc for sc,kind in members if kind != "padding"]
+            if valued:
+                trailing = "," if len(valued) == 1 else ""
+                targets1 = ", ".join(f"result[{repr(sc.name)}]" if sc.name else "unnamed" for sc in valued) + trailing
+                targets2 = ", ".join(f"this[{repr(sc.name)}]" if sc.name else "unnamed" for sc in valued) + trailing
+                block += f"""
+                    {targets1} = {'' if contextfree else f'{targets2} = '}{packname}.unpack_from(buf, off)
+                """
+            block += f"""
+                    off += {struct.calcsize(fmtstr)}
+            """
+        block += f"""
+                    pass
+                except StopFieldError:
+                    pass
+                return result, off
+        """
+        code.append(block)
+        return emitbuffercall(f"{fname}(buf, off, io, this)")
+
     def _emitseq(self, ksy, bitwise):
         return [sc._compilefulltype(ksy, bitwise) for sc in self.subcons]
 
 
+def _packedgroups(subcons):
+    """Used internally. Splits subcons into constructs and runs of fixed-width fields (as struct format and members) that pack into one struct.Struct."""
+    def member(sc):
+        name = sc.name
+        while isinstance(sc, Renamed):
+            sc = sc.subcon
+        if isinstance(sc, FormatField):
+            return sc.fmtstr[0], sc.fmtstr[1], "field"
+        if isinstance(sc, Bytes) and isinstance(sc.length, int) and sc.length >= 0:
+            return None, f"{sc.length}s", "bytes"
+        # named padding has to be put into result in its place, so it ends a run
+        if isinstance(sc, Padded) and sc.subcon is Pass and isinstance(sc.length, int) and sc.length >= 0 and sc.pattern == b"\x00" and not name:
+            return None, f"{sc.length}x", "padding"
+        return None
+
+    groups = []
+    run = []
+    runendian = None
+    def flush():
+        if len(run) >= 2:
+            fmtstr = (runendian or "<") + "".join(fmt for sc,fmt,kind in run)
+            groups.append((fmtstr, [(sc,kind) for sc,fmt,kind in run]))
+        else:
+            groups.extend(sc for sc,fmt,kind in run)
+        run.clear()
+    for sc in subcons:
+        m = member(sc)
+        if m is None:
+            flush()
+            runendian = None
+            groups.append(sc)
+            continue
+        endian, fmt, kind = m
+        if endian is not None and runendian is not None and endian != runendian:
+            flush()
+            runendian = None
+        if endian is not None:
+            runendian = endian
+        run.append((sc, fmt, kind))
+    flush()
+    return groups
+
+
+def _emitstructread(code, sc):
+    """Used internally. Returns an expression reading a single fixed-width member using the local read function of a struct parser, or None."""
+    while isinstance(sc, Renamed):
+        sc = sc.subcon
+    if isinstance(sc, FormatField):
+        fname = f"formatfield_{code.allocateId()}"
+        code.append(f"{fname} = struct.Struct({repr(sc.fmtstr)})")
+        return f"{fname}.unpack(read({sc.length}))[0]"
+    if isinstance(sc, Bytes) and isinstance(sc.length, int):
+        return f"read({sc.length})"
+    return None
+
+
+def _emitstructwrite(code, sc):
+    """Used internally. Returns a statement writing a single FormatField member (obj) using the local write function of a struct builder, or None."""
+    while isinstance(sc, Renamed):
+        sc = sc.subcon
+    if isinstance(sc, FormatField):
+        fname = f"formatfield_{code.allocateId()}"
+        code.append(f"{fname} = struct.Struct({repr(sc.fmtstr)})")
+        return f"write({fname}.pack(obj))"
+    return None
+
+
 class Sequence(Construct):
     r"""
     Sequence of usually un-named constructs. The members are parsed and build in the order they are defined. If a member is named, its parsed value gets inserted into the context. This allows using members that refer to previous members.
@@ -2380,6 +3663,7 @@ class Sequence(Construct):
         self.subcons = list(subcons) + list(k/v for k,v in subconskw.items())
         self._subcons = Container((sc.name,sc) for sc in self.subcons if sc.name)
         self.flagbuildnone = all(sc.flagbuildnone for sc in self.subcons)
+        self._contextfree = not any(usescontext(sc) for sc in self.subcons)
 
     def __getattr__(self, name):
         if name in self._subcons:
@@ -2388,8 +3672,19 @@ class Sequence(Construct):
 
     def _parse(self, stream, context, path):
         obj = ListContainer()
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        if self._contextfree:
+            # nested arrays still write _index into the shared context, so it gets restored for the enclosing array
+            index = context.get("_index", None)
+            try:
+                for sc in self.subcons:
+                    try:
+                        obj.append(sc._parsereport(stream, context, path))
+                    except StopFieldError:
+                        break
+            finally:
+                context._index = index
+            return obj
+        context = ContextFrame(context, self._subcons, stream)
         for sc in self.subcons:
             try:
                 subobj = sc._parsereport(stream, context, path)
@@ -2403,8 +3698,20 @@ class Sequence(Construct):
     def _build(self, obj, stream, context, path):
         if obj is None:
             obj = ListContainer([None for sc in self.subcons])
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        if self._contextfree:
+            objiter = iter(obj)
+            retlist = ListContainer()
+            index = context.get("_index", None)
+            try:
+                for sc in self.subcons:
+                    try:
+                        retlist.append(sc._build(next(objiter), stream, context, path))
+                    except StopFieldError:
+                        break
+            finally:
+                context._index = index
+            return retlist
+        context = ContextFrame(context, self._subcons, stream)
         objiter = iter(obj)
         retlist = ListContainer()
         for i,sc in enumerate(self.subcons):
@@ -2423,27 +3730,43 @@ class Sequence(Construct):
         return retlist
 
     def _sizeof(self, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = None, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, None)
         try:
             return sum(sc._sizeof(context, path) for sc in self.subcons)
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitsizeof(self, code):
+        fname = f"sizeof_sequence_{code.allocateId()}"
+        block = f"""
+            def {fname}(this):
+                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = False, _sizing = True, _subcons = None, _io = None, _index = this.get('_index', None))
+                this['_root'] = this['_'].get('_root', this)
+                return {" + ".join(f"({sc._compilesizeof(code)})" for sc in self.subcons) or "0"}
+        """
+        code.append(block)
+        return f"{fname}(this)"
+
     def _emitparse(self, code):
         fname = f"parse_sequence_{code.allocateId()}"
+        contextfree = self._contextfree
         block = f"""
             def {fname}(io, this):
                 result = ListContainer()
+        """
+        if not contextfree:
+            block += f"""
                 this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
                 this['_root'] = this['_'].get('_root', this)
+            """
+        block += f"""
                 try:
         """
         for sc in self.subcons:
             block += f"""
                     result.append({sc._compileparse(code)})
             """
-            if sc.name:
+            if sc.name and not contextfree:
                 block += f"""
                     this[{repr(sc.name)}] = result[-1]
                 """
@@ -2458,10 +3781,16 @@ class Sequence(Construct):
 
     def _emitbuild(self, code):
         fname = f"build_sequence_{code.allocateId()}"
+        contextfree = self._contextfree
         block = f"""
             def {fname}(obj, io, this):
+        """
+        if not contextfree:
+            block += f"""
                 this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
                 this['_root'] = this['_'].get('_root', this)
+            """
+        block += f"""
                 try:
                     objiter = iter(obj)
                     retlist = ListContainer()
@@ -2469,10 +3798,10 @@ class Sequence(Construct):
         for sc in self.subcons:
             block += f"""
                     {f'obj = next(objiter)'}
-                    {f'this[{repr(sc.name)}] = obj' if sc.name else ''}
+                    {f'this[{repr(sc.name)}] = obj' if sc.name and not contextfree else ''}
                     {f'x = '}{sc._compilebuild(code)}
                     {f'retlist.append(x)'}
-                    {f'this[{repr(sc.name)}] = x' if sc.name else ''}
+                    {f'this[{repr(sc.name)}] = x' if sc.name and not contextfree else ''}
             """
         block += f"""
                     pass
@@ -2483,6 +3812,38 @@ class Sequence(Construct):
         code.append(block)
         return f"{fname}(obj, io, this)"
 
+    def _emitparsebuffer(self, code):
+        fname = f"parsebuffer_sequence_{code.allocateId()}"
+        contextfree = self._contextfree
+        block = f"""
+            def {fname}(buf, off, io, this):
+                result = ListContainer()
+        """
+        if not contextfree:
+            block += f"""
+                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
+                this['_root'] = this['_'].get('_root', this)
+            """
+        block += f"""
+                try:
+        """
+        for sc in self.subcons:
+            block += f"""
+                    result.append({sc._compileparsebuffer(code)})
+            """
+            if sc.name and not contextfree:
+                block += f"""
+                    this[{repr(sc.name)}] = result[-1]
+                """
+        block += f"""
+                    pass
+                except StopFieldError:
+                    pass
+                return result, off
+        """
+        code.append(block)
+        return emitbuffercall(f"{fname}(buf, off, io, this)")
+
     def _emitseq(self, ksy, bitwise):
         return [sc._compilefulltype(ksy, bitwise) for sc in self.subcons]
 
@@ -2490,6 +3851,382 @@ class Sequence(Construct):
 #===============================================================================
 # arrays ranges and repeaters
 #===============================================================================
+def _bulkfield(subcon):
+    """Used internally. Returns the FormatField or fixed-size BytesInteger that subcon is, possibly wrapped in Renamed, so that many elements can be processed at once. Returns None if subcon is something else, or there is a parsed hook on the way."""
+    while isinstance(subcon, Renamed):
+        if subcon.parsed is not None:
+            return None
+        subcon = subcon.subcon
+    if subcon.parsed is not None:
+        return None
+    if type(subcon) is FormatField:
+        return subcon
+    if type(subcon) is BytesInteger and isinstance(subcon.length, int) and subcon.length > 0 and isinstance(subcon.swapped, bool) and isinstance(subcon.signed, bool):
+        return subcon
+    return None
+
+
+def _bulkparse(field, count, stream, path):
+    """Used internally. Reads count elements of a field given by _bulkfield with one read."""
+    data = stream_read(stream, count*field.length, path)
+    if type(field) is FormatField:
+        return ListContainer(struct.unpack(f"{field.fmtstr[0]}{count}{field.fmtstr[1]}", data))
+    length = field.length
+    if length in (1, 2, 4, 8):
+        format = {1:"B", 2:"H", 4:"L", 8:"Q"}[length]
+        format = format.lower() if field.signed else format
+        return ListContainer(struct.unpack(f"{'<' if field.swapped else '>'}{count}{format}", data))
+    byteorder = "little" if field.swapped else "big"
+    signed = field.signed
+    return ListContainer([int.from_bytes(data[i:i+length], byteorder, signed=signed) for i in range(0, len(data), length)])
+
+
+def _bulkbuild(field, obj, stream, path):
+    """Used internally. Writes all elements of a field given by _bulkfield with one write. Returns False without writing anything if some element is not valid, so that elements get processed one by one, to raise the usual exception."""
+    try:
+        if type(field) is FormatField:
+            data = struct.pack(f"{field.fmtstr[0]}{len(obj)}{field.fmtstr[1]}", *obj)
+        else:
+            length = field.length
+            byteorder = "little" if field.swapped else "big"
+            signed = field.signed
+            data = b"".join([int.to_bytes(e, length, byteorder, signed=signed) for e in obj])
+    except Exception:
+        return False
+    stream_write(stream, data, len(data), path)
+    return True
+
+
+def _numpydtype(subcon, path=None):
+    """Used internally. Returns a numpy dtype description matching elements given by subcon, a string for numbers and bytes, or a dict (of names formats offsets itemsize) for a Struct. Raises FormatFieldError naming the field that has no such dtype."""
+    field = _bulkfield(subcon)
+    if type(field) is FormatField:
+        endianity, format = field.fmtstr
+        return endianity + {"B":"u1", "H":"u2", "L":"u4", "Q":"u8", "b":"i1", "h":"i2", "l":"i4", "q":"i8", "e":"f2", "f":"f4", "d":"f8", "?":"?"}[format]
+    if field is not None and field.length in (1, 2, 4, 8):
+        return ("<" if field.swapped else ">") + ("i" if field.signed else "u") + str(field.length)
+    while isinstance(subcon, Renamed) and subcon.parsed is None:
+        subcon = subcon.subcon
+    if field is None and subcon.parsed is None:
+        if type(subcon) is Bytes and isinstance(subcon.length, int) and subcon.length > 0:
+            return f"V{subcon.length}"
+        if type(subcon) is Struct:
+            names, formats, offsets, offset = [], [], [], 0
+            for sc in subcon.subcons:
+                padding = sc.subcon if isinstance(sc, Renamed) else sc
+                if type(padding) is Padded and padding.subcon is Pass and padding.pattern == b"\x00" and isinstance(padding.length, int) and padding.length >= 0:
+                    # padding is left out of the dtype, as a gap between fields
+                    offset += padding.length
+                    continue
+                fieldpath = f"{path}.{sc.name}" if path else sc.name
+                if not sc.name or sc.name in names:
+                    raise FormatFieldError(f"numpy arrays require Struct fields to have unique names, found {sc} after {names}")
+                names.append(sc.name)
+                formats.append(_numpydtype(sc, fieldpath))
+                offsets.append(offset)
+                offset += sc.sizeof()
+            if offset > 0:
+                return dict(names=names, formats=formats, offsets=offsets, itemsize=offset)
+    raise FormatFieldError(f"numpy arrays require FormatField, BytesInteger (1 2 4 8 bytes), Bytes or Struct (of such fields and Padding) elements, found {subcon}" + (f" in field {path}" if path else ""))
+
+
+def _numpyparse(dtype, count, stream, path):
+    """Used internally. Reads count elements (or as many as remain in the stream, if count is None) into a read-only numpy array, that shares memory with the data read."""
+    import numpy
+    if count is None:
+        count = max(0, stream_size(stream) - stream_tell(stream, path)) // dtype.itemsize
+    data = stream_read(stream, count*dtype.itemsize, path)
+    return numpy.frombuffer(data, dtype)
+
+
+def _numpyobjectdtype(dtype):
+    """Used internally. Returns a structured dtype like given one but with object fields, so values get converted field by field."""
+    return [(name, _numpyobjectdtype(dtype.fields[name][0]) if dtype.fields[name][0].names is not None else "O") for name in dtype.names]
+
+
+def _numpycast(source, dtype, path):
+    """Used internally. Casts a one-dimensional numpy array into given dtype, raising FormatFieldError where struct packing would fail, on values out of range or non-integer values for integer fields."""
+    import numpy
+    if dtype.names is not None:
+        if source.dtype.names is None or len(source.dtype.names) != len(dtype.names):
+            raise FormatFieldError(f"cannot convert given value to numpy dtype {dtype!r}", path=path)
+        # numpy leaves gaps between fields uninitialized, padding should be zeros
+        array = numpy.zeros(source.shape, dtype)
+        for name, sourcename in zip(dtype.names, source.dtype.names):
+            array[name] = _numpycast(source[sourcename], dtype.fields[name][0], path)
+        return array
+    try:
+        if source.dtype.kind == "O":
+            source = numpy.asarray(source.tolist())
+        kind = source.dtype.kind
+        if source.ndim != 1:
+            valid = False
+        elif not source.size:
+            valid = True
+        elif dtype.kind in "iu":
+            info = numpy.iinfo(dtype)
+            valid = kind in "iub" and info.min <= source.min() and source.max() <= info.max
+        elif dtype.kind == "f":
+            valid = kind in "iubf"
+        elif dtype.kind == "b":
+            valid = kind in "iubf"
+        else:
+            valid = kind in "SV" and source.dtype.itemsize <= dtype.itemsize
+        if valid:
+            with numpy.errstate(over="ignore"):
+                array = source.astype(dtype)
+            if dtype.kind == "f" and source.size:
+                # float32 and float16 overflow into infinity, like struct raises OverflowError
+                valid = not numpy.any(numpy.isinf(array) & numpy.isfinite(source))
+    except Exception:
+        valid = False
+    if not valid:
+        raise FormatFieldError(f"cannot convert given value to numpy dtype {dtype!r}", path=path)
+    return array
+
+
+def _numpyconvert(obj, dtype, path):
+    """Used internally. Converts a numpy array (or any sequence convertible into one) into a one-dimensional array of given dtype, checking values like struct packing does."""
+    import numpy
+    try:
+        if dtype.names is not None and not isinstance(obj, numpy.ndarray):
+            source = numpy.array(list(obj), dtype=_numpyobjectdtype(dtype))
+        else:
+            source = numpy.asarray(obj)
+    except Exception:
+        raise FormatFieldError(f"cannot convert given value to numpy dtype {dtype!r}", path=path)
+    if source.ndim != 1:
+        raise RangeError(f"expected one-dimensional array, found {source.ndim} dimensions", path=path)
+    return _numpycast(source, dtype, path)
+
+
+def _numpybuild(dtype, obj, stream, path):
+    """Used internally. Writes a numpy array (or any sequence convertible into one) as raw elements. Returns the array."""
+    array = _numpyconvert(obj, dtype, path)
+    data = array.tobytes()
+    stream_write(stream, data, len(data), path)
+    return array
+
+
+def emitnumpyarray(code, subcon):
+    """Used internally. Emits helpers of numpy arrays, shared by Array and GreedyRange, and a module level dtype of subcon. Returns name of the dtype."""
+    code.append("""
+        import numpy
+        from construct.core import _numpyconvert
+
+        def parse_numpyarray(io, count, dtype):
+            if count is None:
+                fallback = io.tell()
+                count = max(0, io.seek(0, 2) - fallback) // dtype.itemsize
+                io.seek(fallback)
+            if not 0 <= count:
+                raise RangeError("invalid count %s" % (count,))
+            data = io.read(count*dtype.itemsize)
+            if len(data) != count*dtype.itemsize:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (count*dtype.itemsize, len(data)))
+            return numpy.frombuffer(data, dtype)
+
+        def parsebuffer_numpyarray(count, dtype, buf, off):
+            if count is None:
+                count = max(0, len(buf) - off) // dtype.itemsize
+            if not 0 <= count:
+                raise RangeError("invalid count %s" % (count,))
+            if len(buf) - off < count*dtype.itemsize:
+                raise StreamError("stream read less than specified amount, expected %d, found %d" % (count*dtype.itemsize, len(buf) - off))
+            return numpy.frombuffer(buf, dtype, count, off), off+count*dtype.itemsize
+
+        def build_numpyarray(obj, io, count, dtype):
+            if count is not None:
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                if not len(obj) == count:
+                    raise RangeError("expected %d elements, found %d" % (count, len(obj)))
+            array = _numpyconvert(obj, dtype, None)
+            io.write(array.tobytes())
+            return array
+    """)
+    # built once on import, not on every call, and named after its description so equal dtypes are emitted once
+    description = repr(_numpydtype(subcon))
+    dtype = f"numpydtype_{hashlib.sha1(description.encode()).hexdigest()[:16]}"
+    code.append(f"{dtype} = numpy.dtype({description})")
+    return dtype
+
+
+def _columnarstruct(subcon):
+    """Used internally. Returns the Struct that subcon is, possibly wrapped in Renamed without hooks, or None."""
+    while isinstance(subcon, Renamed) and subcon.parsed is None:
+        subcon = subcon.subcon
+    return subcon if type(subcon) is Struct else None
+
+
+def _columnartypecode(subcon):
+    """Used internally. Returns an array.array typecode that holds every value of a numeric field, preferably of the same width, or None if the field needs a list."""
+    field = _bulkfield(subcon)
+    if type(field) is FormatField:
+        format = field.fmtstr[1]
+        if format in "fd":
+            return format
+        if format == "e":
+            return "f"
+        if format == "?":
+            return None
+        signed, length = format.islower(), field.length
+    elif field is not None and field.length <= 8:
+        signed, length = field.signed, field.length
+    else:
+        return None
+    for typecode in "BHILQ":
+        if array.array(typecode).itemsize >= length:
+            return typecode.lower() if signed else typecode
+
+
+def _columnarlayout(record):
+    """Used internally. Returns byte order, size and (name, offset, format) of fields of a record, if all its fields are FormatField or BytesInteger of 1 2 4 8 bytes of same byte order, or unnamed zero Padding. Otherwise returns None."""
+    fields, endianities, offset = [], set(), 0
+    for sc in record.subcons:
+        if not sc.name and type(sc) is Padded and sc.subcon is Pass and sc.pattern == b"\x00" and isinstance(sc.length, int) and sc.length >= 0:
+            offset += sc.length
+            continue
+        field = _bulkfield(sc)
+        if not sc.name or sc.name in [name for name,_,_ in fields] or field is None:
+            return None
+        if type(field) is FormatField:
+            endianity, format = field.fmtstr
+        elif field.length in (1, 2, 4, 8):
+            endianity = "<" if field.swapped else ">"
+            format = {1:"B", 2:"H", 4:"L", 8:"Q"}[field.length]
+            format = format.lower() if field.signed else format
+        else:
+            return None
+        fields.append((sc.name, offset, format))
+        endianities.add(endianity)
+        offset += field.length
+    if len(endianities) != 1 or offset == 0:
+        return None
+    return endianities.pop(), offset, fields
+
+
+def _columnarparse(subcon, count, numpy, stream, context, path):
+    """Used internally. Parses count records of a Struct (or as many as parse successfully, if count is None, like GreedyRange) into a Container of columns, one per named field. Numeric columns are array.array (or numpy arrays, if numpy is set), others are lists."""
+    record = _columnarstruct(subcon)
+    fields = {sc.name: sc for sc in record.subcons if sc.name}
+    columns = {name: [] for name in fields}
+    layout = _columnarlayout(record)
+    if layout is not None and count is None:
+        # records are fixed-size so their count is known from remaining length, which requires a seekable stream
+        try:
+            count = max(0, stream_size(stream) - stream_tell(stream, path)) // layout[1]
+        except StreamError:
+            pass
+    if layout is not None and count is not None:
+        endianity, size, layoutfields = layout
+        data = stream_read(stream, count*size, path)
+        for name, offset, format in layoutfields:
+            # bytes of one field in all records get gathered by strided slicing, no per-record objects are made
+            width = struct.calcsize("<" + format)
+            raw = bytearray(count*width)
+            for i in range(width):
+                raw[i::width] = data[offset+i::size]
+            typecode = _columnartypecode(fields[name])
+            if typecode and array.array(typecode).itemsize == width:
+                column = array.array(typecode, raw)
+                if endianity not in ("=", "<" if sys.byteorder == "little" else ">"):
+                    column.byteswap()
+                columns[name] = column
+            else:
+                columns[name] = struct.unpack(f"{endianity}{count}{format}", raw)
+    else:
+        appends = [(name, columns[name].append) for name in fields]
+        def parserecord(i):
+            context._index = i
+            obj = subcon._parsereport(stream, context, path)
+            for name, append in appends:
+                append(obj.get(name))
+        if count is not None:
+            for i in range(count):
+                parserecord(i)
+        else:
+            try:
+                for i in itertools.count():
+                    fallback = stream_tell(stream, path)
+                    parserecord(i)
+            except StopFieldError:
+                pass
+            except ExplicitError:
+                raise
+            except Exception:
+                stream_seek(stream, fallback, 0, path)
+                # the failed record could have appended some of its fields
+                for column in columns.values():
+                    del column[i:]
+    result = Container()
+    for name, column in columns.items():
+        typecode = _columnartypecode(fields[name])
+        try:
+            if typecode and numpy:
+                import numpy
+                result[name] = numpy.asarray(column, dtype=_numpydtype(fields[name]))
+            elif typecode and not isinstance(column, array.array):
+                result[name] = array.array(typecode, column)
+            elif typecode:
+                result[name] = column
+            else:
+                result[name] = ListContainer(column)
+        except TypeError:
+            # a StopIf left some fields unparsed
+            result[name] = ListContainer(column)
+    return result
+
+
+def _columnarbuild(subcon, count, obj, stream, context, path):
+    """Used internally. Builds records of a Struct from a dict of equally long columns, as returned by _columnarparse. Returns the columns."""
+    if not isinstance(obj, dict):
+        raise RangeError(f"expected a dict of columns, found {type(obj)}", path=path)
+    lengths = {len(column) for column in obj.values()}
+    if len(lengths) > 1:
+        raise RangeError(f"expected columns of equal length, found lengths {sorted(lengths)}", path=path)
+    length = lengths.pop() if lengths else count or 0
+    if count is not None and length != count:
+        raise RangeError("expected %d elements, found %d" % (count, length), path=path)
+    record = _columnarstruct(subcon)
+    fields = {sc.name: sc for sc in record.subcons if sc.name}
+    layout = _columnarlayout(record)
+    if layout is not None and all(name in obj for name in fields):
+        endianity, size, layoutfields = layout
+        data = bytearray(length*size)
+        try:
+            for name, offset, format in layoutfields:
+                column = obj[name]
+                width = struct.calcsize("<" + format)
+                if isinstance(column, array.array) and column.typecode == _columnartypecode(fields[name]) and column.itemsize == width:
+                    if endianity not in ("=", "<" if sys.byteorder == "little" else ">"):
+                        column = array.array(column.typecode, column)
+                        column.byteswap()
+                    raw = column.tobytes()
+                else:
+                    raw = struct.pack(f"{endianity}{length}{format}", *column)
+                for i in range(width):
+                    data[offset+i::size] = raw[i::width]
+        except Exception:
+            # records get processed one by one, to raise the usual exception
+            data = None
+        if data is not None:
+            stream_write(stream, bytes(data), len(data), path)
+            return obj
+    try:
+        for i in range(length):
+            context._index = i
+            subcon._build(Container((name, column[i]) for name, column in obj.items()), stream, context, path)
+    except StopFieldError:
+        pass
+    return obj
+
+
+def _columnarlength(columns):
+    """Used internally. Returns the amount of records in a dict of columns."""
+    return max((len(column) for column in columns.values()), default=0)
+
+
 class Array(Subconstruct):
     r"""
     Homogenous array of elements, similar to C# generic T[].
@@ -2501,10 +4238,16 @@ class Array(Subconstruct):
     :param count: integer or context lambda, strict amount of elements
     :param subcon: Construct instance, subcon to process individual elements
     :param discard: optional, bool, if set then parsing returns empty list
+    :param numpy: optional, bool, if set then parsing returns a read-only numpy array (instead of discarding or returning a list) that shares memory with the data, and building accepts a numpy array or anything convertible into one, requires subcon to be a FormatField or BytesInteger of 1 2 4 8 bytes or Bytes of fixed length, or a Struct of such fields, nested Structs and Padding, which maps into a structured dtype
+    :param columnar: optional, bool, if set then parsing returns a Container of columns (instead of a list of Containers) with one column per named field, an array.array for numeric fields (or a numpy array if numpy is also set) and a list for others, and building accepts the same, requires subcon to be a Struct
 
     :raises StreamError: requested reading negative amount, could not read enough bytes, requested writing different amount than actual data, or could not write all bytes
     :raises RangeError: specified count is not valid
     :raises RangeError: given object has different length than specified count
+    :raises FormatFieldError: numpy was set but subcon has no matching numpy dtype, or built values do not fit into it
+    :raises ImportError: numpy was set but could not be imported during ctor
+    :raises ConstructError: columnar was set but subcon is not a Struct
+    :raises RangeError: columnar was set and given columns have different lengths
 
     Can propagate any exception from the lambdas, possibly non-ConstructError.
 
@@ -2515,18 +4258,47 @@ class Array(Subconstruct):
         b'\x00\x01\x02\x03\x04'
         >>> d.parse(_)
         [0, 1, 2, 3, 4]
+
+        >>> d = Array(2, Float32l, numpy=True)
+        >>> d.parse(bytes(8))
+        array([0., 0.], dtype=float32)
+
+        >>> d = Array(2, Struct("x"/Int16ul, Padding(1), "y"/Int8ub), numpy=True)
+        >>> d.parse(b"\x01\x00\x00\x02\x03\x00\x00\x04")
+        array([(1, 2), (3, 4)], dtype={'names': ['x', 'y'], 'formats': ['<u2', 'u1'], 'offsets': [0, 3], 'itemsize': 4})
+
+        >>> d = Array(2, Struct("x"/Int16ul, "name"/PascalString(Byte, "utf8")), columnar=True)
+        >>> d.parse(b"\x01\x00\x01a\x02\x00\x01b")
+        Container(x=array('H', [1, 2]), name=ListContainer(['a', 'b']))
     """
 
-    def __init__(self, count, subcon, discard=False):
+    def __init__(self, count, subcon, discard=False, numpy=False, columnar=False):
         super().__init__(subcon)
         self.count = count
         self.discard = discard
+        self.numpy = numpy
+        self.columnar = columnar
+        if columnar and _columnarstruct(subcon) is None:
+            raise ConstructError(f"columnar arrays require Struct elements, found {subcon}")
+        if numpy and not columnar:
+            from numpy import dtype
+            # raises if elements have no numpy dtype, built once and not on every parse and build
+            self._dtype = dtype(_numpydtype(subcon))
 
     def _parse(self, stream, context, path):
         count = evaluate(self.count, context)
         if not 0 <= count:
             raise RangeError("invalid count %s" % (count,), path=path)
+        if self.columnar:
+            return _columnarparse(self.subcon, count, self.numpy, stream, context, path)
+        if self.numpy:
+            return _numpyparse(self._dtype, count, stream, path)
         discard = self.discard
+        field = _bulkfield(self.subcon)
+        if field is not None and count:
+            obj = _bulkparse(field, count, stream, path)
+            context._index = count-1
+            return ListContainer() if discard else obj
         obj = ListContainer()
         for i in range(count):
             context._index = i
@@ -2539,9 +4311,17 @@ class Array(Subconstruct):
         count = evaluate(self.count, context)
         if not 0 <= count:
             raise RangeError("invalid count %s" % (count,), path=path)
+        if self.columnar:
+            return _columnarbuild(self.subcon, count, obj, stream, context, path)
         if not len(obj) == count:
             raise RangeError("expected %d elements, found %d" % (count, len(obj)), path=path)
+        if self.numpy:
+            return _numpybuild(self._dtype, obj, stream, path)
         discard = self.discard
+        field = _bulkfield(self.subcon)
+        if field is not None and count and _bulkbuild(field, obj, stream, path):
+            context._index = count-1
+            return ListContainer() if discard else ListContainer(obj)
         retlist = ListContainer()
         for i,e in enumerate(obj):
             context._index = i
@@ -2555,13 +4335,132 @@ class Array(Subconstruct):
             count = evaluate(self.count, context)
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
+        if not 0 <= count:
+            raise RangeError("invalid count %s" % (count,), path=path)
         return count * self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        code.append("""
+            def sizeof_count(count):
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                return count
+        """)
+        return f"sizeof_count({emitsizeofparam(self.count)}) * ({self.subcon._compilesizeof(code)})"
+
     def _emitparse(self, code):
-        return f"ListContainer(({self.subcon._compileparse(code)}) for i in range({self.count}))"
+        if self.columnar:
+            # columns are collected by the interpreter
+            raise NotImplementedError
+        if self.numpy:
+            dtype = emitnumpyarray(code, self.subcon)
+            return f"parse_numpyarray(io, {self.count}, {dtype})"
+        if isinstance(self.subcon, FormatField):
+            # all elements unpack with one struct call
+            endianity, format = self.subcon.fmtstr
+            if isinstance(self.count, int) and self.count >= 0:
+                if self.discard:
+                    return f"(io.read({self.count*self.subcon.length}), ListContainer())[1]"
+                fname = f"formatarray_{code.allocateId()}"
+                code.append(f"{fname} = struct.Struct({repr(f'{endianity}{self.count}{format}')})")
+                return f"ListContainer({fname}.unpack(io.read({self.count*self.subcon.length})))"
+            code.append("""
+                def parse_formatarray(io, count, endianity, format, length, discard):
+                    if not 0 <= count:
+                        raise RangeError("invalid count %s" % (count,))
+                    items = struct.unpack(f"{endianity}{count}{format}", io.read(count*length))
+                    return ListContainer() if discard else ListContainer(items)
+            """)
+            return f"parse_formatarray(io, {self.count}, {repr(endianity)}, {repr(format)}, {self.subcon.length}, {self.discard})"
+        fname = f"parse_array_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
+                count = {self.count}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                result = ListContainer()
+                append = result.append
+                for i in range(count):
+                    {'' if self.discard else 'append('}{self.subcon._compileparse(code)}{'' if self.discard else ')'}
+                return result
+        """)
+        return f"{fname}(io, this)"
+
+    def _emitparsebuffer(self, code):
+        if self.columnar:
+            return super()._emitparsebuffer(code)
+        if self.numpy:
+            # a view into the buffer, nothing gets copied
+            code.bufferreads += 1
+            dtype = emitnumpyarray(code, self.subcon)
+            return emitbuffercall(f"parsebuffer_numpyarray({self.count}, {dtype}, buf, off)")
+        if isinstance(self.subcon, FormatField):
+            code.bufferreads += 1
+            endianity, format = self.subcon.fmtstr
+            if isinstance(self.count, int) and self.count >= 0:
+                size = self.count*self.subcon.length
+                if self.discard:
+                    return f"((off := off + {size}), ListContainer())[1]"
+                fname = f"formatarray_{code.allocateId()}"
+                code.append(f"{fname} = struct.Struct({repr(f'{endianity}{self.count}{format}')})")
+                return f"ListContainer({fname}.unpack_from(buf, (off := off + {size}) - {size}))"
+            code.append("""
+                def parsebuffer_formatarray(count, endianity, format, length, discard, buf, off):
+                    if not 0 <= count:
+                        raise RangeError("invalid count %s" % (count,))
+                    items = struct.unpack_from(f"{endianity}{count}{format}", buf, off)
+                    return (ListContainer() if discard else ListContainer(items)), off+count*length
+            """)
+            return emitbuffercall(f"parsebuffer_formatarray({self.count}, {repr(endianity)}, {repr(format)}, {self.subcon.length}, {self.discard}, buf, off)")
+        # a loop in its own function, because assignments from a comprehension would turn off into a cell variable
+        fname = f"parsebuffer_array_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(buf, off, io, this):
+                count = {self.count}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                result = ListContainer()
+                append = result.append
+                for i in range(count):
+                    {'' if self.discard else 'append('}{self.subcon._compileparsebuffer(code)}{'' if self.discard else ')'}
+                return result, off
+        """)
+        return emitbuffercall(f"{fname}(buf, off, io, this)")
 
     def _emitbuild(self, code):
-        return f"ListContainer(reuse(obj[i], lambda obj: ({self.subcon._compilebuild(code)})) for i in range({self.count}))"
+        if self.columnar:
+            raise NotImplementedError
+        if self.numpy:
+            dtype = emitnumpyarray(code, self.subcon)
+            return f"build_numpyarray(obj, io, {self.count}, {dtype})"
+        if isinstance(self.subcon, FormatField):
+            # all elements pack with one struct call
+            endianity, format = self.subcon.fmtstr
+            code.append("""
+                def build_formatarray(obj, io, count, endianity, format):
+                    if not 0 <= count:
+                        raise RangeError("invalid count %s" % (count,))
+                    if not len(obj) == count:
+                        raise RangeError("expected %d elements, found %d" % (count, len(obj)))
+                    io.write(struct.pack(f"{endianity}{count}{format}", *obj))
+                    return ListContainer(obj)
+            """)
+            return f"build_formatarray(obj, io, {self.count}, {repr(endianity)}, {repr(format)})"
+        fname = f"build_array_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                count = {self.count}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                if not len(obj) == count:
+                    raise RangeError("expected %d elements, found %d" % (count, len(obj)))
+                retlist = ListContainer()
+                append = retlist.append
+                for obj in obj:
+                    {'' if self.discard else 'append('}{self.subcon._compilebuild(code)}{'' if self.discard else ')'}
+                return retlist
+        """)
+        return f"{fname}(obj, io, this)"
 
     def _emitfulltype(self, ksy, bitwise):
         return dict(type=self.subcon._compileprimitivetype(ksy, bitwise), repeat="expr", repeat_expr=self.count)
@@ -2577,9 +4476,13 @@ class GreedyRange(Subconstruct):
 
     :param subcon: Construct instance, subcon to process individual elements
     :param discard: optional, bool, if set then parsing returns empty list
+    :param numpy: optional, bool, if set then parsing returns a numpy array, see :class:`~construct.core.Array`
+    :param columnar: optional, bool, if set then parsing returns a Container of columns, see :class:`~construct.core.Array`
 
     :raises StreamError: requested reading negative amount, could not read enough bytes, requested writing different amount than actual data, or could not write all bytes
     :raises StreamError: stream is not seekable and tellable
+    :raises FormatFieldError: numpy was set but subcon has no matching numpy dtype, or built values do not fit into it
+    :raises ConstructError: columnar was set but subcon is not a Struct
 
     Can propagate any exception from the lambdas, possibly non-ConstructError.
 
@@ -2592,12 +4495,35 @@ class GreedyRange(Subconstruct):
         [0, 1, 2, 3, 4, 5, 6, 7]
     """
 
-    def __init__(self, subcon, discard=False):
+    def __init__(self, subcon, discard=False, numpy=False, columnar=False):
         super().__init__(subcon)
         self.discard = discard
+        self.numpy = numpy
+        self.columnar = columnar
+        if columnar and _columnarstruct(subcon) is None:
+            raise ConstructError(f"columnar arrays require Struct elements, found {subcon}")
+        if numpy and not columnar:
+            from numpy import dtype
+            # raises if elements have no numpy dtype, built once and not on every parse and build
+            self._dtype = dtype(_numpydtype(subcon))
 
     def _parse(self, stream, context, path):
+        if self.columnar:
+            return _columnarparse(self.subcon, None, self.numpy, stream, context, path)
+        if self.numpy:
+            return _numpyparse(self._dtype, None, stream, path)
         discard = self.discard
+        field = _bulkfield(self.subcon)
+        if field is not None:
+            # elements are fixed-size so their count is known from remaining length, which requires a seekable stream
+            try:
+                count = max(0, stream_size(stream) - stream_tell(stream, path)) // field.length
+            except StreamError:
+                count = None
+            if count is not None:
+                obj = _bulkparse(field, count, stream, path) if count else ListContainer()
+                context._index = count
+                return ListContainer() if discard else obj
         obj = ListContainer()
         try:
             for i in itertools.count():
@@ -2614,21 +4540,105 @@ class GreedyRange(Subconstruct):
             stream_seek(stream, fallback, 0, path)
         return obj
 
-    def _build(self, obj, stream, context, path):
-        discard = self.discard
-        try:
-            retlist = ListContainer()
-            for i,e in enumerate(obj):
-                context._index = i
-                buildret = self.subcon._build(e, stream, context, path)
-                if not discard:
-                    retlist.append(buildret)
-            return retlist
-        except StopFieldError:
-            pass
+    def _build(self, obj, stream, context, path):
+        if self.columnar:
+            return _columnarbuild(self.subcon, None, obj, stream, context, path)
+        if self.numpy:
+            return _numpybuild(self._dtype, obj, stream, path)
+        discard = self.discard
+        field = _bulkfield(self.subcon)
+        if field is not None and isinstance(obj, (list, tuple)) and obj and _bulkbuild(field, obj, stream, path):
+            context._index = len(obj)-1
+            return ListContainer() if discard else ListContainer(obj)
+        try:
+            retlist = ListContainer()
+            for i,e in enumerate(obj):
+                context._index = i
+                buildret = self.subcon._build(e, stream, context, path)
+                if not discard:
+                    retlist.append(buildret)
+            return retlist
+        except StopFieldError:
+            pass
+
+    def _sizeof(self, context, path):
+        raise SizeofError(path=path)
+
+    def _emitparse(self, code):
+        if self.columnar:
+            raise NotImplementedError
+        if self.numpy:
+            dtype = emitnumpyarray(code, self.subcon)
+            return f"parse_numpyarray(io, None, {dtype})"
+        try:
+            size = self.subcon.sizeof()
+        except (SizeofError, KeyError, AttributeError):
+            size = None
+        fname = f"parse_greedyrange_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                list_ = ListContainer()
+                fallback = io.tell()
+                end = io.seek(0, 2)
+                io.seek(fallback)
+                try:
+        """
+        # fixed-size elements: count is known from remaining length, so generated reads
+        # (which do not verify amount of bytes read) never see a partial element
+        if size:
+            block += f"""
+                    for i in range((end - fallback) // {size}):
+                        fallback = io.tell()
+            """
+        else:
+            block += f"""
+                    while True:
+                        fallback = io.tell()
+                        if fallback == end:
+                            break
+            """
+        block += f"""
+                        obj_ = {self.subcon._compileparse(code)}
+                        {'pass' if self.discard else 'list_.append(obj_)'}
+                except StopFieldError:
+                    pass
+                except ExplicitError:
+                    raise
+                except Exception:
+                    io.seek(fallback)
+                return list_
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitparsebuffer(self, code):
+        if not self.numpy or self.columnar:
+            return super()._emitparsebuffer(code)
+        code.bufferreads += 1
+        dtype = emitnumpyarray(code, self.subcon)
+        return emitbuffercall(f"parsebuffer_numpyarray(None, {dtype}, buf, off)")
 
-    def _sizeof(self, context, path):
-        raise SizeofError(path=path)
+    def _emitbuild(self, code):
+        if self.columnar:
+            raise NotImplementedError
+        if self.numpy:
+            dtype = emitnumpyarray(code, self.subcon)
+            return f"build_numpyarray(obj, io, None, {dtype})"
+        fname = f"build_greedyrange_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                objiter = obj
+                list_ = ListContainer()
+                try:
+                    for obj in objiter:
+                        obj_ = {self.subcon._compilebuild(code)}
+                        {'pass' if self.discard else 'list_.append(obj_)'}
+                    return list_
+                except StopFieldError:
+                    pass
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
 
     def _emitfulltype(self, ksy, bitwise):
         return dict(type=self.subcon._compileprimitivetype(ksy, bitwise), repeat="eos")
@@ -2786,6 +4796,12 @@ class Renamed(Subconstruct):
     def _emitbuild(self, code):
         return self.subcon._compilebuild(code)
 
+    def _emitsizeof(self, code):
+        return self.subcon._compilesizeof(code)
+
+    def _emitparsebuffer(self, code):
+        return self.subcon._compileparsebuffer(code)
+
     def _emitseq(self, ksy, bitwise):
         return self.subcon._compileseq(ksy, bitwise)
 
@@ -2856,6 +4872,9 @@ class Const(Subconstruct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        return self.subcon._compilesizeof(code)
+
     def _emitparse(self, code):
         code.append(f"""
             def parse_const(value, expected):
@@ -2864,11 +4883,20 @@ class Const(Subconstruct):
         """)
         return f"parse_const({self.subcon._compileparse(code)}, {repr(self.value)})"
 
+    def _emitparsebuffer(self, code):
+        self._emitparse(code)
+        return f"parse_const({self.subcon._compileparsebuffer(code)}, {repr(self.value)})"
+
     def _emitbuild(self, code):
+        code.append(f"""
+            def build_const(obj, expected):
+                if obj not in (None, expected): raise ConstError
+                return expected
+        """)
         if isinstance(self.value, bytes):
-            return f"(io.write({repr(self.value)}), {repr(self.value)})[1]"
+            return f"(io.write(build_const(obj, {repr(self.value)})), {repr(self.value)})[1]"
         else:
-            return f"reuse({repr(self.value)}, lambda obj: {self.subcon._compilebuild(code)})"
+            return emitbuildfrom(code, "const", f"build_const(obj, {repr(self.value)})", self.subcon)
 
     def _emitfulltype(self, ksy, bitwise):
         data = self.subcon.build(self.value)
@@ -2923,12 +4951,18 @@ class Computed(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
         return repr(self.func)
 
     def _emitbuild(self, code):
         return repr(self.func)
 
+    def _emitparsebuffer(self, code):
+        return repr(self.func)
+
 
 @singleton
 class Index(Construct):
@@ -2971,6 +5005,9 @@ class Index(Construct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
 
 class Rebuild(Subconstruct):
     r"""
@@ -3011,11 +5048,11 @@ class Rebuild(Subconstruct):
 
     def _emitbuild(self, code):
         if isinstance(self.func, ExprMixin) or (not callable(self.func)):
-            return f"reuse({repr(self.func)}, lambda obj: ({self.subcon._compilebuild(code)}))"
+            return emitbuildfrom(code, "rebuild", repr(self.func), self.subcon)
         else:
             aid = code.allocateId()
             code.userfunction[aid] = self.func
-            return f"reuse(userfunction[{aid}](this), lambda obj: ({self.subcon._compilebuild(code)}))"
+            return emitbuildfrom(code, "rebuild", f"userfunction[{aid}](this)", self.subcon)
 
     def _emitseq(self, ksy, bitwise):
         return self.subcon._compileseq(ksy, bitwise)
@@ -3066,7 +5103,7 @@ class Default(Subconstruct):
         return self.subcon._compileparse(code)
 
     def _emitbuild(self, code):
-        return f"reuse({repr(self.value)} if obj is None else obj, lambda obj: ({self.subcon._compilebuild(code)}))"
+        return emitbuildfrom(code, "default", f"{repr(self.value)} if obj is None else obj", self.subcon)
 
     def _emitseq(self, ksy, bitwise):
         return self.subcon._compileseq(ksy, bitwise)
@@ -3234,8 +5271,7 @@ class FocusedSeq(Construct):
         raise AttributeError
 
     def _parse(self, stream, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, stream)
         parsebuildfrom = evaluate(self.parsebuildfrom, context)
         for i,sc in enumerate(self.subcons):
             parseret = sc._parsereport(stream, context, path)
@@ -3246,8 +5282,7 @@ class FocusedSeq(Construct):
         return finalret
 
     def _build(self, obj, stream, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, stream)
         parsebuildfrom = evaluate(self.parsebuildfrom, context)
         context[parsebuildfrom] = obj
         for i,sc in enumerate(self.subcons):
@@ -3259,8 +5294,7 @@ class FocusedSeq(Construct):
         return finalret
 
     def _sizeof(self, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = None, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, None)
         try:
             return sum(sc._sizeof(context, path) for sc in self.subcons)
         except (KeyError, AttributeError):
@@ -3294,21 +5328,24 @@ class FocusedSeq(Construct):
             def {fname}(obj, io, this):
                 this = Container(_ = this, _params = this['_params'], _root = None, _parsing = False, _building = True, _sizing = False, _subcons = None, _io = io, _index = this.get('_index', None))
                 this['_root'] = this['_'].get('_root', this)
-                try:
-                    this[{repr(self.parsebuildfrom)}] = obj
-                    finalobj = obj
+                parsebuildfrom = {repr(self.parsebuildfrom)}
+                this[parsebuildfrom] = obj
+                finalobj = obj
         """
         for sc in self.subcons:
+            # name can be compared at compile time, unless parsebuildfrom is an expression
+            if isinstance(self.parsebuildfrom, str):
+                isfocus = repr(sc.name == self.parsebuildfrom)
+            else:
+                isfocus = f"{repr(sc.name)} == parsebuildfrom"
             block += f"""
-                    {f'obj = {"finalobj" if sc.name == self.parsebuildfrom else "None"}'}
-                    {f'buildret = '}{sc._compilebuild(code)}
-                    {f'this[{repr(sc.name)}] = buildret' if sc.name else ''}
-                    {f'{"finalret = buildret" if sc.name == self.parsebuildfrom else ""}'}
+                obj = finalobj if {isfocus} else None
+                buildret = {sc._compilebuild(code)}
+                {f'this[{repr(sc.name)}] = buildret' if sc.name else ''}
+                if {isfocus}:
+                    finalret = buildret
             """
         block += f"""
-                    pass
-                except StopFieldError:
-                    pass
                 return finalret
         """
         code.append(block)
@@ -3708,8 +5745,7 @@ class Union(Construct):
 
     def _parse(self, stream, context, path):
         obj = Container()
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, stream)
         fallback = stream_tell(stream, path)
         forwards = {}
         for i,sc in enumerate(self.subcons):
@@ -3727,8 +5763,7 @@ class Union(Construct):
         return obj
 
     def _build(self, obj, stream, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, stream)
         context.update(obj)
         for sc in self.subcons:
             if sc.flagbuildnone:
@@ -3871,18 +5906,69 @@ class Select(Construct):
         raise SelectError("no subconstruct matched", path=path)
 
     def _build(self, obj, stream, context, path):
+        # each attempt builds into same scratch buffer, only successful one gets written into stream
+        scratch = io.BytesIO()
         for sc in self.subcons:
             try:
-                data = sc.build(obj, **context)
+                sc._build(obj, scratch, context, path)
             except ExplicitError:
                 raise
             except Exception:
-                pass
+                scratch.seek(0)
+                scratch.truncate()
             else:
+                data = scratch.getvalue()
                 stream_write(stream, data, len(data), path)
                 return obj
         raise SelectError("no subconstruct matched: %s" % (obj,), path=path)
 
+    def _emitparse(self, code):
+        fname = f"parse_select_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                fallback = io.tell()
+        """
+        for sc in self.subcons:
+            block += f"""
+                try:
+                    return {sc._compileparse(code)}
+                except ExplicitError:
+                    raise
+                except Exception:
+                    io.seek(fallback)
+            """
+        block += f"""
+                raise SelectError("no subconstruct matched")
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        fname = f"build_select_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                stream = io
+                io = BytesIO()
+        """
+        for sc in self.subcons:
+            block += f"""
+                try:
+                    {sc._compilebuild(code)}
+                except ExplicitError:
+                    raise
+                except Exception:
+                    io.seek(0)
+                    io.truncate()
+                else:
+                    stream.write(io.getvalue())
+                    return obj
+            """
+        block += f"""
+                raise SelectError("no subconstruct matched: %s" % (obj,))
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
+
 
 def Optional(subcon):
     r"""
@@ -3986,6 +6072,9 @@ class IfThenElse(Construct):
         sc = self.thensubcon if condfunc else self.elsesubcon
         return sc._sizeof(context, path)
 
+    def _emitsizeof(self, code):
+        return f"(({self.thensubcon._compilesizeof(code)}) if ({emitsizeofparam(self.condfunc)}) else ({self.elsesubcon._compilesizeof(code)}))"
+
     def _emitparse(self, code):
         return "((%s) if (%s) else (%s))" % (self.thensubcon._compileparse(code), self.condfunc, self.elsesubcon._compileparse(code), )
 
@@ -4057,23 +6146,45 @@ class Switch(Construct):
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    def _emitswitch(self, code, fname, params, compile):
+        """Used internally. Short switches dispatch with if and elif, long ones look up functions in a dict."""
+        if len(self.cases) <= 8:
+            block = f"""
+                def {fname}({params}):
+                    key = {repr(self.keyfunc)}
+            """
+            for i,(key,sc) in enumerate(self.cases.items()):
+                block += f"""
+                    {'if' if i == 0 else 'elif'} key == {repr(key)}:
+                        return {compile(sc)}
+                """
+            block += f"""
+                    return {compile(self.default)}
+            """
+            code.append(block)
+            return f"{fname}({params})"
+        casesname = f"{fname}_cases"
+        cases = []
+        for i,(key,sc) in enumerate(self.cases.items()):
+            code.append(f"""
+                def {fname}_case_{i}({params}):
+                    return {compile(sc)}
+            """)
+            cases.append(f"{repr(key)}: {fname}_case_{i}")
+        code.append(f"""
+            def {fname}_default({params}):
+                return {compile(self.default)}
+            {casesname} = {{{", ".join(cases)}}}
+            def {fname}({params}):
+                return {casesname}.get({repr(self.keyfunc)}, {fname}_default)({params})
+        """)
+        return f"{fname}({params})"
+
     def _emitparse(self, code):
-        fname = f"switch_cases_{code.allocateId()}"
-        code.append(f"{fname} = {{}}")
-        for key,sc in self.cases.items():
-            code.append(f"{fname}[{repr(key)}] = lambda io,this: {sc._compileparse(code)}")
-        defaultfname = f"switch_defaultcase_{code.allocateId()}"
-        code.append(f"{defaultfname} = lambda io,this: {self.default._compileparse(code)}")
-        return f"{fname}.get({repr(self.keyfunc)}, {defaultfname})(io, this)"
+        return self._emitswitch(code, f"parse_switch_{code.allocateId()}", "io, this", lambda sc: sc._compileparse(code))
 
     def _emitbuild(self, code):
-        fname = f"switch_cases_{code.allocateId()}"
-        code.append(f"{fname} = {{}}")
-        for key,sc in self.cases.items():
-            code.append(f"{fname}[{repr(key)}] = lambda obj,io,this: {sc._compilebuild(code)}")
-        defaultfname = f"switch_defaultcase_{code.allocateId()}"
-        code.append(f"{defaultfname} = lambda obj,io,this: {self.default._compilebuild(code)}")
-        return f"{fname}.get({repr(self.keyfunc)}, {defaultfname})(obj, io, this)"
+        return self._emitswitch(code, f"build_switch_{code.allocateId()}", "obj, io, this", lambda sc: sc._compilebuild(code))
 
 
 class StopIf(Construct):
@@ -4251,6 +6362,12 @@ class Padded(Subconstruct):
     def _emitparse(self, code):
         return f"({self.subcon._compileparse(code)}, io.read(({self.length})-({self.subcon.sizeof()}) ))[0]"
 
+    def _emitsizeof(self, code):
+        return emitsizeoflength(code, self.length)
+
+    def _emitparsebuffer(self, code):
+        return f"({self.subcon._compileparsebuffer(code)}, (off := off + ({self.length})-({self.subcon.sizeof()})))[0]"
+
     def _emitbuild(self, code):
         return f"({self.subcon._compilebuild(code)}, io.write({repr(self.pattern)}*(({self.length})-({self.subcon.sizeof()})) ))[0]"
 
@@ -4440,6 +6557,9 @@ class Pointer(Subconstruct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
         if self.relativeOffset:
             func_name = "parse_relative_pointer"
@@ -4448,15 +6568,17 @@ class Pointer(Subconstruct):
             func_name = "parse_pointer"
             seek_args = "2 if offset < 0 else 0"
 
+        fname = f"{func_name}_{code.allocateId()}"
         code.append(f"""
-            def {func_name}(io, offset, func):
+            def {fname}(io, this):
+                offset = {self.offset}
                 fallback = io.tell()
                 io.seek(offset, {seek_args})
-                obj = func()
+                obj = {self.subcon._compileparse(code)}
                 io.seek(fallback)
                 return obj
         """)
-        return f"{func_name}(io, {self.offset}, lambda: {self.subcon._compileparse(code)})"
+        return f"{fname}(io, this)"
 
     def _emitbuild(self, code):
         if self.relativeOffset:
@@ -4466,15 +6588,17 @@ class Pointer(Subconstruct):
             func_name = "build_pointer"
             seek_args = "2 if offset < 0 else 0"
 
+        fname = f"{func_name}_{code.allocateId()}"
         code.append(f"""
-            def {func_name}(obj, io, offset, func):
+            def {fname}(obj, io, this):
+                offset = {self.offset}
                 fallback = io.tell()
                 io.seek(offset, {seek_args})
-                ret = func()
+                ret = {self.subcon._compilebuild(code)}
                 io.seek(fallback)
                 return ret
         """)
-        return f"{func_name}(obj, io, {self.offset}, lambda: {self.subcon._compilebuild(code)})"
+        return f"{fname}(obj, io, this)"
 
     def _emitprimitivetype(self, ksy, bitwise):
         offset = self.offset.__getfield__() if callable(self.offset) else self.offset
@@ -4526,12 +6650,16 @@ class Peek(Subconstruct):
     def _sizeof(self, context, path):
         return 0
 
+    def _emitsizeof(self, code):
+        return "0"
+
     def _emitparse(self, code):
-        code.append("""
-            def parse_peek(io, func):
+        fname = f"parse_peek_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
                 fallback = io.tell()
                 try:
-                    return func()
+                    return {self.subcon._compileparse(code)}
                 except ExplicitError:
                     raise
                 except ConstructError:
@@ -4539,7 +6667,7 @@ class Peek(Subconstruct):
                 finally:
                     io.seek(fallback)
         """)
-        return "parse_peek(io, lambda: %s)" % (self.subcon._compileparse(code),)
+        return f"{fname}(io, this)"
 
     def _emitbuild(self, code):
         return "obj"
@@ -4719,6 +6847,9 @@ class Pass(Construct):
     def _emitbuild(self, code):
         return "None"
 
+    def _emitparsebuffer(self, code):
+        return "None"
+
     def _emitfulltype(self, ksy, bitwise):
         return dict(size=0)
 
@@ -4922,7 +7053,14 @@ class Prefixed(Subconstruct):
 
     def _emitparse(self, code):
         sub = self.lengthfield.sizeof() if self.includelength else 0
-        return f"restream(io.read(({self.lengthfield._compileparse(code)})-({sub})), lambda io: ({self.subcon._compileparse(code)}))"
+        return f"{emitparsefrom(code, 'prefixed', self.subcon)}(BytesIO(io.read(({self.lengthfield._compileparse(code)})-({sub}))), this)"
+
+    def _emitsizeof(self, code):
+        return f"({self.lengthfield._compilesizeof(code)}) + ({self.subcon._compilesizeof(code)})"
+
+    def _emitparsebuffer(self, code):
+        sub = self.lengthfield.sizeof() if self.includelength else 0
+        return f"{emitparsefrom(code, 'prefixed', self.subcon)}(BytesIO({emitbufferbytes(code, f'({self.lengthfield._compileparsebuffer(code)})-({sub})')}), this)"
 
     def _emitseq(self, ksy, bitwise):
         return [
@@ -4931,7 +7069,7 @@ class Prefixed(Subconstruct):
         ]
 
 
-def PrefixedArray(countfield, subcon):
+def PrefixedArray(countfield, subcon, numpy=False, columnar=False):
     r"""
     Prefixes an array with item count (as opposed to prefixed by byte count, see :class:`~construct.core.Prefixed`).
 
@@ -4939,6 +7077,8 @@ def PrefixedArray(countfield, subcon):
 
     :param countfield: Construct instance, field used for storing the element count
     :param subcon: Construct instance, subcon used for storing each element
+    :param numpy: optional, bool, if set then parsing returns a numpy array, see :class:`~construct.core.Array`
+    :param columnar: optional, bool, if set then parsing returns a Container of columns, see :class:`~construct.core.Array`
 
     :raises StreamError: requested reading negative amount, could not read enough bytes, requested writing different amount than actual data, or could not write all bytes
     :raises RangeError: consumed or produced too little elements
@@ -4954,19 +7094,41 @@ def PrefixedArray(countfield, subcon):
         [1684234849, 1751606885]
     """
     macro = FocusedSeq("items",
-        "count" / Rebuild(countfield, len_(this.items)),
-        "items" / subcon[this.count],
+        "count" / Rebuild(countfield, (lambda this: _columnarlength(this.items)) if columnar else len_(this.items)),
+        "items" / Array(this.count, subcon, numpy=numpy, columnar=columnar),
     )
 
     def _emitparse(code):
-        return "ListContainer((%s) for i in range(%s))" % (subcon._compileparse(code), countfield._compileparse(code), )
-    macro._emitparse = _emitparse
+        fname = f"parse_prefixedarray_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
+                result = ListContainer()
+                append = result.append
+                for i in range({countfield._compileparse(code)}):
+                    append({subcon._compileparse(code)})
+                return result
+        """)
+        return f"{fname}(io, this)"
+    if not numpy and not columnar:
+        # numpy and columnar arrays compile through FocusedSeq and Array
+        macro._emitparse = _emitparse
 
     def _emitbuild(code):
-        return f"(reuse(len(obj), lambda obj: {countfield._compilebuild(code)}), list({subcon._compilebuild(code)} for obj in obj), obj)[2]"
-    macro._emitbuild = _emitbuild
+        fname = f"build_prefixedarray_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                items = obj
+                obj = len(items)
+                {countfield._compilebuild(code)}
+                for obj in items:
+                    {subcon._compilebuild(code)}
+                return items
+        """)
+        return f"{fname}(obj, io, this)"
+    if not numpy and not columnar:
+        macro._emitbuild = _emitbuild
 
-    def _actualsize(self, stream, context, path):
+    def _actualsize(stream, context, path):
         position1 = stream_tell(stream, path)
         count = countfield._parse(stream, context, path)
         position2 = stream_tell(stream, path)
@@ -5040,8 +7202,11 @@ class FixedSized(Subconstruct):
             raise PaddingError("length cannot be negative", path=path)
         return length
 
+    def _emitsizeof(self, code):
+        return emitsizeoflength(code, self.length)
+
     def _emitparse(self, code):
-        return f"restream(io.read({self.length}), lambda io: ({self.subcon._compileparse(code)}))"
+        return f"{emitparsefrom(code, 'fixedsized', self.subcon)}(BytesIO(io.read({self.length})), this)"
 
     def _emitfulltype(self, ksy, bitwise):
         return dict(size=repr(self.length).replace("this.",""), **self.subcon._compilefulltype(ksy, bitwise))
@@ -5300,6 +7465,35 @@ class Transformed(Subconstruct):
             return self.encodeamount
         raise SizeofError(path=path)
 
+    def _emitparse(self, code):
+        if self.decodeamount is not None and not isinstance(self.decodeamount, int):
+            raise NotImplementedError
+        read = "io.read()" if self.decodeamount is None else f"io.read({self.decodeamount})"
+        return f"{emitparsefrom(code, 'transformed', self.subcon)}(BytesIO({emitfunction(code, self.decodefunc)}({read})), this)"
+
+    def _emitbuild(self, code):
+        if self.encodeamount is not None and not isinstance(self.encodeamount, int):
+            raise NotImplementedError
+        fname = f"build_transformed_{code.allocateId()}"
+        block = f"""
+            def {fname}(obj, io, this):
+                stream = io
+                io = BytesIO()
+                buildret = {self.subcon._compilebuild(code)}
+                data = {emitfunction(code, self.encodefunc)}(io.getvalue())
+        """
+        if self.encodeamount is not None:
+            block += f"""
+                if len(data) != {self.encodeamount}:
+                    raise StreamError("encoding transformation produced wrong amount of bytes, %s instead of expected %s" % (len(data), {self.encodeamount}))
+            """
+        block += f"""
+                stream.write(data)
+                return buildret
+        """
+        code.append(block)
+        return f"{fname}(obj, io, this)"
+
 
 class Restreamed(Subconstruct):
     r"""
@@ -5353,6 +7547,24 @@ class Restreamed(Subconstruct):
         else:
             return self.sizecomputer(self.subcon._sizeof(context, path))
 
+    def _emitrestream(self, code, name, action):
+        """Used internally."""
+        fname = f"{name}_restreamed_{code.allocateId()}"
+        code.append(f"""
+            def {fname}({'io, this' if name == 'parse' else 'obj, io, this'}):
+                io = RestreamedBytesIO(io, {emitfunction(code, self.decoder)}, {self.decoderunit}, {emitfunction(code, self.encoder)}, {self.encoderunit})
+                result = {action}
+                io.close()
+                return {'result' if name == 'parse' else 'obj'}
+        """)
+        return fname
+
+    def _emitparse(self, code):
+        return f"{self._emitrestream(code, 'parse', self.subcon._compileparse(code))}(io, this)"
+
+    def _emitbuild(self, code):
+        return f"{self._emitrestream(code, 'build', self.subcon._compilebuild(code))}(obj, io, this)"
+
 
 class ProcessXor(Subconstruct):
     r"""
@@ -5420,6 +7632,49 @@ class ProcessXor(Subconstruct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitxor(self, code):
+        """Used internally."""
+        code.append("""
+            from construct.core import BytesIOWithOffsets
+            def process_xor(data, pad):
+                if not isinstance(pad, (int, bytes)):
+                    raise StringError("ProcessXor needs integer or bytes pad")
+                if isinstance(pad, bytes) and len(pad) == 1:
+                    pad = pad[0]
+                if isinstance(pad, int):
+                    return data.translate(bytes(b ^ pad for b in range(256))) if pad else data
+                if not any(pad):
+                    return data
+                key = (pad * (len(data) // len(pad) + 1))[:len(data)]
+                return (int.from_bytes(data, 'little') ^ int.from_bytes(key, 'little')).to_bytes(len(data), 'little')
+        """)
+
+    def _emitparse(self, code):
+        self._emitxor(code)
+        fname = f"parse_processxor_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
+                pad = {emitparam(code, self.padfunc)}
+                offset = io.tell()
+                data = process_xor(io.read(), pad)
+                return {emitparsefrom(code, 'processxor', self.subcon)}(BytesIOWithOffsets(data, io, offset), this)
+        """)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        self._emitxor(code)
+        fname = f"build_processxor_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                pad = {emitparam(code, self.padfunc)}
+                stream = io
+                io = BytesIO()
+                buildret = {self.subcon._compilebuild(code)}
+                stream.write(process_xor(io.getvalue(), pad))
+                return buildret
+        """)
+        return f"{fname}(obj, io, this)"
+
 
 class ProcessRotateLeft(Subconstruct):
     r"""
@@ -5528,6 +7783,48 @@ class ProcessRotateLeft(Subconstruct):
     def _sizeof(self, context, path):
         return self.subcon._sizeof(context, path)
 
+    def _emitrotate(self, code):
+        """Used internally."""
+        code.append("""
+            def process_rotateleft(data, amount, group):
+                if group < 1:
+                    raise RotationError("group size must be at least 1 to be valid")
+                amount = amount % (group * 8)
+                amount_bytes = amount // 8
+                if len(data) % group != 0:
+                    raise RotationError("data length must be a multiple of group size")
+                if amount == 0:
+                    return data
+                if group == 1:
+                    return data.translate(bytes(ProcessRotateLeft.precomputed_single_rotations[amount]))
+                if amount % 8 == 0:
+                    indices = [(i + amount_bytes) % group for i in range(group)]
+                    return bytes(data[i+k] for i in range(0,len(data),group) for k in indices)
+                amount1 = amount % 8
+                amount2 = 8 - amount1
+                indices_pairs = [((i+amount_bytes) % group, (i+1+amount_bytes) % group) for i in range(group)]
+                return bytes((data[i+k1] << amount1) & 0xff | (data[i+k2] >> amount2) for i in range(0,len(data),group) for k1,k2 in indices_pairs)
+        """)
+
+    def _emitparse(self, code):
+        self._emitrotate(code)
+        return f"{emitparsefrom(code, 'processrotateleft', self.subcon)}(BytesIO(process_rotateleft(io.read(), {emitparam(code, self.amount)}, {emitparam(code, self.group)})), this)"
+
+    def _emitbuild(self, code):
+        self._emitrotate(code)
+        fname = f"build_processrotateleft_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                amount = {emitparam(code, self.amount)}
+                group = {emitparam(code, self.group)}
+                stream = io
+                io = BytesIO()
+                buildret = {self.subcon._compilebuild(code)}
+                stream.write(process_rotateleft(io.getvalue(), -amount, group))
+                return buildret
+        """)
+        return f"{fname}(obj, io, this)"
+
 
 class Checksum(Construct):
     r"""
@@ -5655,6 +7952,24 @@ class Compressed(Tunnel):
                 return self.lib.compress(data, self.level)
         return self.lib.encode(data, self.encoding)
 
+    def _emitdecode(self, code, data):
+        code.append(f"""
+            import {self.lib.__name__}
+        """)
+        if self.encoding in ("zlib", "gzip", "bzip2", "lzma"):
+            return f"{self.lib.__name__}.decompress({data})"
+        return f"codecs.decode({data}, {repr(self.encoding)})"
+
+    def _emitencode(self, code, data):
+        code.append(f"""
+            import {self.lib.__name__}
+        """)
+        if self.encoding in ("zlib", "gzip", "bzip2", "lzma"):
+            if self.level is None or self.encoding == "lzma":
+                return f"{self.lib.__name__}.compress({data})"
+            return f"{self.lib.__name__}.compress({data}, {repr(self.level)})"
+        return f"codecs.encode({data}, {repr(self.encoding)})"
+
 
 class CompressedLZ4(Tunnel):
     r"""
@@ -5689,6 +8004,18 @@ class CompressedLZ4(Tunnel):
     def _encode(self, data, context, path):
         return self.lib.compress(data)
 
+    def _emitdecode(self, code, data):
+        code.append("""
+            import lz4.frame
+        """)
+        return f"lz4.frame.decompress({data})"
+
+    def _emitencode(self, code, data):
+        code.append("""
+            import lz4.frame
+        """)
+        return f"lz4.frame.compress({data})"
+
 
 class EncryptedSym(Tunnel):
     r"""
@@ -5890,6 +8217,19 @@ class Rebuffered(Subconstruct):
 #===============================================================================
 # lazy equivalents
 #===============================================================================
+def _emitactualsize(code, sc):
+    """Used internally. Returns how a lazy class skips over sc: an integer when the size is constant, an expression that computes the size (possibly raising SizeofError KeyError AttributeError) when it depends on the context or the stream, or None when sc has to be parsed."""
+    if "_actualsize" in sc.__dict__ or type(sc)._actualsize is not Construct._actualsize:
+        sc._compileinstance(code)
+        return f"linkedinstances[{id(sc)}]._actualsize(io, this, '(???)')"
+    if not usescontext(sc):
+        try:
+            return sc.sizeof()
+        except SizeofError:
+            return None
+    return sc._compilesizeof(code)
+
+
 class Lazy(Subconstruct):
     r"""
     Lazyfies a field.
@@ -5931,7 +8271,7 @@ class Lazy(Subconstruct):
             stream_seek(stream, fallback, 0, path)
             return obj
         len = self.subcon._actualsize(stream, context, path)
-        stream_seek(stream, len, 1, path)
+        stream_seek(stream, offset+len, 0, path)
         return execute
 
     def _build(self, obj, stream, context, path):
@@ -5939,6 +8279,29 @@ class Lazy(Subconstruct):
             obj = obj()
         return self.subcon._build(obj, stream, context, path)
 
+    def _emitparse(self, code):
+        size = _emitactualsize(code, self.subcon)
+        if size is None:
+            # raises the same SizeofError when parsed
+            size = self.subcon._compilesizeof(code)
+        fname = f"parse_lazy_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(io, this):
+                offset = io.tell()
+                def execute():
+                    fallback = io.tell()
+                    io.seek(offset)
+                    obj = {self.subcon._compileparse(code)}
+                    io.seek(fallback)
+                    return obj
+                io.seek(offset + {size})
+                return execute
+        """)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        return emitbuildfrom(code, "lazy", "obj() if callable(obj) else obj", self.subcon)
+
 
 class LazyContainer(dict):
     """Used internally."""
@@ -6023,8 +8386,7 @@ class LazyStruct(Construct):
         raise AttributeError
 
     def _parse(self, stream, context, path):
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, stream)
         offset = stream_tell(stream, path)
         offsets = {0: offset}
         values = {}
@@ -6045,8 +8407,7 @@ class LazyStruct(Construct):
         # exact copy from Struct class
         if obj is None:
             obj = Container()
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = stream, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, stream)
         context.update(obj)
         for sc in self.subcons:
             try:
@@ -6067,13 +8428,76 @@ class LazyStruct(Construct):
 
     def _sizeof(self, context, path):
         # exact copy from Struct class
-        context = Container(_ = context, _params = context._params, _root = None, _parsing = context._parsing, _building = context._building, _sizing = context._sizing, _subcons = self._subcons, _io = None, _index = context.get("_index", None))
-        context._root = context._.get("_root", context)
+        context = ContextFrame(context, self._subcons, None)
         try:
             return sum(sc._sizeof(context, path) for sc in self.subcons)
         except (KeyError, AttributeError):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
 
+    # building and sizeof are greedy, so compiled code is shared with Struct, building returns the context like _build does
+    _contextfree = False
+    _emitbuild = Struct._emitbuild
+    _emitsizeof = Struct._emitsizeof
+
+    def _emitparse(self, code):
+        self._compileinstance(code)
+        parsers = [emitparsefrom(code, "lazyfield", sc) for sc in self.subcons]
+        cname = f"lazycontainer_{code.allocateId()}"
+        code.append(f"""
+            class {cname}(LazyContainer):
+                parsers = ({"".join(f"{p}, " for p in parsers)})
+                def __getitem__(self, index):
+                    if isinstance(index, str):
+                        index = self._struct._subconsindexes[index]
+                    if index in self._values:
+                        return self._values[index]
+                    self._stream.seek(self._offsets[index])
+                    parseret = self.parsers[index](self._stream, self._context)
+                    self._values[index] = parseret
+                    return parseret
+        """)
+        fname = f"parse_lazystruct_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                this = Container(_ = this, _params = this['_params'], _root = None, _parsing = True, _building = False, _sizing = False, _subcons = linkedinstances[{id(self)}]._subcons, _io = io, _index = this.get('_index', None))
+                this['_root'] = this['_'].get('_root', this)
+                offset = io.tell()
+                offsets = {{0: offset}}
+                values = {{}}
+        """
+        for i,(sc,parser) in enumerate(zip(self.subcons, parsers)):
+            size = _emitactualsize(code, sc)
+            assign = f"values[{i}] = this[{repr(sc.name)}] = " if sc.name else f"values[{i}] = "
+            if isinstance(size, int):
+                block += f"""
+                offset += {size}
+                """
+            elif size is None:
+                block += f"""
+                io.seek(offset)
+                {assign}{parser}(io, this)
+                offset = io.tell()
+                """
+            else:
+                block += f"""
+                try:
+                    io.seek(offset)
+                    offset += {size}
+                except (SizeofError, KeyError, AttributeError):
+                    io.seek(offset)
+                    {assign}{parser}(io, this)
+                    offset = io.tell()
+                """
+            block += f"""
+                offsets[{i+1}] = offset
+            """
+        block += f"""
+                io.seek(offset)
+                return {cname}(linkedinstances[{id(self)}], io, offsets, values, this, '(???)')
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
 
 class LazyListContainer(list):
     """Used internally."""
@@ -6188,6 +8612,86 @@ class LazyArray(Subconstruct):
             raise SizeofError("cannot calculate size, key not found in context", path=path)
         return count * self.subcon._sizeof(context, path)
 
+    def _emitparse(self, code):
+        parser = emitparsefrom(code, "lazyelement", self.subcon)
+        cname = f"lazylistcontainer_{code.allocateId()}"
+        code.append(f"""
+            class {cname}(LazyListContainer):
+                def __getitem__(self, index):
+                    if isinstance(index, slice):
+                        return [self[i] for i in range(*index.indices(self._count))]
+                    if index in self._values:
+                        return self._values[index]
+                    self._stream.seek(self._offsets[index])
+                    parseret = {parser}(self._stream, self._context)
+                    self._values[index] = parseret
+                    return parseret
+        """)
+        fname = f"parse_lazyarray_{code.allocateId()}"
+        block = f"""
+            def {fname}(io, this):
+                count = {emitparam(code, self.count)}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                offset = io.tell()
+        """
+        size = _emitactualsize(code, self.subcon)
+        if isinstance(size, int):
+            block += f"""
+                offsets = {{i: offset + i*{size} for i in range(count+1)}}
+                values = {{}}
+                offset += count*{size}
+            """
+        elif size is None:
+            block += f"""
+                offsets = {{0: offset}}
+                values = {{}}
+                for i in range(count):
+                    values[i] = {parser}(io, this)
+                    offsets[i+1] = io.tell()
+                offset = io.tell()
+            """
+        else:
+            block += f"""
+                offsets = {{0: offset}}
+                values = {{}}
+                for i in range(count):
+                    try:
+                        io.seek(offset)
+                        offset += {size}
+                    except (SizeofError, KeyError, AttributeError):
+                        io.seek(offset)
+                        values[i] = {parser}(io, this)
+                        offset = io.tell()
+                    offsets[i+1] = offset
+            """
+        block += f"""
+                io.seek(offset)
+                return {cname}(None, io, count, offsets, values, this, '(???)')
+        """
+        code.append(block)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        # same as Array, without discarding
+        fname = f"build_lazyarray_{code.allocateId()}"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                count = {emitparam(code, self.count)}
+                if not 0 <= count:
+                    raise RangeError("invalid count %s" % (count,))
+                if not len(obj) == count:
+                    raise RangeError("expected %d elements, found %d" % (count, len(obj)))
+                retlist = ListContainer()
+                append = retlist.append
+                for obj in obj:
+                    append({self.subcon._compilebuild(code)})
+                return retlist
+        """)
+        return f"{fname}(obj, io, this)"
+
+    _emitsizeof = Array._emitsizeof
+
 
 class LazyBound(Construct):
     r"""
@@ -6251,6 +8755,25 @@ class LazyBound(Construct):
         sc = self.subconfunc()
         return sc._build(obj, stream, context, path)
 
+    def _emitparse(self, code):
+        fname = f"parse_lazybound_{code.allocateId()}"
+        # cached before the target gets compiled, so a recursive schema calls this same function again
+        code.parsercache[code.key(self)] = f"{fname}(io, this)"
+        code.append(f"""
+            def {fname}(io, this):
+                return {self.subconfunc()._compileparse(code)}
+        """)
+        return f"{fname}(io, this)"
+
+    def _emitbuild(self, code):
+        fname = f"build_lazybound_{code.allocateId()}"
+        code.buildercache[code.key(self)] = f"{fname}(obj, io, this)"
+        code.append(f"""
+            def {fname}(obj, io, this):
+                return {self.subconfunc()._compilebuild(code)}
+        """)
+        return f"{fname}(obj, io, this)"
+
 
 #===============================================================================
 # adapters and validators
@@ -29,8 +29,21 @@ opnames = {
 }
 
 
+unisyntax = {
+    operator.neg : "(-{})",
+    operator.pos : "(+{})",
+    operator.not_ : "(not {})",
+}
+
+binsyntax = {op:"({} %s {})" % name for op,name in opnames.items() if op not in unisyntax}
+binsyntax[operator.contains] = "({1} in {0})"
+
+
 class ExprMixin(object):
 
+    #: flat function made by lowerexpr, on first call, dunder named so that this.<name> still reaches any field
+    __lowered__ = None
+
     def __add__(self, other):
         return BinExpr(operator.add, self, other)
     def __sub__(self, other):
@@ -119,12 +132,17 @@ class ExprMixin(object):
         for name in slots:
             if hasattr(self, name):
                 attrs[name] = getattr(self, name)
+        attrs.pop("__lowered__", None)
         return attrs
 
     def __setstate__(self, attrs):
         for name, value in attrs.items():
             setattr(self, name, value)
 
+    def __lower__(self, lower, constant):
+        """Used internally. Returns source of an expression equivalent to calling self on obj, see lowerexpr."""
+        raise NotImplementedError
+
 
 class UniExpr(ExprMixin):
 
@@ -139,8 +157,20 @@ class UniExpr(ExprMixin):
         return "%s %s" % (opnames[self.op], self.operand)
 
     def __call__(self, obj, *args):
-        operand = self.operand(obj) if callable(self.operand) else self.operand
-        return self.op(operand)
+        lowered = self.__lowered__
+        if lowered is None:
+            lowered = self.__lowered__ = lowerexpr(self)
+        return lowered(obj)
+
+    def __lower__(self, lower, constant):
+        if not callable(self.operand):
+            try:
+                return constant(self.op(self.operand))
+            except Exception:
+                pass
+        if self.op in unisyntax:
+            return unisyntax[self.op].format(lower(self.operand))
+        return "%s(%s)" % (constant(self.op), lower(self.operand))
 
 
 class BinExpr(ExprMixin):
@@ -157,9 +187,20 @@ class BinExpr(ExprMixin):
         return "(%s %s %s)" % (self.lhs, opnames[self.op], self.rhs)
 
     def __call__(self, obj, *args):
-        lhs = self.lhs(obj) if callable(self.lhs) else self.lhs
-        rhs = self.rhs(obj) if callable(self.rhs) else self.rhs
-        return self.op(lhs, rhs)
+        lowered = self.__lowered__
+        if lowered is None:
+            lowered = self.__lowered__ = lowerexpr(self)
+        return lowered(obj)
+
+    def __lower__(self, lower, constant):
+        if not callable(self.lhs) and not callable(self.rhs):
+            try:
+                return constant(self.op(self.lhs, self.rhs))
+            except Exception:
+                pass
+        if self.op in binsyntax:
+            return binsyntax[self.op].format(lower(self.lhs), lower(self.rhs))
+        return "%s(%s, %s)" % (constant(self.op), lower(self.lhs), lower(self.rhs))
 
 
 class Path(ExprMixin):
@@ -182,10 +223,16 @@ class Path(ExprMixin):
             return "%s[%r]" % (self.__parent, self.__field)
 
     def __call__(self, obj, *args):
+        lowered = self.__lowered__
+        if lowered is None:
+            lowered = self.__lowered__ = lowerexpr(self)
+        return lowered(obj)
+
+    def __lower__(self, lower, constant):
         if self.__parent is None:
-            return obj
+            return "obj"
         else:
-            return self.__parent(obj)[self.__field]
+            return "%s[%s]" % (lower(self.__parent), constant(self.__field))
 
     def __getfield__(self):
         return self.__field
@@ -242,7 +289,43 @@ class FuncPath(ExprMixin):
         if self.__operand is None:
             return FuncPath(self.__func, operand) if callable(operand) else operand
         else:
-            return self.__func(self.__operand(operand) if callable(self.__operand) else self.__operand)
+            lowered = self.__lowered__
+            if lowered is None:
+                lowered = self.__lowered__ = lowerexpr(self)
+            return lowered(operand)
+
+    def __lower__(self, lower, constant):
+        if self.__operand is None:
+            raise NotImplementedError
+        if not callable(self.__operand):
+            try:
+                return constant(self.__func(self.__operand))
+            except Exception:
+                pass
+        return "%s(%s)" % (constant(self.__func), lower(self.__operand))
+
+
+def lowerexpr(expr):
+    r"""
+    Used internally. Turns an expression tree into a flat function of one parameter (the context), so evaluating it makes one call instead of walking the tree. Subexpressions without context lookups are folded into constants. Operands that are not expressions (like lambdas) are called, same as during tree evaluation.
+    """
+    namespace = {}
+    def constant(value):
+        if type(value) in (int, str, bytes, bool, type(None)):
+            return repr(value)
+        name = "c%d" % len(namespace)
+        namespace[name] = value
+        return name
+    def lower(x):
+        if not callable(x):
+            return constant(x)
+        if isinstance(x, ExprMixin):
+            try:
+                return x.__lower__(lower, constant)
+            except NotImplementedError:
+                pass
+        return "%s(obj)" % constant(x)
+    return eval("lambda obj: %s" % lower(expr), namespace)
 
 
 this = Path("this")
@@ -12,6 +12,7 @@ __all__ = [
     'bytes2integer',
     'bytes2str',
     'Container',
+    'ContextFrame',
     'globalPrintFalseFlags',
     'globalPrintFullStrings',
     'HexDisplayedBytes',
@@ -25,6 +26,7 @@ __all__ = [
     'int2byte',
     'integer2bits',
     'integer2bytes',
+    'integer2varint',
     'ListContainer',
     'ONWINDOWS',
     'PY',
@@ -39,6 +41,7 @@ __all__ = [
     'swapbytes',
     'swapbytesinbits',
     'unhexlify',
+    'varint2integer',
     # deprecated:
     'PY2',
     'PY3',
@@ -92,6 +92,63 @@ def bytes2integer(data, signed=False):
     return int.from_bytes(data, 'big', signed=signed)
 
 
+def integer2varint(number):
+    r"""
+    Converts a non-negative integer into its VarInt (unsigned LEB128) encoding, where each byte holds 7 bits of the number and MSB is set on all bytes except the last one. This is reverse to `varint2integer`.
+
+    Examples:
+
+        >>> integer2varint(300)
+        b'\xac\x02'
+    """
+    if number < 0:
+        raise ValueError(f"number {number} must be non-negative")
+    if number < 0x80:
+        return bytes((number,))
+    data = bytearray()
+    while number > 0x7f:
+        data.append(0x80 | (number & 0x7f))
+        number >>= 7
+    data.append(number)
+    return bytes(data)
+
+
+def varint2integer(data, offset=0):
+    r"""
+    Decodes a VarInt (unsigned LEB128) from a byte-string (or any buffer) starting at given offset. Returns a tuple of the integer and the offset just past its terminal byte. This is reverse to `integer2varint`.
+
+    Examples:
+
+        >>> varint2integer(b'\xac\x02')
+        (300, 2)
+    """
+    try:
+        # first 3 bytes unrolled, that covers all numbers below 2**21
+        b = data[offset]
+        if b < 0x80:
+            return b, offset+1
+        number = b & 0x7f
+        b = data[offset+1]
+        if b < 0x80:
+            return number | (b << 7), offset+2
+        number |= (b & 0x7f) << 7
+        b = data[offset+2]
+        if b < 0x80:
+            return number | (b << 14), offset+3
+        number |= (b & 0x7f) << 14
+        offset += 3
+        shift = 21
+        while True:
+            b = data[offset]
+            offset += 1
+            number |= (b & 0x7f) << shift
+            if b < 0x80:
+                return number, offset
+            shift += 7
+    except IndexError:
+        raise ValueError("byte-string ended before VarInt terminal byte")
+
+
 BYTES2BITS_CACHE = {i:integer2bits(i,8) for i in range(256)}
 def bytes2bits(data):
     r""" 
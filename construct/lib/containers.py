@@ -222,6 +222,103 @@ class Container(dict):
         self.__class__.update(self, state)
 
 
+class ContextFrame(Container):
+    r"""
+    Context of a single Struct (Sequence FocusedSeq Union LazyStruct) instance being parsed, built or sized. Parsed members are dictionary entries, like in a Container. Bookkeeping entries (_ _params _parsing _building _sizing _subcons _io _index) are kept in slots instead, and _root is looked up through the parent frames only when needed, and then remembered. All of them can be accessed and assigned both as attributes and as keys, like `this._.field` and `this._root` in `this` expressions, assigning a key (also by update) sets the slot.
+
+    Example::
+
+        >>> parent = Container(_parsing=True, _building=False, _sizing=False)
+        >>> parent._params = parent
+        >>> context = ContextFrame(parent, None, None)
+        >>> context.x = 1
+        >>> context["x"], context._parsing, context["_"] is parent, context._root is context
+        (1, True, True, True)
+    """
+    __slots__ = ('_', '_params', '_parsing', '_building', '_sizing', '_subcons', '_io', '_index', '_rootframe')
+
+    _order = ('_', '_params', '_root', '_parsing', '_building', '_sizing', '_subcons', '_io', '_index')
+    _keys = frozenset(_order)
+
+    def __init__(self, parent, subcons, io, /):
+        self.__dict__ = self
+        self._ = parent
+        self._params = parent._params
+        self._parsing = parent._parsing
+        self._building = parent._building
+        self._sizing = parent._sizing
+        self._subcons = subcons
+        self._io = io
+        self._index = parent.get("_index", None)
+        self._rootframe = None
+
+    @property
+    def _root(self, /):
+        root = self._rootframe
+        if root is None:
+            parent = self._
+            root = self._rootframe = parent._root if isinstance(parent, ContextFrame) else parent.get("_root", self)
+        return root
+
+    @_root.setter
+    def _root(self, root, /):
+        self._rootframe = root
+
+    def __missing__(self, key, /):
+        if key in ContextFrame._keys:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key, /):
+        return dict.__contains__(self, key) or key in ContextFrame._keys
+
+    def __setitem__(self, key, value, /):
+        if key in ContextFrame._keys:
+            setattr(self, key, value)
+        else:
+            dict.__setitem__(self, key, value)
+
+    def update(self, *args, **kwargs):
+        dict.update(self, *args, **kwargs)
+        # bookkeeping entries, like _io of a parsed Container, go into slots so keys and attributes stay same
+        for key in ContextFrame._keys.intersection(dict.keys(self)):
+            setattr(self, key, dict.pop(self, key))
+
+    def __ior__(self, other, /):
+        self.update(other)
+        return self
+
+    def setdefault(self, key, default=None, /):
+        if key in ContextFrame._keys:
+            return getattr(self, key)
+        return dict.setdefault(self, key, default)
+
+    def get(self, key, default=None, /):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __str__(self, /):
+        # bookkeeping entries are not dictionary entries, so they get printed from a copy, self nested in it prints as recursion
+        if not globalPrintPrivateEntries or getattr(self, "__recursion_lock__", False):
+            return Container.__str__(self)
+        entries = Container((k, getattr(self, k)) for k in ContextFrame._order)
+        dict.update(entries, self)
+        setattr(self, "__recursion_lock__", True)
+        try:
+            return Container.__str__(entries)
+        finally:
+            delattr(self, "__recursion_lock__")
+
+    def copy(self, /):
+        context = ContextFrame(self._, self._subcons, self._io)
+        context._index = self._index
+        context._rootframe = self._rootframe
+        dict.update(context, self)
+        return context
+
+
 class ListContainer(list):
     r"""
     Generic container like list. Provides pretty-printing. Also provides regex searching.
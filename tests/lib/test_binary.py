@@ -49,6 +49,24 @@ def test_bytes2integer():
     assert bytes2integer(b'\x00\x00\x00\x13', False) == 19
     assert bytes2integer(b'\x00\x00\x00\x13', True) == 19
 
+def test_integer2varint():
+    assert integer2varint(0) == b"\x00"
+    assert integer2varint(127) == b"\x7f"
+    assert integer2varint(300) == b"\xac\x02"
+    assert integer2varint(2**100) == b'\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x04'
+    assert raises(integer2varint, -1) == ValueError
+
+def test_varint2integer():
+    assert varint2integer(b"\x00") == (0, 1)
+    assert varint2integer(b"\xac\x02") == (300, 2)
+    assert varint2integer(b"??\xac\x02??", 2) == (300, 4)
+    assert varint2integer(memoryview(b"\xff\xff\x7f")) == (2**21-1, 3)
+    assert varint2integer(b'\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x04') == (2**100, 15)
+    assert raises(varint2integer, b"") == ValueError
+    assert raises(varint2integer, b"\x80\x80\x80\x80") == ValueError
+    for i in [0, 1, 2**7-1, 2**7, 2**14-1, 2**14, 2**21-1, 2**21, 2**64]:
+        assert varint2integer(integer2varint(i)) == (i, len(integer2varint(i)))
+
 def test_cross_integers():
     for i in [-300,-255,-100,-1,0,1,100,255,300]:
         assert bits2integer(integer2bits(i,64,signed=(i<0)),signed=(i<0)) == i
@@ -322,3 +322,30 @@ def test_method_shadowing_2():
     assert Container.search(c, 'y') == None
     pytest.raises(ZeroDivisionError, c.search, 'x')
 
+
+def test_contextframe():
+    parent = Container(z=2, _parsing=True, _building=False, _sizing=False, _index=3)
+    parent._params = parent
+    c = ContextFrame(parent, None, None)
+    c.x = 1
+    assert c == Container(x=1)
+    assert c["x"] == c.x == 1
+    assert c["_"] is c._ is parent
+    assert c["_params"] is parent
+    assert c["_parsing"] is True and c._building is False
+    assert c["_index"] == c.get("_index") == 3
+    assert c["_root"] is c._root is c
+    assert "_io" in c and "x" in c and "y" not in c
+    assert raises(lambda: c["y"]) == KeyError
+    assert raises(lambda: c.y) == AttributeError
+    c2 = ContextFrame(c, None, None)
+    assert c2._root is c and c2["_"]["x"] == 1
+    c3 = c2.copy()
+    assert type(c3) is ContextFrame and c3._ is c and c3._root is c
+    assert list(c.keys()) == ["x"]
+    c["_io"] = "stream"
+    c.update(Container(_io="other", _index=5, y=2))
+    c |= dict(_root=parent)
+    assert c["_io"] is c._io == "other" and c["_index"] == c._index == 5 and c["_root"] is c._root is parent
+    assert c.setdefault("_index", 7) == 5 and c.setdefault("z", 7) == 7
+    assert list(c.keys()) == ["x", "y", "z"]
@@ -3,6 +3,7 @@
 from tests.declarativeunittest import *
 from construct import *
 from construct.lib import *
+import construct.core
 from tests.test_compiler import example, exampledata
 
 
@@ -68,6 +69,24 @@ def test_class_bitwise2_build(benchmark):
     d = Bitwise(RepeatUntil(obj_ == 1, Byte))
     benchmark(d.build, [0 if i<800-1 else 1 for i in range(800)])
 
+def test_class_bitstruct_parse(benchmark):
+    d = BitStruct("a"/Flag, "b"/Nibble, Padding(3), "c"/BitsInteger(16, swapped=True), "d"/Octet)
+    benchmark(d.parse, bytes(4))
+
+def test_class_bitstruct_parse_compiled(benchmark):
+    d = BitStruct("a"/Flag, "b"/Nibble, Padding(3), "c"/BitsInteger(16, swapped=True), "d"/Octet)
+    d = d.compile()
+    benchmark(d.parse, bytes(4))
+
+def test_class_bitstruct_build(benchmark):
+    d = BitStruct("a"/Flag, "b"/Nibble, Padding(3), "c"/BitsInteger(16, swapped=True), "d"/Octet)
+    benchmark(d.build, dict(a=True, b=1, c=2, d=3))
+
+def test_class_bitstruct_build_compiled(benchmark):
+    d = BitStruct("a"/Flag, "b"/Nibble, Padding(3), "c"/BitsInteger(16, swapped=True), "d"/Octet)
+    d = d.compile()
+    benchmark(d.build, dict(a=True, b=1, c=2, d=3))
+
 def test_class_bytewise1_parse(benchmark):
     d = Bitwise(Bytewise(Bytes(100)))
     benchmark(d.parse, bytes(100))
@@ -161,7 +180,28 @@ def test_class_varint_build(benchmark):
     d = VarInt
     benchmark(d.build, 2**100)
 
-# ZigZag
+def test_class_varint_build_compiled(benchmark):
+    d = VarInt
+    d = d.compile()
+    benchmark(d.build, 2**100)
+
+def test_class_zigzag_parse(benchmark):
+    d = ZigZag
+    benchmark(d.parse, b"\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x10")
+
+def test_class_zigzag_parse_compiled(benchmark):
+    d = ZigZag
+    d = d.compile()
+    benchmark(d.parse, b"\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x80\x10")
+
+def test_class_zigzag_build(benchmark):
+    d = ZigZag
+    benchmark(d.build, -2**100)
+
+def test_class_zigzag_build_compiled(benchmark):
+    d = ZigZag
+    d = d.compile()
+    benchmark(d.build, -2**100)
 
 def test_class_paddedstring_parse(benchmark):
     d = PaddedString(100, "utf8")
@@ -176,6 +216,20 @@ def test_class_paddedstring_build(benchmark):
     d = PaddedString(100, "utf8")
     benchmark(d.build, u"Афон")
 
+def test_class_paddedstring_build_compiled(benchmark):
+    d = PaddedString(100, "utf8")
+    d = d.compile()
+    benchmark(d.build, u"Афон")
+
+def test_class_paddedstring_utf16_parse(benchmark):
+    d = PaddedString(100, "utf16")
+    benchmark(d.parse, b'\x10\x04D\x04>\x04=\x04'+bytes(92))
+
+def test_class_paddedstring_utf16_parse_compiled(benchmark):
+    d = PaddedString(100, "utf16")
+    d = d.compile()
+    benchmark(d.parse, b'\x10\x04D\x04>\x04=\x04'+bytes(92))
+
 def test_class_pascalstring_parse(benchmark):
     d = PascalString(Byte, "utf8")
     benchmark(d.parse, b'\x08\xd0\x90\xd1\x84\xd0\xbe\xd0\xbd'+bytes(100))
@@ -189,6 +243,11 @@ def test_class_pascalstring_build(benchmark):
     d = PascalString(Byte, "utf8")
     benchmark(d.build, u"Афон")
 
+def test_class_pascalstring_build_compiled(benchmark):
+    d = PascalString(Byte, "utf8")
+    d = d.compile()
+    benchmark(d.build, u"Афон")
+
 def test_class_cstring_parse(benchmark):
     d = CString("utf8")
     benchmark(d.parse, b'\xd0\x90\xd1\x84\xd0\xbe\xd0\xbd\x00'+bytes(100))
@@ -202,6 +261,20 @@ def test_class_cstring_build(benchmark):
     d = CString("utf8")
     benchmark(d.build, u"Афон")
 
+def test_class_cstring_build_compiled(benchmark):
+    d = CString("utf8")
+    d = d.compile()
+    benchmark(d.build, u"Афон")
+
+def test_class_cstring_utf16_parse(benchmark):
+    d = CString("utf16")
+    benchmark(d.parse, b'\x10\x04D\x04>\x04=\x04\x00\x00'+bytes(100))
+
+def test_class_cstring_utf16_parse_compiled(benchmark):
+    d = CString("utf16")
+    d = d.compile()
+    benchmark(d.parse, b'\x10\x04D\x04>\x04=\x04\x00\x00'+bytes(100))
+
 def test_class_greedystring_parse(benchmark):
     d = GreedyString("utf8")
     benchmark(d.parse, b'\xd0\x90\xd1\x84\xd0\xbe\xd0\xbd\x00'+bytes(100))
@@ -215,6 +288,11 @@ def test_class_greedystring_build(benchmark):
     d = GreedyString("utf8")
     benchmark(d.build, u"Афон")
 
+def test_class_greedystring_build_compiled(benchmark):
+    d = GreedyString("utf8")
+    d = d.compile()
+    benchmark(d.build, u"Афон")
+
 def test_class_flag_parse(benchmark):
     d = Flag
     benchmark(d.parse, bytes(1))
@@ -304,6 +382,69 @@ def test_class_struct_build_compiled(benchmark):
     d = d.compile()
     benchmark(d.build, dict(a=0, b=0, c=0, d=0, e=0))
 
+def test_class_struct_header_parse(benchmark):
+    d = Struct("magic"/Bytes(4), "version"/Int16ul, "flags"/Int16ul, Padding(4), *[f"field{i}"/Int32ul for i in range(16)])
+    benchmark(d.parse, bytes(76))
+
+def test_class_struct_header_parse_compiled(benchmark):
+    d = Struct("magic"/Bytes(4), "version"/Int16ul, "flags"/Int16ul, Padding(4), *[f"field{i}"/Int32ul for i in range(16)])
+    d = d.compile()
+    benchmark(d.parse, bytes(76))
+
+def test_class_struct_header_build(benchmark):
+    d = Struct("magic"/Bytes(4), "version"/Int16ul, "flags"/Int16ul, Padding(4), *[f"field{i}"/Int32ul for i in range(16)])
+    benchmark(d.build, dict(magic=bytes(4), version=0, flags=0, **{f"field{i}":0 for i in range(16)}))
+
+def test_class_struct_header_build_compiled(benchmark):
+    d = Struct("magic"/Bytes(4), "version"/Int16ul, "flags"/Int16ul, Padding(4), *[f"field{i}"/Int32ul for i in range(16)])
+    d = d.compile()
+    benchmark(d.build, dict(magic=bytes(4), version=0, flags=0, **{f"field{i}":0 for i in range(16)}))
+
+def test_class_struct_nested_parse(benchmark):
+    d = Struct("a"/Struct("b"/Struct("c"/Byte, "d"/Byte), "e"/Byte), "f"/Byte)
+    benchmark(d.parse, bytes(4))
+
+def test_class_struct_nested_parse_compiled(benchmark):
+    d = Struct("a"/Struct("b"/Struct("c"/Byte, "d"/Byte), "e"/Byte), "f"/Byte)
+    d = d.compile()
+    benchmark(d.parse, bytes(4))
+
+def test_class_struct_nested_build(benchmark):
+    d = Struct("a"/Struct("b"/Struct("c"/Byte, "d"/Byte), "e"/Byte), "f"/Byte)
+    benchmark(d.build, dict(a=dict(b=dict(c=0, d=0), e=0), f=0))
+
+def test_class_struct_nested_build_compiled(benchmark):
+    d = Struct("a"/Struct("b"/Struct("c"/Byte, "d"/Byte), "e"/Byte), "f"/Byte)
+    d = d.compile()
+    benchmark(d.build, dict(a=dict(b=dict(c=0, d=0), e=0), f=0))
+
+def test_class_struct_sizeof(benchmark):
+    d = Struct("a"/Int32ul, "data"/Bytes(this._.n), "items"/Array(this._.count, Int32ul), "b"/Struct("c"/Int16ul, "d"/Int16ul))
+    benchmark(d.sizeof, n=10, count=10)
+
+def test_class_struct_sizeof_compiled(benchmark):
+    d = Struct("a"/Int32ul, "data"/Bytes(this._.n), "items"/Array(this._.count, Int32ul), "b"/Struct("c"/Int16ul, "d"/Int16ul))
+    d = d.compile()
+    benchmark(d.sizeof, n=10, count=10)
+
+def test_class_array_struct_parse(benchmark):
+    d = Array(100, Struct("a"/Int8ub, "b"/Int16ul))
+    benchmark(d.parse, bytes(300))
+
+def test_class_array_struct_parse_compiled(benchmark):
+    d = Array(100, Struct("a"/Int8ub, "b"/Int16ul))
+    d = d.compile()
+    benchmark(d.parse, bytes(300))
+
+def test_class_array_struct_build(benchmark):
+    d = Array(100, Struct("a"/Int8ub, "b"/Int16ul))
+    benchmark(d.build, [dict(a=0, b=0)]*100)
+
+def test_class_array_struct_build_compiled(benchmark):
+    d = Array(100, Struct("a"/Int8ub, "b"/Int16ul))
+    d = d.compile()
+    benchmark(d.build, [dict(a=0, b=0)]*100)
+
 def test_class_sequence_parse(benchmark):
     d = Sequence(Byte, Byte, Byte, Byte, Byte)
     benchmark(d.parse, bytes(5))
@@ -340,6 +481,49 @@ def test_class_array_build_compiled(benchmark):
     d = d.compile()
     benchmark(d.build, [0]*100)
 
+def test_class_array_int32_parse(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Int32ul))
+    benchmark(d.parse, b"\xe8\x03"+bytes(4000))
+
+def test_class_array_int32_parse_compiled(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Int32ul))
+    d = d.compile()
+    benchmark(d.parse, b"\xe8\x03"+bytes(4000))
+
+def test_class_array_int32_build(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Int32ul))
+    benchmark(d.build, dict(count=1000, items=[0]*1000))
+
+def test_class_array_int32_build_compiled(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Int32ul))
+    d = d.compile()
+    benchmark(d.build, dict(count=1000, items=[0]*1000))
+
+def test_class_array_numpy_parse(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Float32l, numpy=True))
+    benchmark(d.parse, b"\xe8\x03"+bytes(4000))
+
+def test_class_array_numpy_parse_compiled(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Float32l, numpy=True))
+    d = d.compile()
+    benchmark(d.parse, b"\xe8\x03"+bytes(4000))
+
+def test_class_array_records_parse(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Struct("ts"/Int64ul, "x"/Float32l, "flags"/Int16ul)))
+    benchmark(d.parse, b"\xe8\x03"+bytes(14000))
+
+def test_class_array_records_numpy_parse(benchmark):
+    d = Struct("count"/Int16ul, "items"/Array(this.count, Struct("ts"/Int64ul, "x"/Float32l, "flags"/Int16ul), numpy=True))
+    benchmark(d.parse, b"\xe8\x03"+bytes(14000))
+
+def test_class_greedyrange_records_columnar_parse(benchmark):
+    d = GreedyRange(Struct("ts"/Int64ul, "x"/Float32l, "flags"/Int16ul), columnar=True)
+    benchmark(d.parse, bytes(14000))
+
+def test_class_greedyrange_records_columnar_build(benchmark):
+    d = GreedyRange(Struct("ts"/Int64ul, "x"/Float32l, "flags"/Int16ul), columnar=True)
+    benchmark(d.build, d.parse(bytes(14000)))
+
 def test_class_greedyrange_parse(benchmark):
     d = GreedyRange(Byte)
     benchmark(d.parse, bytes(100))
@@ -353,6 +537,11 @@ def test_class_greedyrange_build(benchmark):
     d = GreedyRange(Byte)
     benchmark(d.build, [0]*100)
 
+def test_class_greedyrange_build_compiled(benchmark):
+    d = GreedyRange(Byte)
+    d = d.compile()
+    benchmark(d.build, [0]*100)
+
 def test_class_repeatuntil_parse(benchmark):
     d = RepeatUntil(obj_ > 0, Byte)
     benchmark(d.parse, bytes(i<100 for i in range(100)))
@@ -643,8 +832,28 @@ def test_class_select_build(benchmark):
     d = Select(Int32ub, CString("utf8"))
     benchmark(d.build, u"...")
 
-# - combines performance of other fields
-# Optional
+def test_class_select_build_compiled(benchmark):
+    d = Select(Int32ub, CString("utf8"))
+    d = d.compile()
+    benchmark(d.build, u"...")
+
+def test_class_optional_parse(benchmark):
+    d = Struct("a" / Int32ub, "b" / Optional(Int32ub))
+    benchmark(d.parse, bytes(6))
+
+def test_class_optional_parse_compiled(benchmark):
+    d = Struct("a" / Int32ub, "b" / Optional(Int32ub))
+    d = d.compile()
+    benchmark(d.parse, bytes(6))
+
+def test_class_optional_build(benchmark):
+    d = Struct("a" / Int32ub, "b" / Optional(Int32ub))
+    benchmark(d.build, dict(a=0, b=None))
+
+def test_class_optional_build_compiled(benchmark):
+    d = Struct("a" / Int32ub, "b" / Optional(Int32ub))
+    d = d.compile()
+    benchmark(d.build, dict(a=0, b=None))
 
 def test_class_if_parse(benchmark):
     d = If(this.cond, Byte)
@@ -937,18 +1146,56 @@ def test_class_nullstripped_build(benchmark):
 # - measured by other fields
 # RestreamData
 # Transformed
-# - not compilable
 # Restreamed
-# ProcessXor
-# ProcessRotateLeft
-# Checksum
-# - decompilable
-# Compressed
+
+def test_class_processxor_parse(benchmark):
+    d = ProcessXor(b"\x01\x02\x03", GreedyBytes)
+    benchmark(d.parse, bytes(100))
+
+def test_class_processxor_parse_compiled(benchmark):
+    d = ProcessXor(b"\x01\x02\x03", GreedyBytes)
+    d = d.compile()
+    benchmark(d.parse, bytes(100))
+
+def test_class_processrotateleft_parse(benchmark):
+    d = ProcessRotateLeft(4, 1, GreedyBytes)
+    benchmark(d.parse, bytes(100))
+
+def test_class_processrotateleft_parse_compiled(benchmark):
+    d = ProcessRotateLeft(4, 1, GreedyBytes)
+    d = d.compile()
+    benchmark(d.parse, bytes(100))
+
+def test_class_compressed_parse(benchmark):
+    d = Prefixed(Byte, Compressed(Array(100, Byte), "zlib"))
+    benchmark(d.parse, d.build(bytes(100)))
+
+def test_class_compressed_parse_compiled(benchmark):
+    d = Prefixed(Byte, Compressed(Array(100, Byte), "zlib"))
+    d = d.compile()
+    benchmark(d.parse, d.build(bytes(100)))
+
 # - not compilable
+# Checksum
 # Rebuffered
 
-# - not compilable
-# LazyBound
+def test_class_lazybound_parse(benchmark):
+    d = Struct("value" / Byte, "next" / If(this.value > 0, LazyBound(lambda: d)))
+    benchmark(d.parse, bytes(range(20, -1, -1)))
+
+def test_class_lazybound_parse_compiled(benchmark):
+    d = Struct("value" / Byte, "next" / If(this.value > 0, LazyBound(lambda: d)))
+    c = d.compile()
+    benchmark(c.parse, bytes(range(20, -1, -1)))
+
+def test_class_lazystruct_parse(benchmark):
+    d = LazyStruct("a" / Int32ub, "b" / VarInt, "c" / Bytes(10), "d" / Int16ub)
+    benchmark(lambda data: d.parse(data).d, d.build(dict(a=1, b=2, c=bytes(10), d=3)))
+
+def test_class_lazystruct_parse_compiled(benchmark):
+    d = LazyStruct("a" / Int32ub, "b" / VarInt, "c" / Bytes(10), "d" / Int16ub)
+    c = d.compile()
+    benchmark(lambda data: c.parse(data).d, d.build(dict(a=1, b=2, c=bytes(10), d=3)))
 
 # - not compilable
 # ExprAdapter
@@ -960,6 +1207,25 @@ def test_class_nullstripped_build(benchmark):
 # Slicing
 # Indexing
 
+def test_this_expression(benchmark):
+    x = this._.header.count * 4 + this.offset
+    context = Container(_=Container(header=Container(count=5)), offset=1)
+    benchmark(x, context)
+
+def test_context_container(benchmark):
+    parent = Container(_parsing=True, _building=False, _sizing=False)
+    parent._params = parent
+    def context():
+        context = Container(_ = parent, _params = parent._params, _root = None, _parsing = parent._parsing, _building = parent._building, _sizing = parent._sizing, _subcons = None, _io = None, _index = parent.get("_index", None))
+        context._root = context._.get("_root", context)
+        return context
+    benchmark(context)
+
+def test_context_frame(benchmark):
+    parent = Container(_parsing=True, _building=False, _sizing=False)
+    parent._params = parent
+    benchmark(ContextFrame, parent, None, None)
+
 def test_overall_parse(benchmark):
     d = example
     benchmark(d.parse, exampledata)
@@ -979,3 +1245,14 @@ def test_overall_build_compiled(benchmark):
     d = d.compile()
     obj = example.parse(exampledata)
     benchmark(d.build, obj)
+
+@pytest.mark.parametrize("count", [100, 400, 1600])
+def test_overall_compile(benchmark, count):
+    d = Struct(*[
+        f"f{i}" / [Int32ub, Bytes(4), Enum(Byte, a=1, b=2), Array(3, Int16ul), Struct("x" / Int8ub, "y" / PascalString(Byte, "utf8"))][i % 5]
+        for i in range(count)
+    ])
+    def compile():
+        construct.core.compiledcache.clear()
+        return d.compile()
+    benchmark.pedantic(compile, rounds=3)
@@ -3,6 +3,7 @@
 from tests.declarativeunittest import *
 from construct import *
 from construct.lib import *
+import construct.core
 
 
 example = Struct(
@@ -190,3 +191,232 @@ def test_compiled_example_integrity():
     data2 = d.build(obj)
     assert obj == obj2
     assert data == data2
+
+def test_compiled_cache(tmp_path):
+    construct.core.compiledcache.clear()
+    d = example.compile(cachedir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+    construct.core.compiledcache.clear()
+    d2 = example.compile(cachedir=tmp_path)
+    assert d2.source == d.source
+    assert d2.defersubcon is example
+    assert d2.parse(exampledata) == d.parse(exampledata)
+    assert d2.build(d.parse(exampledata)) == d.build(d.parse(exampledata))
+
+def test_compiled_cache_rebinds_functions(tmp_path):
+    def make(extra):
+        return Struct(
+            "count" / Rebuild(Byte, lambda this: len(this.items) + extra),
+            "rest" / Prefixed(Byte, Compressed(GreedyBytes, "zlib")),
+            "items" / GreedyRange(Byte),
+        )
+    d1 = make(0).compile(cachedir=tmp_path)
+    construct.core.compiledcache.clear()
+    d2 = make(0).compile(cachedir=tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+    assert d2.build(dict(items=[1,2], rest=b"x")) == d1.build(dict(items=[1,2], rest=b"x"))
+    d3 = make(1)
+    assert d3.compile(cachedir=tmp_path).build(dict(items=[1,2,3], rest=b"x")) == d3.build(dict(items=[1,2,3], rest=b"x"))
+    assert len(os.listdir(tmp_path)) == 2
+
+def test_compiled_cache_corrupted(tmp_path):
+    d = Struct("a" / Byte)
+    d.compile(cachedir=tmp_path)
+    for name in os.listdir(tmp_path):
+        (tmp_path / name).write_bytes(b"garbage")
+    construct.core.compiledcache.clear()
+    assert d.compile(cachedir=tmp_path).parse(b"\x01") == Container(a=1)
+
+def test_structural_equality():
+    def header():
+        return Struct("a" / Int32ul, "b" / Bytes(this.a), "c" / Enum(Byte, x=1, y=2))
+    assert header().fingerprint() == header().fingerprint()
+    assert header().fingerprint() != Struct("a" / Int32ul, "b" / Bytes(this.a), "c" / Enum(Byte, x=1, y=3)).fingerprint()
+    assert header().fingerprint() != Struct("a" / Int32ul, "b" / Bytes(this.a+1), "c" / Enum(Byte, x=1, y=2)).fingerprint()
+    assert header().fingerprint() != Struct("z" / Int32ul, "b" / Bytes(this.a), "c" / Enum(Byte, x=1, y=2)).fingerprint()
+    assert Timestamp(Int64ub, 1, 1970).fingerprint() != Timestamp(Int64ub, 1, 1904).fingerprint()
+    assert Rebuild(Byte, lambda this: 1).fingerprint() != Rebuild(Byte, lambda this: 2).fingerprint()
+    assert Rebuild(Byte, lambda this: object()).fingerprint() is not None
+    assert Computed(object()).fingerprint() is None
+    # constructs are mutable, so they compare and hash by identity
+    d = header()
+    assert d != header() and len({d, header(), Byte}) == 3
+    s = {d}
+    d.subcons[0].name = "z"
+    assert d in s
+
+def test_fingerprint_globals():
+    source = 'd = Struct("a"/Byte, "b"/Rebuild(Byte, lambda this: this.a+X))'
+    namespaces = [dict(construct.__dict__, X=1), dict(construct.__dict__, X=2)]
+    for namespace in namespaces:
+        exec(source, namespace)
+    d1, d2 = namespaces[0]["d"], namespaces[1]["d"]
+    assert d1.fingerprint() != d2.fingerprint()
+    assert d1.compile().build(dict(a=1)) == d1.build(dict(a=1)) == b"\x01\x02"
+    assert d2.compile().build(dict(a=1)) == d2.build(dict(a=1)) == b"\x01\x03"
+
+def test_fingerprint_hidden_state():
+    class XorCodec:
+        def __init__(self, key):
+            self.key = key
+        def __repr__(self):
+            return "XorCodec()"
+        def dec(self, data):
+            return bytes(b ^ self.key for b in data)
+    d1 = Transformed(GreedyBytes, XorCodec(1).dec, None, XorCodec(1).dec, None)
+    d2 = Transformed(GreedyBytes, XorCodec(2).dec, None, XorCodec(2).dec, None)
+    assert d1.fingerprint() is None and d2.fingerprint() is None
+    c1, c2 = d1.compile(), d2.compile()
+    assert c1 is not c2
+    assert c1.parse(b"\x00") == b"\x01" and c2.parse(b"\x00") == b"\x02"
+    assert Rebuild(Byte, {1:2}.get).fingerprint() != Rebuild(Byte, {1:3}.get).fingerprint()
+    import datetime
+    assert Computed(datetime.date(2000,1,1)).fingerprint() == Computed(datetime.date(2000,1,1)).fingerprint() != Computed(datetime.date(2000,1,2)).fingerprint()
+
+def test_compiled_shared():
+    def header():
+        return Struct("a" / Int32ul, "b" / Bytes(this.a), "c" / Enum(Byte, x=1, y=2))
+    d1 = header().compile()
+    d2 = header().compile()
+    assert d1 is d2
+    assert d2.parse(b"\x01\x00\x00\x00?\x02") == Container(a=1, b=b"?", c="y")
+    assert Struct("a" / Int16ul).compile() is not d1
+    for i in range(construct.core.compiledcachesize + 1):
+        Struct("a" / Bytes(i)).compile()
+    assert len(construct.core.compiledcache) == construct.core.compiledcachesize
+    assert header().compile() is not d1
+
+def test_compiled_dedup():
+    def point():
+        return Struct("x" / Byte, "y" / Bytes(this.x), "e" / Enum(Byte, a=1))
+    d = Struct("p1" / point(), "p2" / point(), "p3" / Struct("x" / Byte, "y" / Bytes(this.x), "e" / Enum(Byte, a=2)))
+    c = d.compile()
+    assert c.source.count("def parse_struct_") == 3
+    data = b"\x01a\x01\x02bb\x01\x00\x02"
+    assert c.parse(data) == d.parse(data)
+    assert c.build(d.parse(data)) == data
+
+def test_compiled_dedup_globals():
+    source = 'f = Struct("a" / Byte, "b" / Rebuild(Byte, lambda this: this._.a+X))'
+    namespaces = [dict(construct.__dict__, X=1), dict(construct.__dict__, X=2)]
+    for namespace in namespaces:
+        exec(source, namespace)
+    d = Struct("a" / Byte, "p" / namespaces[0]["f"], "q" / namespaces[1]["f"])
+    obj = dict(a=1, p=dict(a=0), q=dict(a=0))
+    assert d.compile().build(obj) == d.build(obj) == b"\x01\x00\x02\x00\x03"
+
+def test_compiled_report():
+    d = Struct(
+        "a" / Byte,
+        "b" / Prefixed(Byte, Compressed(GreedyBytes, "zlib")),
+        "c" / Struct("x" / ExprAdapter(Byte, obj_+1, obj_-1), "y" / Int16ub),
+        "d" / Struct("x" / ExprAdapter(Byte, obj_+1, obj_-1), "y" / Int16ub),
+    )
+    data = d.build(dict(a=1, b=b"hello", c=dict(x=1, y=2), d=dict(x=1, y=2)))
+    c, report = d.compile(report=True)
+    assert c is not d.compile()
+    assert c.parse(data).b == b"hello"
+    assert [(e.path, e.classname, e.kind, e.time) for e in report] == [
+        ("(root) -> b", "Prefixed", "build", None),
+        ("(root) -> c -> x", "ExprAdapter", "parse", None),
+        ("(root) -> c -> x", "ExprAdapter", "build", None),
+        ("(root) -> d -> x", "ExprAdapter", "parse", None),
+        ("(root) -> d -> x", "ExprAdapter", "build", None),
+    ]
+    c, report = d.compile(report=True, sampledata=data)
+    assert all(e.time > 0 for e in report)
+    assert c.build(c.parse(data)) == data
+    assert Struct("a" / Byte).compile(report=True)[1] == []
+    assert len(d.compile().compile(report=True)[1]) == 5
+
+def test_autocompile():
+    import copy
+    d = Struct("a" / Int16ub, "b" / Bytes(this.a)).autocompile(threshold=3, background=False)
+    for i in range(2):
+        assert d.parse(b"\x00\x01x") == Container(a=1, b=b"x")
+        assert d._autocompile.compiled is None
+    assert d.build(dict(a=1, b=b"y")) == b"\x00\x01y"
+    assert isinstance(d._autocompile.compiled, Compiled)
+    assert d.parse(b"\x00\x01x") == Container(a=1, b=b"x")
+    assert d.parse_stream(io.BytesIO(b"\x00\x01x")) == Container(a=1, b=b"x")
+    assert d.fingerprint() == Struct("a" / Int16ub, "b" / Bytes(this.a)).fingerprint()
+    assert copy.copy(d)._autocompile is None
+
+    d = Struct("a" / Byte).autocompile(threshold=1)
+    assert d.parse(b"\x01") == Container(a=1)
+    d._autocompile.thread.join()
+    assert isinstance(d._autocompile.compiled, Compiled)
+
+    d = Struct("a" / Byte).autocompile(threshold=0, background=False)
+    def compile():
+        raise RuntimeError
+    d.compile = compile
+    assert d.parse(b"\x01") == Container(a=1)
+    assert d.parse(b"\x01") == Container(a=1)
+    assert d._autocompile.failed and d._autocompile.calls == 1
+    assert raises(Byte.autocompile, -1) == ConstructError
+
+def test_compiled_buffer():
+    d = Struct(
+        "a" / Int16ul,
+        "b" / Bytes(2),
+        "n" / Byte,
+        "c" / Array(this.n, Int16ub),
+        "s" / Array(2, Struct("x" / Byte, "y" / BytesInteger(3, swapped=True))),
+        "v" / VarInt,
+        "p" / PascalString(Byte, "utf8"),
+        "e" / Enum(Byte, x=1),
+    )
+    data = b"\x01\x00ab\x02\x00\x01\x00\x02\x01\x01\x00\x00\x02\x02\x00\x00\x81\x01\x02hi\x01"
+    c = d.compile()
+    assert "unpack_from(buf" in c.source
+    obj = d.parse(data)
+    assert c.parse(data) == c.parse(bytearray(data)) == c.parse(memoryview(data)) == c.parse_stream(io.BytesIO(data)) == obj
+    assert raises(c.parse, data[:3]) == StreamError
+    assert raises(c.parse, data[:-1]) == StreamError
+    assert Struct("a" / Byte, "b" / Bytes(2)).compile().parse(b"\x01\x02\x03") == Container(a=1, b=b"\x02\x03")
+
+def test_compiled_sizeof():
+    d = Struct(
+        "h" / Int32ul,
+        "data" / Bytes(this._.n),
+        "items" / Array(this._.count, Int32ul),
+        "s" / Struct("x" / Int16ul, Padding(2)),
+        "o" / If(this._.flag, Int64ul),
+        "p" / Computed(this.h),
+    )
+    c = d.compile()
+    assert "def sizeof_struct_" in c.source
+    for kw in [dict(n=3, count=2, flag=True), dict(n=0, count=0, flag=False)]:
+        assert c.sizeof(**kw) == d.sizeof(**kw)
+    assert raises(c.sizeof) == SizeofError
+    assert raises(c.sizeof, n=1, count=1) == SizeofError
+    assert "return 8" in Struct("a" / Int32ul, "b" / Bytes(4)).compile().source
+    assert raises(GreedyBytes.compile().sizeof) == SizeofError
+    assert raises(Padded(this.n, Byte).compile().sizeof, n=-1) == PaddingError
+    assert raises(Array(this.n, Byte).sizeof, n=-1) == RangeError
+    assert raises(Array(this.n, Byte).compile().sizeof, n=-1) == RangeError
+
+def test_export_module(tmp_path, monkeypatch):
+    import importlib
+    monkeypatch.syspath_prepend(str(tmp_path))
+    d = Struct("a" / Int32ul, "b" / PascalString(Byte, "utf8"), "c" / Array(2, Struct("x" / Byte)))
+    d.export_module(str(tmp_path / "aotsimple.py"))
+    module = importlib.import_module("aotsimple")
+    data = b"\x01\x00\x00\x00\x02hi\x05\x06"
+    assert module.compiled.parse(data) == d.parse(data)
+    assert module.compiled.build(d.parse(data)) == data
+    assert raises(module.compiled.sizeof) == SizeofError
+
+    (tmp_path / "aotschema.py").write_text(
+        "from construct import *\n"
+        "d = Struct('count' / Rebuild(Byte, lambda this: len(this.items)), 'items' / Array(this.count, Int16ul), 'z' / Compressed(GreedyBytes, 'zlib'))\n"
+    )
+    schema = importlib.import_module("aotschema")
+    assert raises(schema.d.export_module, str(tmp_path / "aotlinked.py")) == ConstructError
+    schema.d.export_module(str(tmp_path / "aotlinked.py"), schema="aotschema:d")
+    module = importlib.import_module("aotlinked")
+    obj = dict(items=[1,2], z=b"zzz")
+    assert module.compiled.build(obj) == schema.d.build(obj)
+    assert module.compiled.parse(schema.d.build(obj)) == schema.d.parse(schema.d.build(obj))
+    assert module.compiled.defersubcon is schema.d
@@ -157,6 +157,10 @@ def test_bytesinteger():
     assert raises(BytesInteger(8, False).build, -2**64) == IntegerError
     assert raises(BytesInteger(8, False).build,  2**64) == IntegerError
     assert raises(BytesInteger(this.missing).sizeof) == SizeofError
+    for d in [BytesInteger(3), BytesInteger(3, swapped=True), BytesInteger(this.n), Struct("b"/Byte, "a"/BytesInteger(3))]:
+        for c in [d, d.compile()]:
+            assert raises(c.parse, b"\x01", n=3) == StreamError
+            assert raises(c.parse_stream, io.BytesIO(b"\x01"), n=3) == StreamError
 
 def test_bitsinteger():
     d = BitsInteger(0)
@@ -202,6 +206,16 @@ def test_varint_issue_705():
     d = Struct('namelen' / VarInt, Check(this.namelen == 400))
     d.build(dict(namelen=400))
 
+def test_varint_readahead():
+    d = Struct("a" / VarInt, "b" / VarInt, "rest" / GreedyBytes)
+    for c in [d, d.compile()]:
+        assert c.parse(b"\xac\x02\x01xyz") == Container(a=300, b=1, rest=b"xyz")
+        assert c.parse(b"\x80"*14+b"\x04\x05") == Container(a=2**100, b=5, rest=b"")
+    assert raises(VarInt.parse, b"\x80\x80") == StreamError
+    assert raises(VarInt.compile().parse, b"\x80"*20) == StreamError
+    d = Bitwise(Struct("a" / Nibble, "b" / Bytewise(VarInt), "c" / Nibble))
+    assert d.parse(b"\x1a\xc0\x23") == Container(a=1, b=300, c=3)
+
 def test_zigzag():
     d = ZigZag
     common(d, b"\x00", 0)
@@ -287,6 +301,40 @@ def test_string_encodings():
     common(GreedyString("utf-8"), b"", u"")
     common(GreedyString("utf-8"), b'\xd0\x90\xd1\x84\xd0\xbe\xd0\xbd', u"Афон")
 
+def test_strings_compiled():
+    d = PaddedString(7, "utf16").compile()
+    assert d.parse(b"a\x00b\x00\x00\x00\x00") == u"ab"
+    assert d.parse(b"a\x00\x00\x00\x00\x00\x00") == u"a"
+    assert raises(d.build, u"abcd") == PaddingError
+    for d in [PaddedString(3, "utf16"), PaddedString(3, "ascii"), Struct("s"/PaddedString(3, "utf16"))]:
+        for c in [d, d.compile()]:
+            assert raises(c.parse, b"") == StreamError
+            assert raises(c.parse, b"a\x00") == StreamError
+    d = CString("utf32").compile()
+    assert d.parse(b"\x00\x00\x01\x00\x00\x00\x00\x00"+bytes(256)) == u"\U00010000"
+    assert raises(d.parse, b"a\x00\x00\x00\x00") == StreamError
+    d = Struct("s" / CString("utf16"), "rest" / GreedyBytes).compile()
+    assert d.parse(b"a\x00"*100+b"\x00\x00xyz") == Container(s=u"a"*100, rest=b"xyz")
+    d = PascalString(VarInt, "utf8").compile()
+    assert d.build(u"Афон") == b'\x08\xd0\x90\xd1\x84\xd0\xbe\xd0\xbd'
+    for d in [PaddedString(4, "ascii"), PascalString(Byte, "ascii"), CString("ascii"), GreedyString("ascii")]:
+        for c in [d, d.compile(), Struct("s"/d).compile()]:
+            assert raises(c.parse, b"\x01\xff\x00\x00") == StringError
+        for c in [d, d.compile()]:
+            assert raises(c.build, b"ab") == StringError
+            assert raises(c.build, u"\xff") == StringError
+    class Unseekable(io.RawIOBase):
+        def __init__(self, data):
+            self.data = io.BytesIO(data)
+        def readable(self):
+            return True
+        def readinto(self, b):
+            return self.data.readinto(b)
+        def tell(self):
+            return self.data.tell()
+    for d in [CString("utf8"), CString("utf16")]:
+        assert d.compile().parse_stream(Unseekable(b"a\x00b\x00\x00\x00x")) == d.parse_stream(Unseekable(b"a\x00b\x00\x00\x00x"))
+
 def test_flag():
     d = Flag
     common(d, b"\x00", False, 1)
@@ -443,6 +491,42 @@ def test_struct_nested():
     d = Struct("a"/Byte, "b"/Int16ub, "inner"/Struct("c"/Byte, "d"/Byte))
     common(d, b"\x01\x00\x02\x03\x04", Container(a=1,b=2,inner=Container(c=3,d=4)), 5)
 
+def test_struct_compiled_packed():
+    d = Struct("a"/Int32ul, "b"/Int16ul, Padding(2), "c"/Bytes(3), "d"/Int8ub, "e"/Int16ub, "h"/VarInt, "i"/Int64sl, "p"/Padding(1), "j"/Int8ul, "k"/Check(this.e == 0x0607))
+    c = d.compile()
+    assert "struct.Struct('<LH2x3s')" in c.source and "struct.Struct('>BH')" in c.source
+    data = b"\x01\x00\x00\x00\x02\x00??abc\x05\x06\x07\x08\x09\x00\x00\x00\x00\x00\x00\x00\x00\x0a"
+    obj = Container(a=1, b=2, c=b"abc", d=5, e=0x0607, h=8, i=9, p=None, j=10, k=None)
+    assert c.parse(data) == d.parse(data) == obj
+    assert c.build(obj) == d.build(obj) == data.replace(b"??", bytes(2))
+    assert raises(c.build, dict(obj, c=b"ab")) == StreamError
+
+def test_struct_contextfree():
+    d = Struct("a"/Int8ub, "b"/Array(2, Int16ul), "c"/Struct("x"/Byte), "d"/PascalString(Byte, "utf8"))
+    assert d._contextfree and d.c._contextfree
+    common(d, b"\x01\x02\x00\x03\x00\x04\x02hi", Container(a=1, b=[2,3], c=Container(x=4), d="hi"))
+    assert not Struct("n"/Byte, "d"/Bytes(this.n))._contextfree
+    assert not Struct("n"/Byte, "d"/Bytes(lambda this: this.n))._contextfree
+    assert not Struct("i"/Index)._contextfree
+    assert not Struct("x"/Byte * (lambda obj,ctx: None))._contextfree
+    d = Struct("n"/Byte, "s"/Struct("x"/Struct("d"/Bytes(this._._.n))))
+    assert not d._contextfree and not d.s._contextfree
+    common(d, b"\x02ab", Container(n=2, s=Container(x=Container(d=b"ab"))))
+    d = Struct("n"/Byte, "s"/Sequence(Byte, Byte), "d"/Bytes(this.n))
+    assert not d._contextfree and d.s._contextfree
+    common(d, b"\x02\x01\x02ab", Container(n=2, s=[1,2], d=b"ab"))
+    # nested arrays of a context-free struct must not clobber _index of the enclosing array
+    d = Array(2, Struct("s"/Struct("arr"/Array(3, Byte)), "k"/Computed(this._index), "i"/Index))
+    assert d.subcon.s._contextfree
+    assert [(e.k, e.i) for e in d.parse(bytes(6))] == [(0,0), (1,1)]
+    d = Array(2, Sequence(Sequence(GreedyRange(Byte, discard=True)), Index))
+    assert [e[1] for e in d.parse(b"")] == [0,1]
+    # nested constructs are analysed once, not again by every enclosing Struct
+    from construct.core import usescontextcache
+    inner = Prefixed(Byte, Array(2, Bytes(this._index)))
+    d = Struct("a"/Struct("b"/inner))
+    assert usescontextcache[inner] is True and not d._contextfree
+
 def test_struct_kwctor():
     d = Struct(a=Byte, b=Byte, c=Byte, d=Byte)
     common(d, b"\x01\x02\x03\x04", Container(a=1,b=2,c=3,d=4), 4)
@@ -511,10 +595,66 @@ def test_array():
     assert d.build([1,2,3]) == b"\x01\x02\x03"
     assert d.sizeof() == 3
 
+def test_array_compiled():
+    d = Array(3, Int16ul).compile()
+    assert "formatarray" in d.source
+    assert d.parse(b"\x01\x00\x02\x00\x03\x00") == [1,2,3]
+    assert d.build([1,2,3]) == b"\x01\x00\x02\x00\x03\x00"
+    d = Struct("n"/Byte, "items"/Array(this.n, Int32sb)).compile()
+    assert d.parse(b"\x02\xff\xff\xff\xff\x00\x00\x00\x01") == Container(n=2, items=[-1,1])
+    assert d.build(dict(n=2, items=[-1,1])) == b"\x02\xff\xff\xff\xff\x00\x00\x00\x01"
+    assert raises(d.build, dict(n=2, items=[1])) == RangeError
+    assert raises(d.build, dict(n=2, items=[1,2,3])) == RangeError
+    d = Array(this.n, Float32l).compile()
+    assert d.parse(bytes(8), n=2) == [0.0, 0.0]
+    assert raises(d.parse, bytes(8), n=-1) == RangeError
+    d = Array(3, Byte, discard=True).compile()
+    assert d.parse(b"\x01\x02\x03") == []
+    d = Array(this.n, Struct("a"/Byte, "b"/Int16ub)).compile()
+    assert "lambda" not in d.source
+    assert d.parse(b"\x01\x00\x02\x03\x00\x04", n=2) == [Container(a=1, b=2), Container(a=3, b=4)]
+    assert d.build([dict(a=1, b=2), dict(a=3, b=4)], n=2) == b"\x01\x00\x02\x03\x00\x04"
+    assert raises(d.build, [dict(a=1, b=2)], n=2) == RangeError
+    assert raises(d.parse, b"", n=-1) == RangeError
+    assert Array(2, Struct("a"/Byte), discard=True).compile().parse(b"\x01\x02") == []
+
 @xfail(ONWINDOWS, reason="/dev/zero not available on Windows")
 def test_array_nontellable():
     assert Array(5, Byte).parse_stream(devzero) == [0,0,0,0,0]
 
+def test_array_bulk():
+    for d, data, obj, size in [
+        (Array(3, Int16ul), b"\x01\x00\x02\x00\xff\xff", [1,2,0xffff], 6),
+        (Array(2, "x"/Float32b), bytes(8), [0.0,0.0], 8),
+        (Array(2, BytesInteger(2, signed=True, swapped=True)), b"\xff\xff\x01\x00", [-1,1], 4),
+        (Array(2, BytesInteger(3)), b"\x00\x00\x01\x01\x00\x00", [1,0x010000], 6),
+        (GreedyRange(Int16ub), b"\x00\x01\x00\x02", [1,2], SizeofError),
+        (GreedyRange(BytesInteger(3, swapped=True)), b"\x01\x00\x00\x02\x00\x00", [1,2], SizeofError),
+    ]:
+        common(d, data, obj, size)
+        assert d.parse(data + b"\x00") == obj
+    assert Array(2, Byte, discard=True).parse(b"\x01\x02") == []
+    assert GreedyRange(Byte, discard=True).parse(b"\x01\x02") == []
+    assert raises(Array(3, Int16ul).parse, b"\x01\x00") == StreamError
+    assert raises(Array(2, Byte).build, [1,256]) == FormatFieldError
+    assert raises(Array(2, BytesInteger(2)).build, [1,-1]) == IntegerError
+    assert raises(Array(2, BytesInteger(2)).build, [1,1.0]) == IntegerError
+    assert raises(GreedyRange(Byte).build, [1,256]) == FormatFieldError
+    assert GreedyRange(Byte).build(iter([1,2])) == b"\x01\x02"
+    d = Struct("n"/Byte, "items"/Array(this.n, Int16ub), "rest"/GreedyRange(Byte))
+    common(d, b"\x02\x00\x01\x00\x02\x03", Container(n=2, items=[1,2], rest=[3]), SizeofError)
+    d = Array(2, Byte * (lambda obj,ctx: outputs.append(obj)))
+    outputs = []
+    assert d.parse(b"\x01\x02") == [1,2]
+    assert outputs == [1,2]
+    # only plain bool parameters are taken in bulk, lambdas get evaluated per element
+    from construct.core import _bulkfield
+    assert _bulkfield(BytesInteger(2, signed=lambda this: True)) is None
+    assert _bulkfield(BytesInteger(2, swapped=this.le)) is None
+    d = Array(2, BytesInteger(2, swapped=this.le))
+    assert d.parse(b"\x01\x00\x02\x00", le=True) == [1,2]
+    assert d.parse(b"\x01\x00\x02\x00", le=False) == [256,512]
+
 def test_greedyrange():
     d = GreedyRange(Byte)
     common(d, b"", [], SizeofError)
@@ -528,6 +668,19 @@ def test_greedyrange():
     assert d.parse(b"\x01\x02") == []
     assert d.build([1,2]) == b"\x01\x02"
 
+def test_greedyrange_compiled():
+    d = GreedyRange(Bytes(2)).compile()
+    assert d.parse(b"abcde") == [b"ab", b"cd"]
+    d = Struct("items" / GreedyRange(Const(b"ab")), "rest" / GreedyBytes).compile()
+    assert d.parse(b"ababxy") == Container(items=[b"ab",b"ab"], rest=b"xy")
+    d = GreedyRange(Struct("n" / Byte, "data" / Bytes(this.n))).compile()
+    assert d.parse(b"\x01a\x02bc") == [Container(n=1,data=b"a"), Container(n=2,data=b"bc")]
+    d = GreedyRange(FocusedSeq("x", "x"/Byte, StopIf(this.x == 0))).compile()
+    assert d.parse(b"\x01\x00?????") == [1]
+    assert d.build([1,0,2]) == b"\x01\x00"
+    d = GreedyRange(Struct("x"/Byte, Error)).compile()
+    assert raises(d.parse, b"\x01") == ExplicitError
+
 def test_repeatuntil():
     d = RepeatUntil(obj_ == 9, Byte)
     common(d, b"\x02\x03\x09", [2,3,9], SizeofError)
@@ -696,6 +849,93 @@ def test_numpy():
     obj = numpy.array([1,2,3], dtype=numpy.int64)
     assert numpy.array_equal(Numpy.parse(Numpy.build(obj)), obj)
 
+def test_numpy_arrays():
+    import numpy
+    data = numpy.arange(6, dtype="<f4").tobytes()
+    for d in [Array(6, Float32l, numpy=True), GreedyRange(Float32l, numpy=True), PrefixedArray(Byte, Float32l, numpy=True)]:
+        blob = data if not isinstance(d, FocusedSeq) else b"\x06" + data
+        for c in [d, d.compile()]:
+            obj = c.parse(blob)
+            assert isinstance(obj, numpy.ndarray) and obj.dtype == numpy.float32
+            assert obj.tolist() == [0.0,1.0,2.0,3.0,4.0,5.0]
+            assert c.build(obj) == blob
+            assert c.build(list(range(6))) == blob
+    assert numpy.shares_memory(Array(6, Float32l, numpy=True).compile().parse(data), numpy.frombuffer(data, "u1"))
+    d = Struct("n"/Byte, "items"/Array(this.n, "x"/BytesInteger(2, signed=True, swapped=True), numpy=True), "rest"/GreedyRange(Int16ub, numpy=True))
+    for c in [d, d.compile()]:
+        obj = c.parse(b"\x02\xff\xff\x01\x00\x00\x03\x00")
+        assert obj.items.dtype == numpy.dtype("<i2") and obj.items.tolist() == [-1,1]
+        assert obj.rest.dtype == numpy.dtype(">u2") and obj.rest.tolist() == [3]
+        assert c.build(obj) == b"\x02\xff\xff\x01\x00\x00\x03"
+        assert raises(c.parse, b"\x02\xff\xff") == StreamError
+        assert raises(c.build, dict(n=2, items=[1], rest=[])) == RangeError
+        assert raises(c.build, dict(n=1, items=[[1]], rest=[])) == RangeError
+        assert raises(c.build, dict(n=1, items=["x"], rest=[])) == FormatFieldError
+    assert raises(lambda: Array(2, VarInt, numpy=True)) == FormatFieldError
+    assert raises(lambda: GreedyRange(BytesInteger(3), numpy=True)) == FormatFieldError
+
+def test_numpy_structs():
+    import numpy
+    d = Array(this.count, Struct("ts"/Int64ul, "x"/Float32l, Padding(2), "flags"/Int16ub, "inner"/Struct("a"/Int8sb, "b"/Bytes(3))), numpy=True)
+    data = b"".join(d.subcon.build(dict(ts=i, x=i/2, flags=7, inner=dict(a=-i, b=b"abc"))) for i in range(3))
+    for c in [d, d.compile()]:
+        obj = c.parse(data, count=3)
+        assert obj.dtype.itemsize == 20 and obj.dtype.names == ("ts", "x", "flags", "inner")
+        assert obj["ts"].tolist() == [0,1,2] and obj["x"].tolist() == [0.0,0.5,1.0] and obj["flags"].tolist() == [7,7,7]
+        assert obj["inner"]["a"].tolist() == [0,-1,-2] and bytes(obj["inner"]["b"][2]) == b"abc"
+        assert c.build(obj, count=3) == data
+        assert c.build([(i, i/2, 7, (-i, b"abc")) for i in range(3)], count=3) == data
+        assert c.build(numpy.frombuffer(b"\xff"*60, obj.dtype), count=3)[12:14] == b"\x00\x00"
+    assert GreedyRange(d.subcon, numpy=True).parse(data).tolist() == d.parse(data, count=3).tolist()
+    assert d._dtype == obj.dtype and d.compile().source.count("numpy.dtype(") == 1
+    assert raises(lambda: Array(2, Struct("a"/Byte, "b"/Computed(1)), numpy=True)) == FormatFieldError
+    assert raises(lambda: Array(2, Struct("a"/Byte, "b"/Struct("c"/VarInt)), numpy=True)) == FormatFieldError
+    assert raises(lambda: Array(2, Struct("a"/Byte, Byte), numpy=True)) == FormatFieldError
+    assert raises(lambda: Array(2, Struct("a"/Byte, "a"/Byte), numpy=True)) == FormatFieldError
+    assert raises(lambda: Array(2, Struct("a"/Byte, "b"/Bytes(this.a)), numpy=True)) == FormatFieldError
+    assert raises(lambda: Array(2, Struct("a"/Hex(Byte)), numpy=True)) == FormatFieldError
+    assert raises(lambda: Array(2, Struct(), numpy=True)) == FormatFieldError
+
+def test_numpy_build_checks():
+    import numpy
+    d = Struct("a"/Array(2, Byte, numpy=True), "b"/Array(2, Int16sb, numpy=True), "c"/Array(1, Float32l, numpy=True), "d"/GreedyRange(Struct("x"/Int8ub, "y"/Float32l), numpy=True))
+    good = dict(a=[255,0], b=[-32768,32767], c=[1.5], d=[(1, 2.0)])
+    for c in [d, d.compile()]:
+        assert c.build(good) == b"\xff\x00\x80\x00\x7f\xff\x00\x00\xc0?\x01\x00\x00\x00@"
+        assert c.build(dict(good, a=numpy.array([255,0]), b=[True,False], c=numpy.arange(1))) == b"\xff\x00\x00\x01\x00\x00\x00\x00\x00\x00\x01\x00\x00\x00@"
+        for bad in [dict(a=numpy.array([300,1])), dict(a=[300,1]), dict(a=[-1,0]), dict(a=[1.7,2]), dict(b=[1.9,-1.2]), dict(b=numpy.array([40000,0])), dict(c=[1e300]), dict(d=[(300, 2.0)]), dict(d=[(1.5, 2.0)])]:
+            assert raises(c.build, dict(good, **bad)) == FormatFieldError
+    source = d.compile().source
+    assert source.count("def parse_numpyarray(") == 1 and source.count("def build_numpyarray(") == 1
+
+def test_columnar_arrays():
+    import array, numpy
+    for st in [Struct("ts"/Int64ul, "x"/Float32l, Padding(2), "flags"/Int16ul), Struct("ts"/Int64sb, "x"/Float32b, "flags"/BytesInteger(2)), Struct("ts"/Int64ul, "x"/Float32l, "flags"/Int16ub)]:
+        data = b"".join(st.build(dict(ts=i, x=i/2, flags=i%3)) for i in range(5))
+        for d in [Array(5, st, columnar=True), GreedyRange(st, columnar=True), PrefixedArray(Byte, st, columnar=True)]:
+            blob = data if not isinstance(d, FocusedSeq) else b"\x05" + data
+            for c in [d, d.compile()]:
+                obj = c.parse(blob)
+                assert list(obj) == ["ts", "x", "flags"] and all(isinstance(column, array.array) for column in obj.values())
+                assert obj.ts.tolist() == [0,1,2,3,4] and obj.x.tolist() == [0.0,0.5,1.0,1.5,2.0] and obj.flags.tolist() == [0,1,2,0,1]
+                assert c.build(obj) == blob
+                assert c.build(dict(ts=range(5), x=[i/2 for i in range(5)], flags=[0,1,2,0,1])) == blob
+    d = GreedyRange(Struct("n"/Byte, "s"/PascalString(Byte, "utf8"), "v"/Int16ub), columnar=True)
+    for c in [d, d.compile()]:
+        obj = c.parse(b"\x00\x00\x00\x00\x01\x01a\x00\x01\x02")
+        assert obj == Container(n=array.array("B", [0,1]), s=ListContainer(["", "a"]), v=array.array("H", [0,1]))
+        assert c.build(obj) == b"\x00\x00\x00\x00\x01\x01a\x00\x01"
+        assert raises(c.build, dict(n=[0], s=["", ""], v=[0,0])) == RangeError
+        assert raises(c.build, [dict(n=0, s="", v=0)]) == RangeError
+        assert raises(c.build, dict(n=[256], s=[""], v=[0])) == FormatFieldError
+    d = Array(2, Struct("n"/Byte, "x"/Float64l), columnar=True, numpy=True)
+    obj = d.parse(bytes(18))
+    assert isinstance(obj.n, numpy.ndarray) and obj.n.dtype == numpy.uint8 and obj.x.dtype == numpy.dtype("<f8")
+    assert d.build(obj) == bytes(18)
+    assert raises(d.build, dict(n=[0,0,0], x=[0,0,0])) == RangeError
+    assert raises(lambda: Array(2, Byte, columnar=True)) == ConstructError
+    assert raises(lambda: GreedyRange(Struct("n"/Byte) * (lambda obj,ctx: None), columnar=True)) == ConstructError
+
 @xfail(reason="docs stated that it throws StreamError, not true at all")
 def test_numpy_error():
     import numpy, io
@@ -827,6 +1067,21 @@ def test_select():
     assert raises(Select(Int32ub, Int16ub).parse, b"") == SelectError
     assert raises(Select(Byte).sizeof) == SizeofError
 
+def test_select_compiled():
+    d = Struct("a" / Select(Const(b"XY"), Int16ub, Byte), "b" / Optional(Int32ul)).compile()
+    assert d.parse(b"XY\x01\x00\x00\x00") == Container(a=b"XY", b=1)
+    assert d.parse(b"\x00\x01??") == Container(a=1, b=None)
+    assert d.parse(b"\x01") == Container(a=1, b=None)
+    assert d.build(dict(a=b"XY", b=1)) == b"XY\x01\x00\x00\x00"
+    assert d.build(dict(a=2**8, b=None)) == b"\x01\x00"
+    assert d.build(dict(a=1, b=None)) == b"\x00\x01"
+    d = Select(Int8ub, Int16ub).compile()
+    assert raises(d.parse, b"") == SelectError
+    assert raises(d.build, -1) == SelectError
+    d = Select(Struct("x" / Byte, Error), Byte).compile()
+    assert raises(d.parse, b"\x01") == ExplicitError
+    assert raises(d.build, dict(x=1)) == ExplicitError
+
 def test_select_kwctor():
     d = Select(a=Int8ub, b=Int16ub, c=Int32ub)
     assert d.parse(b"\x01\x02\x03\x04") == 0x01
@@ -891,6 +1146,15 @@ def test_switch():
     d = Switch(this.x, {}, default=Byte)
     common(d, b"\x01", 1, 1, x=255)
 
+def test_switch_compiled():
+    for count in [3, 20]:
+        d = Struct("k"/Byte, "v"/Switch(this.k, {i:Bytes(i) for i in range(count)}, default=Int16ub))
+        c = d.compile()
+        assert "lambda" not in c.source
+        for data in [b"\x02ab", b"\x00", b"\xff\x01\x02"]:
+            assert c.parse(data) == d.parse(data)
+            assert c.build(d.parse(data)) == data
+
 def test_switch_issue_357():
     inner = Struct(
         "computed" / Computed(4),
@@ -959,6 +1223,23 @@ def test_bitstruct():
     d = BitStruct("a"/BitsInteger(3), "b"/Flag, Padding(3), "c"/Nibble, "sub"/Struct("d"/Nibble, "e"/Bit))
     common(d, b"\xe1\x1f", Container(a=7, b=False, c=8, sub=Container(d=15, e=1)), 2)
 
+def test_bitstruct_compiled():
+    d = BitStruct("a"/Flag, "b"/Nibble, Padding(3), "c"/BitsInteger(16, swapped=True, signed=True), "d"/BitsInteger(5, signed=True), Padding(3, pattern=b"\x01"), "e"/Octet)
+    c = d.compile()
+    assert "parse_bitwise" in c.source and "build_bitwise" in c.source
+    obj = Container(a=True, b=3, c=-2, d=-16, e=1)
+    assert c.build(obj) == d.build(obj) == b"\x98\xfe\xff\x87\x01"
+    assert c.parse(b"\x98\xfe\xff\x87\x01") == d.parse(b"\x98\xfe\xff\x87\x01") == obj
+    assert raises(c.parse, b"\x98") == StreamError
+    assert raises(c.build, dict(obj, b=16)) == IntegerError
+    assert raises(c.build, dict(obj, d=16)) == IntegerError
+    assert raises(c.build, dict(obj, c=None)) == IntegerError
+    d = Bitwise(BitsInteger(24, swapped=True))
+    c = d.compile()
+    assert "parse_bitwise" in c.source
+    assert c.parse(b"\x01\x02\x03") == d.parse(b"\x01\x02\x03") == 0x030201
+    assert c.build(0x030201) == b"\x01\x02\x03"
+
 def test_pointer():
     common(Pointer(2,             Byte), b"\x00\x00\x07", 7, 0)
     common(Pointer(lambda ctx: 2, Byte), b"\x00\x00\x07", 7, 0)
@@ -1368,6 +1649,40 @@ def test_compressedlz4():
     assert len(d.build(zeros)) < 100
     assert raises(d.sizeof) == SizeofError
 
+def test_tunnels_compiled():
+    zeros = bytes(1000)
+    for d, obj in [
+        (Struct("n" / Byte, "z" / Prefixed(Byte, Compressed(Struct("a" / Bytes(this._.n), "b" / GreedyBytes), "zlib"))), dict(n=3, z=dict(a=b"abc", b=zeros))),
+        (Prefixed(Byte, Compressed(GreedyBytes, "gzip", level=9)), zeros),
+        (Prefixed(Byte, Compressed(GreedyBytes, "hex")), b"\x01\x02"),
+        (Prefixed(Byte, CompressedLZ4(GreedyBytes)), zeros),
+        (Struct("p" / Byte, "x" / ProcessXor(this.p, Int16ub)), dict(p=0xf0, x=0xf00f)),
+        (Struct("x" / ProcessXor(b"\x01\x02\x03", GreedyBytes)), dict(x=b"abcdefgh")),
+        (Struct("x" / ProcessXor(lambda this: b"\x00\x00", GreedyBytes)), dict(x=b"abcd")),
+        (Struct("x" / ProcessXor(0, Struct("a" / Byte, "t" / Tell))), dict(x=dict(a=1))),
+        (ProcessRotateLeft(4, 1, GreedyBytes), b"\x0f\xf0"),
+        (ProcessRotateLeft(8, 2, GreedyBytes), b"\x0f\xf0\x12\x34"),
+        (ProcessRotateLeft(this.n, 3, GreedyBytes), b"\x0f\xf0\x12\x34\x56\x78"),
+        (Transformed(Bytes(16), bytes2bits, 2, bits2bytes, 2), bytes(16)),
+        (Transformed(GreedyBytes, lambda b: b[::-1], None, lambda b: b[::-1], None), b"abc"),
+        (Restreamed(Bytes(2), lambda b: b*2, 1, lambda b: b[0:1], 1, lambda n: n*2), b"aa"),
+        (Bitwise(Struct("a" / Nibble, "b" / Bytewise(Int16ub), "c" / Nibble)), dict(a=1, b=2, c=3)),
+    ]:
+        c = d.compile()
+        data = d.build(obj, n=13)
+        assert c.build(obj, n=13) == data
+        assert c.parse(data, n=13) == d.parse(data, n=13)
+        assert c.parse_stream(io.BytesIO(data), n=13) == d.parse(data, n=13)
+    assert "linkedparsers[" not in Bitwise(Struct("a" / Nibble, "b" / Bytewise(Int16ub), "c" / Nibble)).compile().source
+    assert raises(ProcessRotateLeft(4, 2, GreedyBytes).compile().parse, b"\x00") == RotationError
+    assert raises(ProcessXor(u"x", GreedyBytes).compile().parse, b"\x00") == StringError
+
+def test_tunnel_context():
+    d = Struct("data" / Byte, "z" / Prefixed(Byte, Compressed(Struct("a" / Bytes(this._.data)), "zlib")))
+    obj = dict(data=2, z=dict(a=b"ab"))
+    assert d.parse(d.build(obj)).z.a == b"ab"
+    assert d.compile().parse(d.build(obj)).z.a == b"ab"
+
 @xfail(ONWINDOWS and PYPY, reason="no wheel for 'cryptography' is currently available for pypy on windows")
 def test_encryptedsym():
     from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
@@ -1494,6 +1809,10 @@ def test_lazy_issue_938():
     d = Lazy(Prefixed(Byte, Byte))
     func = d.parse(b'\x01\x02')
     assert func() == 2
+    d = Struct("x" / Lazy(PrefixedArray(Byte, Byte)), "y" / Byte)
+    obj = d.parse(b'\x02\x01\x02\x03')
+    assert obj.x() == [1,2]
+    assert obj.y == 3
 
 def test_lazy_seek():
     d = Struct(
@@ -1588,6 +1907,36 @@ def test_lazybound():
         data = x.next
         print(x)
 
+def test_lazy_compiled():
+    d = Struct("value" / Byte, "next" / If(this.value > 0, LazyBound(lambda: d)))
+    c = d.compile()
+    assert "parse_lazybound_" in c.source and "linkedparsers[" not in c.source
+    common(c, b"\x05\x09\x00", Container(value=5, next=Container(value=9, next=Container(value=0, next=None))))
+
+    d = Struct("x" / Lazy(Int16ub), "y" / Lazy(PrefixedArray(Byte, Byte)), "z" / Byte)
+    obj = d.compile().parse(b"\x00\x05\x02\x01\x02\x09")
+    assert obj.x() == 5
+    assert obj.y() == [1,2]
+    assert obj.z == 9
+    assert d.compile().build(obj) == b"\x00\x05\x02\x01\x02\x09"
+
+    d = LazyStruct("a" / Int16ub, "b" / Bytes(this._.n), "c" / VarInt, "d" / PrefixedArray(Byte, Byte), "e" / Byte)
+    data = b"\x00\x01abc\x81\x01\x01\x07\x09"
+    obj = d.compile().parse(data, n=3)
+    assert isinstance(obj, LazyContainer)
+    assert repr(obj) == repr(d.parse(data, n=3)) == "<LazyContainer: 2 items cached, 5 subcons>"
+    assert obj.e == obj["e"] == obj[4] == 9
+    assert obj.b == b"abc"
+    assert list(obj.items()) == list(d.parse(data, n=3).items())
+    assert d.compile().build(obj, n=3) == data
+
+    for d, data in [(LazyArray(3, Int16ub), b"\x00\x01\x00\x02\x00\x03"), (LazyArray(this.n, VarInt), b"\x81\x01\x02\x03"), (LazyArray(2, PascalString(Byte, "utf8")), b"\x01a\x02bc")]:
+        obj = d.compile().parse(data, n=3)
+        assert isinstance(obj, LazyListContainer)
+        assert obj[1] == d.parse(data, n=3)[1]
+        assert obj == d.parse(data, n=3)
+        assert d.compile().build(obj, n=3) == data
+
 def test_expradapter():
     MulDiv = ExprAdapter(Byte, obj_ * 7, obj_ // 7)
     assert MulDiv.parse(b"\x06") == 42
@@ -1873,7 +2222,7 @@ def test_from_issue_357():
     assert st2.build(dict(b={})) == b""
 
 def test_context_is_container():
-    d = Struct(Check(lambda ctx: type(ctx) is Container))
+    d = Struct(Check(lambda ctx: type(ctx) is ContextFrame and isinstance(ctx, Container)))
     d.parse(b"")
 
 def test_from_issue_362():
@@ -2441,7 +2790,6 @@ def test_compile_binexpr_bitwise_and_issue_1039():
     common(d, b"\x01", {"a": 1, "cond": None})
     common(d, b" \x05", {"a": 32, "cond": 5})
 
-@xfail(reason="unknown problem with Select")
 def test_select_issue_1038():
     s = Struct(
         "value" / Select(IfThenElse(this._params.ctx == 1, Byte, Short)),
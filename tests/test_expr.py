@@ -136,3 +136,25 @@ def test_this_shift_operator():
        "rs" / Computed(this.a >> 1),
     )
     assert d.parse(b"\x02") == Container(a=2, ls=4, rs=1)
+
+def test_lowered():
+    import pickle, operator
+    from construct.expr import BinExpr, UniExpr, lowerexpr
+    context = Container(a=3, h=Container(count=5), l=[1,2,3], _=Container(x=2))
+    for x, value in [
+        (this.h.count * 4, 20),
+        (this._.x * this.a + 1, 7),
+        (-this.a, -3),
+        (~(this.a == 3), False),
+        (len_(this.l) // 2, 1),
+        (BinExpr(operator.contains, this.l, 2), True),
+        (this.a / 2, 1.5),
+    ]:
+        assert x(context) == value
+        assert x(context) == value
+        assert pickle.loads(pickle.dumps(x))(context) == value
+    assert (this.a + (lambda this: 10))(context) == 13
+    assert lowerexpr(BinExpr(operator.mul, UniExpr(operator.neg, 2), 3))(None) == -6
+    assert len_(5) == 5
+    d = Struct("_lowered"/Byte, "_lower"/Byte, "x"/Computed(this._lowered + this._lower))
+    assert d.parse(b"\x05\x01") == d.compile().parse(b"\x05\x01") == Container(_lowered=5, _lower=1, x=6)